@@ -3,7 +3,6 @@ import sys
 from textwrap import dedent
 
 from agno.agent import Agent
-from agno.models.openai import OpenAIChat
 from agno.tools.arxiv import ArxivTools
 from agno.tools.duckduckgo import DuckDuckGoTools
 from agno.tools.googlesearch import GoogleSearchTools
@@ -13,17 +12,19 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+from agents.llm_cache import chat_model
+from tools.local_search_tool import LocalCorpusSearchTool
 from tools.philippines_search_tool import PhilippinesSearchTool
 from tools.sci_paper_search_tool import SciResTool
 
 # === Adviser Agent ===
-def create_adviser_agent(llm, memory, agent_id, user_id, description, instructions):
+def create_adviser_agent(llm, memory, agent_id, user_id, description, instructions, cache=None):
     """
     Factory function to create the Adviser Agent.
     """
     return Agent(
         name="Adviser",
-        model=OpenAIChat(llm),
+        model=chat_model(llm, cache),
         tools=[
             DuckDuckGoTools(),
             SciResTool(),
@@ -42,18 +43,19 @@ def create_adviser_agent(llm, memory, agent_id, user_id, description, instructio
 
 # === Researcher Agent Factory ===
 def make_researcher(
-    llm, memory, agent_id, user_id, subtopic_index, researcher_instructions
+    llm, memory, agent_id, user_id, subtopic_index, researcher_instructions, cache=None
 ):
     """
     Factory function to create a Researcher Agent for a given subtopic.
     """
     return Agent(
         name=f"Researcher {subtopic_index + 1}",
-        model=OpenAIChat(llm),
+        model=chat_model(llm, cache),
         role="Research academic papers and scholarly content",
         add_history_to_messages=True,
         num_history_responses=3,
         tools=[
+            LocalCorpusSearchTool(),
             GoogleSearchTools(),
             ArxivTools(),
             PhilippinesSearchTool(),
@@ -71,14 +73,14 @@ def make_researcher(
 
 # === Supervisor Agent ===
 def create_supervisor_agent(
-    llm, memory, agent_id, user_id, description, instructions, role="supervisor"
+    llm, memory, agent_id, user_id, description, instructions, role="supervisor", cache=None
 ):
     """
     Factory function to create a Supervisor Agent.
     """
     return Agent(
         name="Supervisor" if role == "supervisor" else "Supervisor 2",
-        model=OpenAIChat("gpt-4.1"),
+        model=chat_model("gpt-4.1", cache),
         add_history_to_messages=True,
         num_history_responses=3,
         description=dedent(description),
@@ -90,13 +92,13 @@ def create_supervisor_agent(
 
 
 # === Citation Agent ===
-def create_citation_agent(llm, memory, agent_id, user_id, description, instructions):
+def create_citation_agent(llm, memory, agent_id, user_id, description, instructions, cache=None):
     """
     Factory function to create the Citation Agent.
     """
     return Agent(
         name="Citation Agent",
-        model=OpenAIChat(llm),
+        model=chat_model(llm, cache),
         add_history_to_messages=True,
         num_history_responses=3,
         description=dedent(description),
@@ -108,11 +110,11 @@ def create_citation_agent(llm, memory, agent_id, user_id, description, instructi
 
 # === Evaluation Agent ===
 def create_evaluator(
-     memory, agent_id, user_id, description, instructions, role="evaluator"
+     memory, agent_id, user_id, description, instructions, role="evaluator", cache=None
 ):
     return Agent(
         name="Evaluator",
-        model=OpenAIChat("gpt-5"),
+        model=chat_model("gpt-5", cache),
         add_history_to_messages=True,
         num_history_responses=3,
         description=dedent(description),
@@ -0,0 +1,297 @@
+# llm_cache.py
+
+"""
+Exact-match cache of chat completions, so rerunning the same query to tweak a later workflow step does not
+pay again for the steps before it.
+- Entries are keyed by the model id, the full formatted message list, the tool schema and every request
+  parameter sent to the API (temperature, seed, response_format, ...). Any difference is a miss; nothing is
+  matched approximately.
+- Stored in SQLite at LLM_CACHE_DB (default: tmp/llm_cache.db), at most LLM_CACHE_MAX_ENTRIES rows (default: 2000)
+  and LLM_CACHE_MAX_BYTES of responses (default: 256 MiB); least recently used rows are evicted first.
+- Every hit adds the cached response's token usage to the "tokens saved" counters, per process and per entry.
+- Caching is opt-in per agent factory (`cache=True` in agents/deep_search_agents.py); LLM_CACHE_ENABLED=1
+  turns it on for every factory that is not told otherwise.
+- Only non-streaming calls are cached; streamed responses always go to the API.
+- For offline runs point the OpenAI client at the stub server's chat endpoint
+  (OPENAI_BASE_URL=http://127.0.0.1:8900/v1, see scripts/stub_server.py).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type, Union
+
+from agno.models.message import Message
+from agno.models.openai import OpenAIChat
+from agno.utils.log import logger
+from openai.types.chat import ChatCompletion
+from pydantic import BaseModel
+
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "tmp/llm_cache.db")
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "0").lower() not in ("0", "false", "no")
+
+_max_str = os.getenv("LLM_CACHE_MAX_ENTRIES", "2000")
+try:
+    LLM_CACHE_MAX_ENTRIES = int(_max_str)
+except (TypeError, ValueError):
+    LLM_CACHE_MAX_ENTRIES = 2000
+
+_bytes_str = os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+try:
+    LLM_CACHE_MAX_BYTES = int(_bytes_str)
+except (TypeError, ValueError):
+    LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def make_key(model_id: str, messages: list, tools: Optional[list], params: dict) -> str:
+    """Stable hash of everything that decides a completion."""
+    raw = json.dumps(
+        {"model": model_id, "messages": messages, "tools": tools or [], "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed LRU cache of serialized chat completions, bounded by row count and total size."""
+
+    def __init__(
+        self,
+        db_file: str = LLM_CACHE_DB,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+    ):
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prompt_tokens_saved = 0
+        self.completion_tokens_saved = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached completion as a dict, or None on a miss."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT response, prompt_tokens, completion_tokens FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                response, prompt_tokens, completion_tokens = row
+                conn.execute(
+                    "UPDATE llm_cache SET accessed_at = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+                )
+                conn.commit()
+                self.hits += 1
+                self.prompt_tokens_saved += prompt_tokens
+                self.completion_tokens_saved += completion_tokens
+            return json.loads(response)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"[LLMCache] Lookup failed, treating as miss: {e}")
+            return None
+
+    def put(self, key: str, model: str, response: dict) -> None:
+        """Store a completion and evict least recently used rows beyond the entry and size limits."""
+        usage = response.get("usage") or {}
+        body = json.dumps(response, ensure_ascii=False)
+        size = len(body.encode("utf-8"))
+        if 0 < self.max_bytes < size:
+            logger.info(f"[LLMCache] Response of {size} bytes exceeds LLM_CACHE_MAX_BYTES, not cached")
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                    (
+                        key,
+                        model,
+                        body,
+                        size,
+                        usage.get("prompt_tokens") or 0,
+                        usage.get("completion_tokens") or 0,
+                        now,
+                        now,
+                    ),
+                )
+                if self.max_entries > 0:
+                    cur = conn.execute(
+                        """
+                        DELETE FROM llm_cache WHERE key IN (
+                            SELECT key FROM llm_cache ORDER BY accessed_at DESC
+                            LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (self.max_entries,),
+                    )
+                    self.evictions += max(cur.rowcount, 0)
+                if self.max_bytes > 0:
+                    # Keep the most recently used rows whose running size fits the budget
+                    cur = conn.execute(
+                        """
+                        DELETE FROM llm_cache WHERE key IN (
+                            SELECT key FROM (
+                                SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running
+                                FROM llm_cache
+                            ) WHERE running > ?
+                        )
+                        """,
+                        (self.max_bytes,),
+                    )
+                    self.evictions += max(cur.rowcount, 0)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[LLMCache] Failed to store response: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss and tokens-saved counters for this process, plus totals over the stored entries."""
+        with self._lock:
+            entries = size = lifetime_saved = 0
+            try:
+                entries, size, lifetime_saved = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0), "
+                    "COALESCE(SUM(hits * (prompt_tokens + completion_tokens)), 0) FROM llm_cache"
+                ).fetchone()
+            except sqlite3.Error:
+                pass
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "prompt_tokens_saved": self.prompt_tokens_saved,
+                "completion_tokens_saved": self.completion_tokens_saved,
+                "entries": entries,
+                "bytes": size,
+                "lifetime_tokens_saved": lifetime_saved,
+            }
+
+
+# Shared process-wide cache used by the agent factories
+llm_cache = LLMResponseCache()
+
+
+@dataclass
+class CachedOpenAIChat(OpenAIChat):
+    """OpenAIChat that answers repeated identical requests from an LLMResponseCache."""
+
+    response_cache: Optional[LLMResponseCache] = None
+
+    def _cache_key(
+        self,
+        messages: List[Message],
+        response_format: Optional[Union[Dict, Type[BaseModel]]],
+        tools: Optional[List[Dict[str, Any]]],
+        tool_choice: Optional[Union[str, Dict[str, Any]]],
+    ) -> str:
+        params = self.get_request_params(response_format=response_format, tools=tools, tool_choice=tool_choice)
+        tool_schema = params.pop("tools", None)
+        return make_key(self.id, [self._format_message(m) for m in messages], tool_schema, params)
+
+    def _lookup(self, key: str) -> Optional[ChatCompletion]:
+        cached = (self.response_cache or llm_cache).get(key)
+        if cached is None:
+            return None
+        try:
+            return ChatCompletion.model_validate(cached)
+        except ValueError as e:
+            logger.warning(f"[LLMCache] Cached response for {self.id} is unreadable, calling the API: {e}")
+            return None
+
+    def _store(self, key: str, completion: ChatCompletion) -> None:
+        # Only cache complete answers; truncated or filtered ones should be retried
+        if not completion.choices or completion.choices[0].finish_reason not in ("stop", "tool_calls"):
+            return
+        (self.response_cache or llm_cache).put(key, self.id, completion.model_dump(mode="json"))
+
+    def invoke(
+        self,
+        messages: List[Message],
+        response_format: Optional[Union[Dict, Type[BaseModel]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+    ) -> ChatCompletion:
+        key = self._cache_key(messages, response_format, tools, tool_choice)
+        completion = self._lookup(key)
+        if completion is None:
+            completion = super().invoke(messages, response_format, tools, tool_choice)
+            self._store(key, completion)
+        return completion
+
+    async def ainvoke(
+        self,
+        messages: List[Message],
+        response_format: Optional[Union[Dict, Type[BaseModel]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+    ) -> ChatCompletion:
+        key = self._cache_key(messages, response_format, tools, tool_choice)
+        completion = self._lookup(key)
+        if completion is None:
+            completion = await super().ainvoke(messages, response_format, tools, tool_choice)
+            self._store(key, completion)
+        return completion
+
+
+def chat_model(model_id: str, cache: Optional[bool] = None) -> OpenAIChat:
+    """
+    Build the chat model for an agent.
+
+    Args:
+        model_id (str): OpenAI model id.
+        cache (Optional[bool]): Answer repeated requests from `llm_cache`; None follows LLM_CACHE_ENABLED.
+
+    Returns:
+        OpenAIChat: A CachedOpenAIChat when caching is on, else a plain OpenAIChat.
+    """
+    if LLM_CACHE_ENABLED if cache is None else cache:
+        return CachedOpenAIChat(model_id, response_cache=llm_cache)
+    return OpenAIChat(model_id)
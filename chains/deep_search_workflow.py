@@ -1,9 +1,15 @@
 import os
 import sys
+from collections.abc import AsyncIterator, Iterator
+from typing import Optional
+from uuid import uuid4
 
 from agno.memory.v2.db.sqlite import SqliteMemoryDb
 from agno.memory.v2.memory import Memory
-from agno.workflow.v2 import Parallel, Step, Workflow
+from agno.run.base import RunStatus
+from agno.run.v2.workflow import WorkflowCancelledEvent, WorkflowCompletedEvent, WorkflowErrorEvent
+from agno.utils.log import logger
+from agno.workflow.v2 import Step, Workflow
 from dotenv import find_dotenv, load_dotenv
 
 # === Import modularized agents ===
@@ -24,6 +30,16 @@ from prompts.deep_search_prompts import (
     get_supervisor_instructions as SUPERVISOR_INSTRUCTIONS,
     get_evaluator_instructions as EVALUATOR_INSTRUCTIONS
 )
+from chains.run_store import CHECKPOINTS_ENABLED, CheckpointedStep, RunCheckpoint
+from chains.synthesis import CleanupEditor, SynthesisCompiler
+from chains.research_phase import (
+    MAX_RESEARCHERS,
+    MIN_RESEARCHERS,
+    RESEARCHER_CONCURRENCY,
+    ResearchPhase,
+)
+from tools.deadline import tool_deadlines
+from tools.url_canon import run_urls
 
 # === Setup ===
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -54,6 +70,120 @@ citation_style = "american psychological association"
 query = "machine learning for coordination compounds"
 
 
+# Final status of a streamed run, from its last terminal event
+STREAM_END_STATUS = {
+    WorkflowCompletedEvent: RunStatus.completed,
+    WorkflowErrorEvent: RunStatus.error,
+    WorkflowCancelledEvent: RunStatus.cancelled,
+}
+
+
+# === Workflow ===
+class DeepSearchWorkflow(Workflow):
+    """
+    Workflow that opens a fresh tool-level URL de-duplication scope for every run,
+    so links returned to one researcher are not repeated to the others.
+    `tool_deadline` sets the default time budget in seconds for each tool call made
+    during a run (None keeps TOOLS_CALL_DEADLINE, 0 disables the deadline).
+    With a `checkpoint` (chains/run_store.py) step outputs are stored under the run id,
+    and `run(..., resume=<run id>)` continues a failed run from its first incomplete step.
+    When the run returns, raises or its stream ends, the URL scope and deadline are restored
+    and the checkpointed run is marked finished with the run's status.
+    """
+
+    def __init__(
+        self,
+        *args,
+        tool_deadline: Optional[float] = None,
+        checkpoint: Optional[RunCheckpoint] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.tool_deadline = tool_deadline
+        self.checkpoint = checkpoint
+        self.checkpoint_run_id: Optional[str] = None
+
+    def _begin_run(self, args: tuple, kwargs: dict, resume: Optional[str]) -> tuple:
+        run_id = resume or str(uuid4())
+        # Both are scoped to this run's context and restored by _end_run, so they never leak into other runs
+        scope = [(run_urls, run_urls.begin_run(run_id))]
+        if self.tool_deadline is not None:
+            scope.append((tool_deadlines, tool_deadlines.begin_run(self.tool_deadline)))
+        if self.checkpoint is not None:
+            self.checkpoint_run_id = run_id
+            message = args[0] if args else kwargs.get("message")
+            message = self.checkpoint.begin(run_id, message, resume=resume is not None)
+            if args:
+                args = (message, *args[1:])
+            else:
+                kwargs["message"] = message
+            logger.info(f"[Checkpoint] Run id {run_id} (pass resume='{run_id}' to continue it after a failure)")
+        elif resume is not None:
+            logger.warning("[Checkpoint] resume requested but checkpoints are disabled; running from the start")
+        return args, kwargs, scope
+
+    def _end_run(self, scope: list, status) -> None:
+        """Mark the checkpointed run finished and restore the run-scoped tool state."""
+        try:
+            if self.checkpoint is not None:
+                self.checkpoint.finish(getattr(status, "value", str(status)))
+        finally:
+            for registry, token in reversed(scope):
+                registry.end_run(token)
+
+    def _stream(self, events: Iterator, scope: list) -> Iterator:
+        # A streamed run only executes while it is consumed, so it ends when the stream does
+        status = None
+        try:
+            for event in events:
+                status = STREAM_END_STATUS.get(type(event), status)
+                yield event
+            status = status or RunStatus.completed
+        except Exception:
+            status = RunStatus.error
+            raise
+        finally:
+            # Closed before the end: the consumer stopped reading
+            self._end_run(scope, status or RunStatus.cancelled)
+
+    async def _astream(self, events: AsyncIterator, scope: list) -> AsyncIterator:
+        status = None
+        try:
+            async for event in events:
+                status = STREAM_END_STATUS.get(type(event), status)
+                yield event
+            status = status or RunStatus.completed
+        except Exception:
+            status = RunStatus.error
+            raise
+        finally:
+            self._end_run(scope, status or RunStatus.cancelled)
+
+    def run(self, *args, resume: Optional[str] = None, **kwargs):
+        args, kwargs, scope = self._begin_run(args, kwargs, resume)
+        try:
+            response = super().run(*args, **kwargs)
+        except BaseException:
+            self._end_run(scope, RunStatus.error)
+            raise
+        if isinstance(response, Iterator):
+            return self._stream(response, scope)
+        self._end_run(scope, getattr(response, "status", None) or RunStatus.completed)
+        return response
+
+    async def arun(self, *args, resume: Optional[str] = None, **kwargs):
+        args, kwargs, scope = self._begin_run(args, kwargs, resume)
+        try:
+            response = await super().arun(*args, **kwargs)
+        except BaseException:
+            self._end_run(scope, RunStatus.error)
+            raise
+        if isinstance(response, AsyncIterator):
+            return self._astream(response, scope)
+        self._end_run(scope, getattr(response, "status", None) or RunStatus.completed)
+        return response
+
+
 # === Workflow Builder ===
 def build_deep_search_workflow(
     llm,
@@ -68,39 +198,53 @@ def build_deep_search_workflow(
     citation_style,
     citation_guides_folder,
     EVALUATOR_INSTRUCTIONS,
+    tool_deadline=None,
+    min_researchers=MIN_RESEARCHERS,
+    max_researchers=MAX_RESEARCHERS,
+    researcher_concurrency=RESEARCHER_CONCURRENCY,
+    llm_cache=None,
+    checkpoints=CHECKPOINTS_ENABLED,
 ):
+    # llm_cache: answer repeated identical model calls from agents/llm_cache.py
+    # (None follows LLM_CACHE_ENABLED), e.g. when rerunning a query to tweak a later step
+    # checkpoints: store step outputs per run so a failed run can be resumed (chains/run_store.py)
+    checkpoint = RunCheckpoint() if checkpoints else None
+
+    def step(name, **executor):
+        if checkpoint is None:
+            return Step(name=name, **executor)
+        return CheckpointedStep(name=name, checkpoint=checkpoint, **executor)
+
     Adviser = create_adviser_agent(
         llm,
         memory,
         agent_id,
         user_id,
         "Expert research adviser with decades of publishing experience.",
-        ADVISER_INSTRUCTIONS(query=query, citation_style=citation_style),
+        ADVISER_INSTRUCTIONS(
+            query=query,
+            citation_style=citation_style,
+            min_subtopics=min_researchers,
+            max_subtopics=max_researchers,
+        ),
+        cache=llm_cache,
     )
 
-    Researcher1 = make_researcher(
-        llm,
-        memory,
-        agent_id,
-        user_id,
-        subtopic_index=1,
-        researcher_instructions=RESEARCHER_INSTRUCTIONS(subtopic_index=1),
-    )
-    Researcher2 = make_researcher(
-        llm,
-        memory,
-        agent_id,
-        user_id,
-        subtopic_index=2,
-        researcher_instructions=RESEARCHER_INSTRUCTIONS(subtopic_index=2),
-    )
-    Researcher3 = make_researcher(
-        llm,
-        memory,
-        agent_id,
-        user_id,
-        subtopic_index=3,
-        researcher_instructions=RESEARCHER_INSTRUCTIONS(subtopic_index=3),
+    # One researcher per subtopic in the adviser's plan, created on demand
+    Research = ResearchPhase(
+        lambda subtopic_index: make_researcher(
+            llm,
+            memory,
+            agent_id,
+            user_id,
+            subtopic_index=subtopic_index,
+            researcher_instructions=RESEARCHER_INSTRUCTIONS(subtopic_index=subtopic_index),
+            cache=llm_cache,
+        ),
+        min_researchers=min_researchers,
+        max_researchers=max_researchers,
+        max_concurrency=researcher_concurrency,
+        checkpoint=checkpoint,
     )
 
     Supervisor = create_supervisor_agent(
@@ -108,17 +252,24 @@ def build_deep_search_workflow(
         memory,
         agent_id,
         user_id,
-        "Supervisor for synthesizing results.",
+        "Supervisor writing the title, introduction and conclusion of the compiled article.",
         SUPERVISOR_INSTRUCTIONS(),
+        cache=llm_cache,
     )
+    # Researcher sections are merged in code; the Supervisor only writes the introduction and conclusion
+    Synthesis = SynthesisCompiler(Supervisor)
+
     Supervisor2 = create_supervisor_agent(
         llm,
         memory,
         agent_id,
         user_id,
-        "Supervisor for cleanup and refinement.",
+        "Supervisor proof-reading the introduction and conclusion of the compiled article.",
         SUPERVISOR2_INSTRUCTIONS(),
+        cache=llm_cache,
     )
+    # References were consolidated during synthesis; Cleanup only edits the model-written framing
+    Cleanup = CleanupEditor(Supervisor2)
     Citation = create_citation_agent(
         llm,
         memory,
@@ -126,31 +277,31 @@ def build_deep_search_workflow(
         user_id,
         "Formats results into proper citations.",
         CITATION_INSTRUCTIONS(citation_style=citation_style,
-            citation_guides_folder=citation_guides_folder))
+            citation_guides_folder=citation_guides_folder),
+        cache=llm_cache,
+    )
     
     Evaluator = create_evaluator(
         memory,
         agent_id,
         user_id,
         "Evaluator to judge the output of research pipeline.",
-        EVALUATOR_INSTRUCTIONS
+        EVALUATOR_INSTRUCTIONS,
+        cache=llm_cache,
     )
 
-    workflow = Workflow(
+    workflow = DeepSearchWorkflow(
         name="Deep Search Pipeline",
         workflow_id="deep_search_team",
+        tool_deadline=tool_deadline,
+        checkpoint=checkpoint,
         steps=[
-            Step(name="Planning", agent=Adviser),
-            Parallel(
-                Step(name="Agent 1", agent=Researcher1),
-                Step(name="Agent 2", agent=Researcher2),
-                Step(name="Agent 3", agent=Researcher3),
-                name="Research Phase",
-            ),
-            Step(name="Synthesis", agent=Supervisor),
-            Step(name="Cleanup", agent=Supervisor2),
-            Step(name="Formatting", agent=Citation),
-            Step(name="Evaluation", agent=Evaluator)
+            step("Planning", agent=Adviser),
+            step("Research Phase", executor=Research),
+            step("Synthesis", executor=Synthesis),
+            step("Cleanup", executor=Cleanup),
+            step("Formatting", agent=Citation),
+            step("Evaluation", agent=Evaluator)
         ],
     )
     return workflow
@@ -0,0 +1,200 @@
+# references.py
+
+"""
+Reference consolidation for the compiled article (see chains/synthesis.py).
+- Entries are parsed from each researcher's References/Bibliography section, keeping their local label
+  (`[3]`, `3.` or `3)`) so numbered in-text citations can be rewritten.
+- Every entry gets up to three keys: its DOI (from doi.org links, publisher URLs or bare `doi:` text), its
+  canonical URL (tools/url_canon.py) and a first-author + year + title-words key. Two entries sharing any key
+  are the same source; the one with a DOI, else a URL, else the longer text is kept.
+- Keys are hashed into one dict, so parsing, de-duplication and citation rewriting are linear in the size of
+  the text; only the final alphabetical sort of the unique entries is O(n log n).
+- Numbered citations in each section (`[2]`, `[1, 4]`, `[2-5]`) are rewritten to the entry's position in the
+  merged list, so numbering is consistent across the whole article. Author-year citations are left alone.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlsplit
+
+from tools.url_canon import DOI_PATTERN, dedup_key, extract_doi
+
+ENTRY_LABEL = re.compile(r"^\s*(?:\[(\d+)\]|(\d+)[.)])\s+")
+BULLET = re.compile(r"^\s*[-*+•]\s+")
+URL_PATTERN = re.compile(r"https?://[^\s<>()\[\]]+")
+YEAR_PATTERN = re.compile(r"\((\d{4}[a-z]?|n\.d\.)[^)]*\)|\b((?:19|20)\d{2}[a-z]?)\b")
+WORD_PATTERN = re.compile(r"[^\W_]+")
+MARKUP = re.compile(r"[*_`\[\]]")
+FENCE = re.compile(r"^\s*(```|~~~)")
+# Numbered citation such as [3], [1, 4] or [2-5]; not footnotes ([^1]) or links ([1](...))
+CITATION = re.compile(r"(?<![\^\w])\[(\d+(?:\s*[-–,]\s*\d+)*)\](?!\()")
+
+
+def _hash(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _plain(text: str) -> str:
+    return " ".join(MARKUP.sub("", text).split())
+
+
+def reference_doi(text: str) -> Optional[str]:
+    """DOI cited in a reference entry, from its links or its text."""
+    for url in URL_PATTERN.findall(text):
+        doi = extract_doi(url.rstrip(".,;"))
+        if doi:
+            return doi
+    match = DOI_PATTERN.search(text)
+    if not match:
+        return None
+    return re.split(r"[\]\[()*_]", match.group(1))[0].rstrip(".,;").lower() or None
+
+
+def author_year_key(text: str) -> Optional[str]:
+    """First author's surname, year and the first title words, or None if the entry has no year."""
+    plain = _plain(text)
+    year = YEAR_PATTERN.search(plain)
+    words = WORD_PATTERN.findall(plain[: year.start()] if year else "")
+    if not year or not words:
+        return None
+    title = WORD_PATTERN.findall(plain[year.end() :].lower())[:6]
+    return f"{words[0].lower()}|{year.group(1) or year.group(2)}|{' '.join(title)}"
+
+
+@dataclass
+class Reference:
+    """One bibliography entry and the keys it is de-duplicated on."""
+
+    text: str
+    label: Optional[int] = None
+    doi: Optional[str] = None
+    url: Optional[str] = None
+    keys: list[str] = field(default_factory=list)
+
+    @property
+    def richness(self) -> tuple:
+        return (self.doi is not None, self.url is not None, len(self.text))
+
+    @property
+    def sort_key(self) -> tuple:
+        return (_plain(self.text).casefold(), self.doi or "")
+
+
+def split_entries(lines: list[str]) -> list[str]:
+    """Split the lines of a references section into entries (list items or blank-line separated paragraphs)."""
+    entries: list[str] = []
+    current: list[str] = []
+    for line in lines:
+        if not line.strip():
+            if current:
+                entries.append(" ".join(current))
+                current = []
+            continue
+        if (ENTRY_LABEL.match(line) or BULLET.match(line)) and current:
+            entries.append(" ".join(current))
+            current = []
+        current.append(line.strip())
+    if current:
+        entries.append(" ".join(current))
+    return [entry for entry in entries if entry]
+
+
+def parse_reference(entry: str) -> Reference:
+    """Parse one entry: strip its list marker, keep a numeric label and compute its keys."""
+    label = None
+    match = ENTRY_LABEL.match(entry)
+    if match:
+        label = int(match.group(1) or match.group(2))
+        entry = entry[match.end() :]
+    entry = BULLET.sub("", entry, count=1).strip()
+
+    doi = reference_doi(entry)
+    urls = URL_PATTERN.findall(entry)
+    url = urls[0].rstrip(".,;") if urls else None
+    keys = []
+    if doi:
+        keys.append(f"doi:{doi}")
+    # A bare site address (e.g. a journal home page) does not identify one source
+    if url and urlsplit(url).path.strip("/"):
+        keys.append(f"url:{dedup_key(url)}")
+    author_year = author_year_key(entry)
+    if author_year:
+        keys.append(f"ay:{author_year}")
+    # Entries without any key only match an identical text
+    keys.append(f"text:{_plain(entry).casefold().rstrip('.')}")
+    return Reference(text=entry, label=label, doi=doi, url=url, keys=[_hash(key) for key in keys])
+
+
+class ReferenceList:
+    """Merged bibliography of all sections; add every section first, then call `finalize`."""
+
+    def __init__(self):
+        self.references: list[Reference] = []
+        self._index: dict[str, int] = {}
+        self._sections: list[dict[int, int]] = []
+        self._numbers: list[int] = []
+        self._order: list[int] = []
+        # Set once a numbered in-text citation has been rewritten
+        self.numbered = False
+
+    def add_section(self, entries: list[str]) -> int:
+        """Add one section's entries; returns the section id to pass to `renumber`."""
+        labels: dict[int, int] = {}
+        for entry in entries:
+            reference = parse_reference(entry)
+            position = next((self._index[key] for key in reference.keys if key in self._index), None)
+            if position is None:
+                position = len(self.references)
+                self.references.append(reference)
+            elif reference.richness > self.references[position].richness:
+                kept = self.references[position]
+                kept.text, kept.doi, kept.url = reference.text, reference.doi, reference.url
+            for key in reference.keys:
+                self._index.setdefault(key, position)
+            if reference.label is not None:
+                labels[reference.label] = position
+        self._sections.append(labels)
+        return len(self._sections) - 1
+
+    def finalize(self) -> list[Reference]:
+        """Sort the unique entries alphabetically and fix their numbers."""
+        self._order = sorted(range(len(self.references)), key=lambda i: self.references[i].sort_key)
+        self._numbers = [0] * len(self.references)
+        for number, position in enumerate(self._order, start=1):
+            self._numbers[position] = number
+        return [self.references[position] for position in self._order]
+
+    def renumber(self, section: int, text: str) -> str:
+        """Rewrite a section's numbered citations to the merged list's numbers (code blocks are left alone)."""
+        labels = self._sections[section]
+        if not labels:
+            return text
+
+        def replace(match: re.Match) -> str:
+            numbers = []
+            for part in re.split(r"\s*,\s*", match.group(1)):
+                bounds = re.split(r"\s*[-–]\s*", part)
+                start, end = int(bounds[0]), int(bounds[-1])
+                span = range(start, end + 1) if 0 <= end - start <= 50 else (start, end)
+                for label in span:
+                    if label not in labels:
+                        return match.group(0)
+                    numbers.append(self._numbers[labels[label]])
+            self.numbered = True
+            return f"[{', '.join(str(n) for n in sorted(set(numbers)))}]"
+
+        lines, in_fence = [], False
+        for line in text.split("\n"):
+            if FENCE.match(line):
+                in_fence = not in_fence
+            lines.append(line if in_fence else CITATION.sub(replace, line))
+        return "\n".join(lines)
+
+    def render(self) -> str:
+        """The merged list in its final order, numbered if any numbered citation was rewritten."""
+        entries = [self.references[position].text for position in self._order]
+        if self.numbered:
+            return "\n\n".join(f"[{number}] {text}" for number, text in enumerate(entries, start=1))
+        return "\n\n".join(entries)
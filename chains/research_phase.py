@@ -0,0 +1,179 @@
+# research_phase.py
+
+"""
+Research phase driven by the adviser's JSON plan.
+- The plan's `subtopic_N` entries decide how many researchers run: one per subtopic, capped at
+  DEEP_SEARCH_MAX_RESEARCHERS (default: 5). The adviser is asked for between DEEP_SEARCH_MIN_RESEARCHERS
+  (default: 2) and the maximum, so narrow queries use fewer researchers and LLM calls than broad ones.
+- If the plan cannot be parsed, DEEP_SEARCH_MIN_RESEARCHERS researchers run on the raw adviser output.
+- At most DEEP_SEARCH_RESEARCHER_CONCURRENCY researchers (default: 3) run at once, to stay under model rate limits.
+- Researcher agents are created on first use and reused across runs of the same workflow.
+- With a RunCheckpoint (chains/run_store.py) every researcher's output is stored as soon as it succeeds, and a
+  resumed run reruns only the researchers that failed or never finished.
+- The step output has the same layout as a `Parallel` block ("### ✅ SUCCESS: Agent N" sections), so the
+  synthesis step is unchanged.
+"""
+
+import contextvars
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from agno.utils.log import logger
+from agno.workflow.v2 import StepInput, StepOutput
+
+from chains.run_store import RunCheckpoint
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+MIN_RESEARCHERS = max(1, _env_int("DEEP_SEARCH_MIN_RESEARCHERS", 2))
+MAX_RESEARCHERS = max(MIN_RESEARCHERS, _env_int("DEEP_SEARCH_MAX_RESEARCHERS", 5))
+RESEARCHER_CONCURRENCY = max(1, _env_int("DEEP_SEARCH_RESEARCHER_CONCURRENCY", 3))
+
+SUBTOPIC_KEY = re.compile(r"^subtopic_(\d+)$")
+
+
+def parse_plan(text: str) -> Optional[dict]:
+    """
+    Extract the adviser's JSON plan from its output.
+
+    Tolerates Markdown code fences, text around the JSON object and trailing commas.
+
+    Returns:
+        Optional[dict]: The plan, or None if no JSON object could be parsed.
+    """
+    if not text:
+        return None
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    raw = re.sub(r",\s*([}\]])", r"\1", text[start : end + 1])
+    try:
+        plan = json.loads(raw)
+    except ValueError:
+        return None
+    return plan if isinstance(plan, dict) else None
+
+
+def plan_subtopics(plan: dict) -> list[int]:
+    """Subtopic numbers present in the plan, in order (`subtopic_1`, `subtopic_2`, ...)."""
+    numbers = []
+    for key in plan:
+        match = SUBTOPIC_KEY.match(str(key))
+        if match:
+            numbers.append(int(match.group(1)))
+    return sorted(numbers)
+
+
+class ResearchPhase:
+    """
+    Workflow step executor that fans out one researcher per subtopic in the adviser's plan.
+
+    Args:
+        make_researcher (Callable[[int], Any]): Builds the researcher agent for subtopic N.
+        min_researchers (int): Researchers to run when the plan cannot be parsed.
+        max_researchers (int): Upper bound on researchers per run; extra subtopics are dropped.
+        max_concurrency (int): Researchers allowed to run at once.
+        checkpoint (Optional[RunCheckpoint]): Stores and restores each researcher's output.
+    """
+
+    def __init__(
+        self,
+        make_researcher: Callable[[int], Any],
+        min_researchers: int = MIN_RESEARCHERS,
+        max_researchers: int = MAX_RESEARCHERS,
+        max_concurrency: int = RESEARCHER_CONCURRENCY,
+        checkpoint: Optional[RunCheckpoint] = None,
+    ):
+        self.make_researcher = make_researcher
+        self.min_researchers = max(1, min_researchers)
+        self.max_researchers = max(self.min_researchers, max_researchers)
+        self.max_concurrency = max(1, max_concurrency)
+        self.checkpoint = checkpoint
+        self._researchers: dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    def researcher(self, subtopic: int):
+        with self._lock:
+            agent = self._researchers.get(subtopic)
+            if agent is None:
+                agent = self.make_researcher(subtopic)
+                self._researchers[subtopic] = agent
+            return agent
+
+    def subtopics_for(self, plan_text: str) -> list[int]:
+        """Subtopic numbers to research for this plan, within the configured bounds."""
+        plan = parse_plan(plan_text)
+        subtopics = plan_subtopics(plan) if plan else []
+        if not subtopics:
+            logger.warning(
+                f"[ResearchPhase] Could not read subtopics from the adviser plan, "
+                f"running {self.min_researchers} researchers"
+            )
+            return list(range(1, self.min_researchers + 1))
+        if len(subtopics) > self.max_researchers:
+            logger.warning(
+                f"[ResearchPhase] Plan has {len(subtopics)} subtopics, researching the first {self.max_researchers}"
+            )
+        return subtopics[: self.max_researchers]
+
+    def _run_one(self, subtopic: int, message: str) -> StepOutput:
+        name = f"Agent {subtopic}"
+        stored = self.checkpoint.restore_part(name) if self.checkpoint else None
+        if stored is not None:
+            logger.info(f"[ResearchPhase] Reusing stored output of {name}")
+            return StepOutput(step_name=name, executor_type="agent", executor_name=name, content=stored)
+        try:
+            response = self.researcher(subtopic).run(message=message)
+            if self.checkpoint:
+                self.checkpoint.save_part(name, response.content)
+            return StepOutput(
+                step_name=name,
+                executor_type="agent",
+                executor_name=name,
+                content=response.content,
+                response=response,
+            )
+        except Exception as e:
+            logger.error(f"[ResearchPhase] {name} failed: {e}")
+            return StepOutput(step_name=name, content=f"Step {name} failed: {e}", success=False, error=str(e))
+
+    def __call__(self, step_input: StepInput) -> StepOutput:
+        message = step_input.previous_step_content or step_input.message
+        if not isinstance(message, str):
+            message = json.dumps(message) if isinstance(message, (dict, list)) else str(message)
+        subtopics = self.subtopics_for(message)
+        logger.info(
+            f"[ResearchPhase] Running {len(subtopics)} researchers "
+            f"(at most {self.max_concurrency} at once): subtopics {subtopics}"
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(subtopics)),
+            thread_name_prefix="researcher",
+        ) as executor:
+            # Each researcher runs in a copy of this context, so it sees the run's tool deadline and URL scope
+            contexts = [contextvars.copy_context() for _ in subtopics]
+            outputs = list(
+                executor.map(lambda context, n: context.run(self._run_one, n, message), contexts, subtopics)
+            )
+
+        sections = []
+        for output in outputs:
+            status = "✅ SUCCESS:" if output.success else "❌ FAILURE:"
+            content = str(output.content).strip() if output.content else "*(No content)*"
+            sections.append(f"### {status} {output.step_name}\n{content}")
+        return StepOutput(
+            content="## Parallel Execution Results\n\n" + "\n\n".join(sections),
+            parallel_step_outputs={output.step_name: output for output in outputs},
+            success=any(output.success for output in outputs),
+        )
@@ -0,0 +1,315 @@
+# run_store.py
+
+"""
+Step-level checkpoints for the Deep Search workflow, so a failed run resumes where it stopped instead of
+starting again from Planning.
+- Every completed step output is stored in SQLite at DEEP_SEARCH_RUN_DB (default: tmp/deep_search_runs.db),
+  keyed by run id and step name, together with the run's input message.
+- Researchers in the Research Phase are stored one by one ("Research Phase/Agent N"), so a run in which one
+  researcher failed reruns only that researcher.
+- `workflow.run(resume=<run id>)` (or `print_response(resume=...)`) reuses the stored outputs up to the first
+  step without one and runs everything from there on; the message may be omitted to reuse the stored one.
+- A step only counts as complete if it succeeded and, for the Research Phase, every researcher succeeded.
+- The checkpoint state of a run is kept per run (a context variable), so overlapping runs of one workflow do
+  not mix up their run ids.
+- Set DEEP_SEARCH_CHECKPOINTS=0 to run without checkpoints.
+"""
+
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from agno.utils.log import logger
+from agno.workflow.v2 import Step, StepInput, StepOutput
+
+RUN_DB = os.getenv("DEEP_SEARCH_RUN_DB", "tmp/deep_search_runs.db")
+CHECKPOINTS_ENABLED = os.getenv("DEEP_SEARCH_CHECKPOINTS", "1").lower() not in ("0", "false", "no")
+
+
+class RunStore:
+    """SQLite table of runs and their completed step outputs."""
+
+    def __init__(self, db_file: str = RUN_DB):
+        self.db_file = db_file
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    message TEXT,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS run_steps (
+                    run_id TEXT NOT NULL,
+                    step TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, step)
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def start_run(self, run_id: str, message: Optional[str]) -> None:
+        """Create the run, or mark an existing one as running again."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                """
+                INSERT INTO runs VALUES (?, ?, 'running', ?, ?)
+                ON CONFLICT (run_id) DO UPDATE SET status = 'running', updated_at = excluded.updated_at
+                """,
+                (run_id, message, now, now),
+            )
+            conn.commit()
+
+    def finish_run(self, run_id: str, status: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?", (status, time.time(), run_id)
+            )
+            conn.commit()
+
+    def run_message(self, run_id: str) -> Optional[str]:
+        """The input message a run was started with, or None for an unknown run."""
+        with self._lock:
+            row = self._connect().execute("SELECT message FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, run_id: str, step: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT content FROM run_steps WHERE run_id = ? AND step = ?", (run_id, step)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, run_id: str, step: str, content: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO run_steps VALUES (?, ?, ?, ?)", (run_id, step, content, time.time())
+            )
+            conn.commit()
+
+    def prune(self, run_id: str, keep: list[str], keep_parts_of: Optional[str] = None) -> int:
+        """Delete a run's stored steps except `keep` and the researchers stored under `keep_parts_of`."""
+        placeholders = ",".join("?" for _ in keep)
+        with self._lock:
+            conn = self._connect()
+            cur = conn.execute(
+                f"DELETE FROM run_steps WHERE run_id = ? AND step NOT IN ({placeholders}) AND step NOT LIKE ?",
+                (run_id, *keep, f"{keep_parts_of}/%" if keep_parts_of else ""),
+            )
+            conn.commit()
+        return max(cur.rowcount, 0)
+
+    def steps(self, run_id: str) -> list[str]:
+        """Names of the stored steps of a run, oldest first."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT step FROM run_steps WHERE run_id = ? ORDER BY created_at", (run_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+# Shared process-wide run store used by the workflow
+run_store = RunStore()
+
+
+def _completed(output: StepOutput) -> bool:
+    if not output.success or output.content is None:
+        return False
+    return all(part.success for part in (output.parallel_step_outputs or {}).values())
+
+
+@dataclass
+class _RunState:
+    """Checkpoint state of one workflow run."""
+
+    run_id: str
+    reusing: bool = False
+    resume_step: Optional[str] = None
+    current_step: Optional[str] = None
+    restored: list[str] = field(default_factory=list)
+    token: Optional[contextvars.Token] = None
+
+
+class RunCheckpoint:
+    """
+    Checkpoint state of the workflow run in progress.
+
+    While a resumed run is still before its first incomplete step, `restore` returns stored outputs; from that
+    step on every step runs again, except the researchers of that step that were stored individually.
+    The state of each run lives in a context variable, so overlapping runs of one workflow (e.g. the API
+    server's shared instance) never store steps under each other's run id.
+    """
+
+    def __init__(self, store: RunStore = run_store):
+        self.store = store
+        self._state: contextvars.ContextVar[Optional[_RunState]] = contextvars.ContextVar(
+            "run_checkpoint", default=None
+        )
+
+    @property
+    def run_id(self) -> Optional[str]:
+        state = self._state.get()
+        return state.run_id if state else None
+
+    @property
+    def resume_step(self) -> Optional[str]:
+        state = self._state.get()
+        return state.resume_step if state else None
+
+    @property
+    def restored(self) -> list[str]:
+        state = self._state.get()
+        return list(state.restored) if state else []
+
+    def begin(self, run_id: str, message: Any = None, resume: bool = False) -> Any:
+        """
+        Start checkpointing a run in the current context; `finish` ends it.
+
+        Args:
+            run_id (str): Run id the outputs are stored under.
+            message (Any): The run's input message; None on resume reuses the stored one.
+            resume (bool): Reuse the outputs already stored for `run_id`.
+
+        Returns:
+            Any: The message to run the workflow with.
+        """
+        state = _RunState(run_id=run_id, reusing=resume)
+        state.token = self._state.set(state)
+        if resume:
+            stored = self.store.run_message(run_id)
+            if message is None:
+                message = stored
+            elif isinstance(message, str) and stored is not None and message != stored:
+                logger.warning(f"[Checkpoint] Resuming run {run_id} with a different message than it started with")
+            done = self.store.steps(run_id)
+            logger.info(f"[Checkpoint] Resuming run {run_id}; stored steps: {done or 'none'}")
+        self.store.start_run(run_id, message if isinstance(message, str) else None)
+        return message
+
+    def finish(self, status: str) -> None:
+        """Record the run's final status and leave its context."""
+        state = self._state.get()
+        if state is None:
+            return
+        self.store.finish_run(state.run_id, status)
+        try:
+            self._state.reset(state.token)
+        except ValueError:
+            # Finished from another context (e.g. a stream consumed elsewhere)
+            self._state.set(None)
+
+    def restore(self, step: str) -> Optional[str]:
+        """Stored output of `step` while the run is still reusing outputs, else None."""
+        state = self._state.get()
+        if state is None:
+            return None
+        state.current_step = step
+        if not state.reusing:
+            return None
+        content = self.store.load(state.run_id, step)
+        if content is not None:
+            state.restored.append(step)
+            return content
+        # First incomplete step: it and everything after it run again, so later outputs are stale
+        state.reusing = False
+        state.resume_step = step
+        stale = self.store.prune(state.run_id, keep=state.restored, keep_parts_of=step)
+        logger.info(f"[Checkpoint] Run {state.run_id} resumes at step '{step}' ({stale} stale outputs dropped)")
+        return None
+
+    def save(self, step: str, output: StepOutput) -> None:
+        """Store a step output if the step completed."""
+        state = self._state.get()
+        if state is not None and _completed(output):
+            self.store.save(state.run_id, step, str(output.content))
+
+    def restore_part(self, part: str) -> Optional[str]:
+        """Stored output of one researcher of the step the run resumed at, else None."""
+        state = self._state.get()
+        if state is None or state.current_step is None or state.current_step != state.resume_step:
+            return None
+        return self.store.load(state.run_id, f"{state.current_step}/{part}")
+
+    def save_part(self, part: str, content: Any) -> None:
+        state = self._state.get()
+        if state is not None and state.current_step is not None and content is not None:
+            self.store.save(state.run_id, f"{state.current_step}/{part}", str(content))
+
+
+class CheckpointedStep(Step):
+    """Workflow step that returns its stored output on resume and stores its output when it completes."""
+
+    def __init__(self, *args, checkpoint: RunCheckpoint, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkpoint = checkpoint
+
+    def _restored(self) -> Optional[StepOutput]:
+        content = self.checkpoint.restore(self.name)
+        if content is None:
+            return None
+        logger.info(f"[Checkpoint] Reusing stored output of step '{self.name}'")
+        return StepOutput(
+            step_name=self.name,
+            executor_name=self.executor_name,
+            executor_type=self.executor_type,
+            content=content,
+        )
+
+    def execute(self, step_input: StepInput, session_id: Optional[str] = None, user_id: Optional[str] = None):
+        output = self._restored()
+        if output is None:
+            output = super().execute(step_input, session_id=session_id, user_id=user_id)
+            self.checkpoint.save(self.name, output)
+        return output
+
+    async def aexecute(self, step_input: StepInput, session_id: Optional[str] = None, user_id: Optional[str] = None):
+        output = self._restored()
+        if output is None:
+            output = await super().aexecute(step_input, session_id=session_id, user_id=user_id)
+            self.checkpoint.save(self.name, output)
+        return output
+
+    def execute_stream(self, step_input: StepInput, *args, **kwargs):
+        output = self._restored()
+        if output is not None:
+            yield output
+            return
+        for event in super().execute_stream(step_input, *args, **kwargs):
+            if isinstance(event, StepOutput):
+                self.checkpoint.save(self.name, event)
+            yield event
+
+    async def aexecute_stream(self, step_input: StepInput, *args, **kwargs):
+        output = self._restored()
+        if output is not None:
+            yield output
+            return
+        async for event in super().aexecute_stream(step_input, *args, **kwargs):
+            if isinstance(event, StepOutput):
+                self.checkpoint.save(self.name, event)
+            yield event
@@ -0,0 +1,328 @@
+# synthesis.py
+
+"""
+Synthesis step that assembles the researcher essays into one article in code.
+- Each successful researcher's text is copied verbatim under a `##` heading: its leading `#` title if it has one,
+  else the subtopic's topic from the adviser plan. All of its other headings are demoted by one level.
+- Introduction/Conclusion sections inside researcher texts are dropped, and their References/Bibliography
+  sections are merged into one `# References` list at the end by chains/references.py (DOI/URL/author-year
+  de-duplication, alphabetical order, numbered in-text citations rewritten to match).
+- The Supervisor agent only writes the title, Introduction and Conclusion (250-350 words each) from the
+  assembled body, so the merged text is never regenerated, truncated or paraphrased by the model.
+- If no researcher produced usable output, the step explains why instead of calling the model.
+- The Cleanup step (CleanupEditor) proof-reads only the model-written title, Introduction and Conclusion and
+  splices them back; the researcher sections and the reference list are not sent to the model again.
+- Each researcher section is cut to DEEP_SEARCH_FRAMING_CONTEXT_CHARS characters (default: 12000) in the
+  Supervisor's prompt; the article itself always keeps the full text.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from agno.utils.log import logger
+from agno.workflow.v2 import StepInput, StepOutput
+
+from chains.references import ReferenceList, split_entries
+from chains.research_phase import parse_plan
+
+try:
+    FRAMING_CONTEXT_CHARS = int(os.getenv("DEEP_SEARCH_FRAMING_CONTEXT_CHARS", "12000"))
+except (TypeError, ValueError):
+    FRAMING_CONTEXT_CHARS = 12000
+
+RESULT_HEADING = re.compile(r"^### (✅ SUCCESS|❌ FAILURE): (.+?)\s*$", re.MULTILINE)
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE = re.compile(r"^\s*(```|~~~)")
+# "**References**" or "References:" on a line of its own
+PSEUDO_HEADING = re.compile(r"^\s*(?:\*\*|__)?([A-Za-z][A-Za-z ]{2,30}?)(?:\*\*|__)?\s*:?\s*$")
+SECTION_NUMBER = re.compile(r"^(?:\d+(?:\.\d+)*\.?|[IVX]+\.)\s+")
+FRAMING_TITLES = ("introduction", "conclusion", "conclusions", "concluding remarks", "summary and conclusions")
+REFERENCE_TITLES = ("references", "reference list", "bibliography", "works cited", "sources", "citations")
+AGENT_NUMBER = re.compile(r"(\d+)\s*$")
+INTRO_HEADING = re.compile(r"^#{1,3}\s*introduction\s*$", re.IGNORECASE | re.MULTILINE)
+CONCLUSION_HEADING = re.compile(r"^#{1,3}\s*conclusions?\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+def _title_key(text: str) -> str:
+    text = SECTION_NUMBER.sub("", text.strip().strip("*_").strip())
+    return text.rstrip(":").strip().lower()
+
+
+@dataclass
+class ResearchSection:
+    """One researcher's contribution, split into its parts."""
+
+    name: str
+    success: bool
+    text: str
+    title: Optional[str] = None
+    body: str = ""
+    references: list[str] = field(default_factory=list)
+
+
+def split_research(content: str) -> list[ResearchSection]:
+    """Split the Research Phase output ("### ✅ SUCCESS: Agent N" sections) into one entry per researcher."""
+    matches = list(RESULT_HEADING.finditer(content or ""))
+    if not matches:
+        return [ResearchSection(name="Agent 1", success=bool((content or "").strip()), text=content or "")]
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        text = content[match.end() : end].strip("\n")
+        success = match.group(1).startswith("✅") and text.strip() not in ("", "*(No content)*")
+        sections.append(ResearchSection(name=match.group(2), success=success, text=text))
+    return sections
+
+
+def restructure(section: ResearchSection) -> ResearchSection:
+    """
+    Take the title, body and references out of a researcher's text.
+
+    The leading level-1 heading becomes the title; remaining headings are demoted one level; Introduction and
+    Conclusion sections are dropped; References sections are collected (blockquoted warnings stay in the body).
+    Fenced code blocks are copied untouched.
+    """
+    body: list[str] = []
+    reference_lines: list[str] = []
+    mode, mode_level = "body", 0
+    in_fence = False
+    seen_text = False
+
+    for line in section.text.splitlines():
+        if FENCE.match(line):
+            in_fence = not in_fence
+        heading = None if in_fence else HEADING.match(line)
+        if heading is None and not in_fence and mode == "body":
+            pseudo = PSEUDO_HEADING.match(line)
+            if pseudo and _title_key(pseudo.group(1)) in REFERENCE_TITLES:
+                mode, mode_level = "references", 7
+                continue
+
+        if heading is not None:
+            level, text = len(heading.group(1)), heading.group(2)
+            if mode != "body" and level <= mode_level:
+                mode = "body"
+            if mode == "body":
+                key = _title_key(text)
+                if level == 1 and not seen_text and section.title is None:
+                    section.title = text.strip()
+                    seen_text = True
+                    continue
+                if key in REFERENCE_TITLES:
+                    mode, mode_level = "references", level
+                    continue
+                if key in FRAMING_TITLES:
+                    mode, mode_level = "skip", level
+                    continue
+                body.append(f"{'#' * min(level + 1, 6)} {text}")
+                seen_text = True
+            # Sub-headings of a dropped or references section go with it
+            continue
+
+        if mode == "references" and line.lstrip().startswith(">"):
+            body.append(line)
+        elif mode == "references":
+            reference_lines.append(line)
+        elif mode == "body":
+            body.append(line)
+            seen_text = seen_text or bool(line.strip())
+
+    section.body = "\n".join(body).strip("\n")
+    section.references = split_entries(reference_lines)
+    return section
+
+
+def subtopic_titles(plan: Optional[dict]) -> dict[int, str]:
+    """Topic names by subtopic number from the adviser plan, without their "Subtopic N:" prefix."""
+    titles = {}
+    for key, value in (plan or {}).items():
+        match = re.match(r"^subtopic_(\d+)$", str(key))
+        if match and isinstance(value, dict) and value.get("topic"):
+            titles[int(match.group(1))] = re.sub(r"^subtopic\s*\d+\s*:\s*", "", str(value["topic"]), flags=re.I)
+    return titles
+
+
+def parse_framing(text: str) -> tuple[Optional[str], str, str]:
+    """Read (title, introduction, conclusion) from the Supervisor's reply."""
+    text = (text or "").strip()
+    intro = INTRO_HEADING.search(text)
+    outro = CONCLUSION_HEADING.search(text)
+    title_match = re.search(r"^#\s+(.+?)\s*$", text[: intro.start()] if intro else text, re.MULTILINE)
+    title = title_match.group(1).strip() if title_match else None
+    if intro is None:
+        logger.warning("[Synthesis] Supervisor reply has no Introduction heading, using it as the introduction")
+        return title, text, ""
+    if outro is None or outro.start() < intro.end():
+        return title, text[intro.end() :].strip(), ""
+    return title, text[intro.end() : outro.start()].strip(), text[outro.end() :].strip()
+
+
+class SynthesisCompiler:
+    """
+    Workflow step executor that compiles the researcher essays into one article.
+
+    Args:
+        framing_agent (Any): Agent that writes the title, Introduction and Conclusion.
+        research_step (str): Name of the step whose output holds the researcher essays.
+        planning_step (str): Name of the step whose output holds the adviser plan.
+        context_chars (int): Characters of each section shown to the framing agent.
+    """
+
+    def __init__(
+        self,
+        framing_agent: Any,
+        research_step: str = "Research Phase",
+        planning_step: str = "Planning",
+        context_chars: int = FRAMING_CONTEXT_CHARS,
+    ):
+        self.framing_agent = framing_agent
+        self.research_step = research_step
+        self.planning_step = planning_step
+        self.context_chars = context_chars
+
+    def framing_message(self, query: str, sections: list[ResearchSection]) -> str:
+        parts = [f"Research question: {query}", "", "Sections of the article, in order:"]
+        for section in sections:
+            body = section.body
+            if self.context_chars > 0 and len(body) > self.context_chars:
+                body = body[: self.context_chars] + "\n[... section continues ...]"
+            parts.append(f"\n## {section.title}\n{body}")
+        return "\n".join(parts)
+
+    @staticmethod
+    def consolidate(sections: list[ResearchSection]) -> str:
+        """Merge the sections' references and renumber their citations; returns the rendered list."""
+        references = ReferenceList()
+        ids = [references.add_section(section.references) for section in sections]
+        merged = references.finalize()
+        for section, section_id in zip(sections, ids):
+            section.body = references.renumber(section_id, section.body)
+        logger.info(
+            f"[Synthesis] {sum(len(section.references) for section in sections)} reference entries, "
+            f"{len(merged)} after de-duplication"
+        )
+        return references.render()
+
+    @staticmethod
+    def assemble(
+        title: str, introduction: str, conclusion: str, sections: list[ResearchSection], references: str
+    ) -> str:
+        """Join the framing sections, researcher sections and consolidated references into one document."""
+        parts = [f"# {title}", f"# Introduction\n{introduction}"]
+        parts += [f"## {section.title}\n\n{section.body}".rstrip() for section in sections]
+        if conclusion:
+            parts.append(f"# Conclusion\n{conclusion}")
+        if references:
+            parts.append(f"# References\n\n{references}")
+        return "\n\n".join(parts) + "\n"
+
+    def __call__(self, step_input: StepInput) -> StepOutput:
+        research = step_input.get_step_output(self.research_step)
+        content = research.content if research else step_input.previous_step_content
+        planning = step_input.get_step_output(self.planning_step)
+        plan = parse_plan(str(planning.content)) if planning and planning.content else None
+        query = step_input.get_message_as_string() or ""
+
+        sections = split_research(str(content or ""))
+        usable = [section for section in sections if section.success]
+        if not usable:
+            reasons = "\n".join(f"- {section.name}: {section.text.strip() or 'no output'}" for section in sections)
+            return StepOutput(
+                content=(
+                    "# Research could not be completed\n\n"
+                    f"None of the researchers produced usable content for: {query}\n\n{reasons}\n"
+                ),
+                success=False,
+                error="no researcher output",
+            )
+
+        titles = subtopic_titles(plan)
+        for position, section in enumerate(usable, start=1):
+            restructure(section)
+            if not section.title:
+                number = AGENT_NUMBER.search(section.name)
+                subtopic = int(number.group(1)) if number else position
+                section.title = titles.get(subtopic) or f"Subtopic {subtopic}"
+        skipped = [section.name for section in sections if not section.success]
+        if skipped:
+            logger.warning(f"[Synthesis] Leaving out failed researchers: {skipped}")
+        references = self.consolidate(usable)
+
+        response = self.framing_agent.run(message=self.framing_message(query, usable))
+        title, introduction, conclusion = parse_framing(str(response.content or ""))
+        title = title or (plan or {}).get("title") or query
+        logger.info(f"[Synthesis] Compiled {len(usable)} sections")
+        return StepOutput(
+            content=self.assemble(title, introduction, conclusion, usable, references),
+            response=response,
+        )
+
+
+def framing_spans(document: str) -> Optional[dict]:
+    """
+    Locate the model-written parts of a compiled article.
+
+    Returns:
+        Optional[dict]: (start, end) offsets of "title", "introduction" and "conclusion" (conclusion may be
+        missing), or None if the document has no `# Introduction` section.
+    """
+    intro = re.search(r"^# Introduction[ \t]*\n", document, re.MULTILINE)
+    if intro is None:
+        return None
+    spans = {}
+    title = re.match(r"# (.+)", document)
+    if title:
+        spans["title"] = title.span(1)
+    # The introduction runs up to the first researcher section (or the conclusion)
+    intro_end = re.compile(r"^#{1,2} ", re.MULTILINE).search(document, intro.end())
+    spans["introduction"] = (intro.end(), intro_end.start() if intro_end else len(document))
+    conclusion = re.compile(r"^# Conclusion[ \t]*\n", re.MULTILINE).search(document, spans["introduction"][1])
+    if conclusion:
+        conclusion_end = re.compile(r"^# ", re.MULTILINE).search(document, conclusion.end())
+        spans["conclusion"] = (conclusion.end(), conclusion_end.start() if conclusion_end else len(document))
+    return spans
+
+
+class CleanupEditor:
+    """
+    Workflow step executor that has an agent edit the title, Introduction and Conclusion of the compiled
+    article and leaves everything else untouched.
+
+    Args:
+        editor_agent (Any): Agent that proof-reads the framing sections.
+    """
+
+    def __init__(self, editor_agent: Any):
+        self.editor_agent = editor_agent
+
+    def __call__(self, step_input: StepInput) -> StepOutput:
+        document = str(step_input.previous_step_content or "")
+        spans = framing_spans(document)
+        if spans is None:
+            logger.info("[Cleanup] No compiled introduction found, passing the document through")
+            return StepOutput(content=document)
+
+        parts = {name: document[start:end].strip() for name, (start, end) in spans.items()}
+        headings = re.findall(r"^## (.+)$", document, re.MULTILINE)
+        message = (
+            f"# {parts.get('title', '')}\n\n## Introduction\n{parts['introduction']}\n\n"
+            f"## Conclusion\n{parts.get('conclusion', '')}\n\n"
+            "Section headings of the article, in order:\n" + "\n".join(f"- {h}" for h in headings)
+        )
+        response = self.editor_agent.run(message=message)
+        reply = str(response.content or "")
+        if not INTRO_HEADING.search(reply):
+            logger.warning("[Cleanup] Editor reply has no Introduction heading, keeping the compiled text")
+            return StepOutput(content=document, response=response)
+
+        title, introduction, conclusion = parse_framing(reply)
+        edited = {"title": title, "introduction": introduction, "conclusion": conclusion}
+        # Splice from the end so earlier offsets stay valid
+        for name, (start, end) in sorted(spans.items(), key=lambda item: item[1][0], reverse=True):
+            if not edited.get(name):
+                continue
+            replacement = edited[name] if name == "title" else f"{edited[name]}\n\n"
+            document = document[:start] + replacement + document[end:]
+        return StepOutput(content=document, response=response)
@@ -11,7 +11,14 @@ def get_adviser_description() -> str:
     """)
 
 
-def get_adviser_instructions(query, citation_style) -> str:
+def get_adviser_instructions(query, citation_style, min_subtopics: int = 3, max_subtopics: int = 3) -> str:
+    if min_subtopics >= max_subtopics:
+        subtopic_count = f"exactly {max_subtopics} subtopics"
+    else:
+        subtopic_count = (
+            f"between {min_subtopics} and {max_subtopics} subtopics (use fewer for a narrow, well-defined topic "
+            f"and more for a broad one; each subtopic is researched separately)"
+        )
     return dedent(f"""
 You are a research adviser with broad expertise across scientific, technical, and industry domains. Your goal is to help decision-makers, researchers, and innovators identify important subtopics for further investigation, highlighting key questions, gaps, and opportunities.
 
@@ -24,7 +31,7 @@ You are a research adviser with broad expertise across scientific, technical, an
     - Pinpoint important discussion points, open questions, knowledge gaps, and opportunities for impact.
     - Consider implications for research, innovation, policy, and practice.
 
-3. Output JSON with exactly 3 subtopics, each containing:
+3. Output JSON with {subtopic_count}, numbered subtopic_1, subtopic_2, ... in order, each containing:
     - topic (a clear and descriptive name for the research area)
     - key_ideas (list of general guide questions or points to address, e.g.):
         - What are the main challenges and opportunities in this subtopic?
@@ -39,7 +46,7 @@ You are a research adviser with broad expertise across scientific, technical, an
         - Provide balanced analysis of strengths, limitations, and opportunities.
     - word_count (string)
 
-4. Output ONLY the JSON file in the format below. Do not include any explanations, extra text, or formatting. The output must be valid JSON and match the structure exactly.
+4. Output ONLY the JSON file in the format below. Do not include any explanations, extra text, or formatting. The output must be valid JSON and match the structure exactly. The example shows three subtopics; include as many as step 3 asks for.
 {{
   "title": "Topic Title",
   "citation_style": "{citation_style}",
@@ -99,6 +106,7 @@ def get_researcher_instructions(subtopic_index: Optional[int] = None) -> str:
     - Prioritize research from the **past 5 years**; if insufficient, extend to the **past 10 years**. If no recent research is available, clearly state this and justify the use of older sources.
     - **Critically appraise the quality of each source**: Distinguish between randomized controlled trials (RCTs), meta-analyses, systematic reviews, observational studies, case reports, and non-scholarly/media sources. Clearly indicate the type and strength of evidence for each major claim.
     - Prefer fewer, higher-quality sources over numerous low-impact or tangential ones.
+    - Use `search_local_corpus` to reuse documents already saved locally instead of searching the web for them again; it answers immediately when nothing is saved.
 
     ## 3. Adherence to Provided Guidelines
     - Strictly follow the **key ideas** and **writing guidelines** for your subtopic.
@@ -165,86 +173,46 @@ def get_researcher_instructions(subtopic_index: Optional[int] = None) -> str:
 
 def get_supervisor_instructions() -> str:
     """
-    Returns enhanced instructions for the Supervisor agent responsible for compiling research outputs.
-    The output must be a journal-style article, using Markdown formatting for clarity and professionalism.
-    - All researcher outputs must be included in full, in order.
-    - Aggregate and rewrite introduction, conclusion, and references.
-    - Ensure the final document is cohesive, well-structured, and suitable for publication.
-    - Output format: Markdown document with clear journal-like sections and hierarchy.
+    Returns instructions for the Supervisor agent, which writes the framing of the compiled article.
+    The researcher sections are assembled, heading-demoted and given a consolidated reference list in code
+    (chains/synthesis.py); the Supervisor only writes the title, Introduction and Conclusion.
     """
     return dedent("""
     # Supervisor Agent Instructions
 
-Your function is to act as a **structural compiler**, not a content creator. You will assemble multiple expert research documents into a single, cohesive manuscript. Your primary task is to perform a series of explicit, mechanical steps to merge and format these documents.
-
-**Absolute Constraints & Prohibitions:**
--   **VERBATIM COPY ONLY:** You are **explicitly forbidden** from summarizing, paraphrasing, shortening, or altering the core text from the researcher outputs. The content from each researcher must be copied **character-for-character** into the final document. This is the most critical instruction.
--   **NO TRANSITIONAL PHRASES:** Do not add any connecting sentences or "glue text" between researcher sections. The document should flow directly from one researcher's section to the next.
--   **ORIGINAL CONTENT IS LIMITED:** Your *only* original written contributions are the **Introduction** and **Conclusion** sections. All other text must be a direct copy from the source materials.
-
----
-
-### Detailed Step-by-Step Workflow
-
-**Step 1: Verbatim Ingestion & Sectioning**
-1.  For each researcher's output provided to you, perform a **direct copy-paste** of their entire main text.
-    HOWEVER. IF THE AGENTS WERE NOT ABLE TO CREATE A RESPONSE (due to lack of infromation or unable to access those sites), DO NOT COPY AND PASTE. INSTEAD PROVIDE A RESPONSE TO THE USER EXPLAINING THE SITUATION. 
-    IF THERE IS NOT SUFFICIENT INFORMATION (AS MENTIONED BY THE AGENTS/RESEARCHERS), THERE IS NO NEED TO PROCEED TO THE REST OF THE STEPS BELOW. JUST PROVIDE AN APPROPRIATE RESPONSE.
-2.  Create a Level 2 Markdown heading (`##`) for each researcher's section.
-3.  **Heading Rule:**
-    -   If the researcher's text begins with a Level 1 heading (e.g., `# A Study of X`), use that text for the `##` heading.
-    -   If there is no initial heading, create a generic one: `## [Agent's Role or Topic, if known]`. DO NOT MENTION THE WORD "RESEARCHER" or "AGENT"
-
-**Step 2: Hierarchical Heading Demotion**
--   After pasting each researcher's content, you **must** demote all of their internal Markdown headings by one level to maintain document structure. This is a non-negotiable formatting rule.
-    -   `#` becomes `##`
-    -   `##` becomes `###`
-    -   `###` becomes `####`
-
-**Step 3: Composition of New Framing Sections**
--   **Write a New Introduction (250-350 words):** Based on the full content you have just ingested, write a new introduction that serves as a preface for the combined work. It must:
-    1.  State the central theme or research question.
-    2.  Briefly introduce the distinct perspective or sub-topic that each subsequent researcher section will cover, acting as a "roadmap" for the reader.
--   **Write a New Conclusion (250-350 words):** After all researcher sections, write a new conclusion that synthesizes the key takeaways. It must:
-    1.  Summarize the most important findings from each expert contribution.
-    2.  Discuss the combined implications and highlight any convergences or divergences in the findings.
-    3.  Propose clear directions for future research.
-
-**Step 4: Reference Consolidation & Formatting**
-1.  Extract all bibliographic entries from every source document.
-2.  Compile them into a single list under a final `# References` heading.
-3.  **De-duplicate** the list, ensuring each source appears only once.
-4.  **Format** the entire list using a consistent citation style (e.g., APA 7th Edition) and sort it alphabetically.
-
-**Step 5: Final Quality Control**
--   **Remove Redundancies:** Delete any pre-existing "Introduction" or "Conclusion" sections found within the individual researcher outputs. Your newly written sections are the definitive ones for the final article.
--   **Verify Completeness:** Scan the final document to ensure no part of the original researcher texts has been accidentally omitted. The final word count should be the sum of the original texts plus your ~600 words for the intro/conclusion.
-
----
-
-### Final Output Structure (Template)
-
-Your final output must be a single Markdown file adhering strictly to this structure:
-
-```markdown
-# [A Comprehensive Title for the Full Article]
-
-# Introduction
-(Your newly generated 250-350 word introduction)
-
-## [Title from Researcher 1's Output or Placeholder]
-(The full, verbatim, character-for-character text from Researcher 1, with its headings demoted)
-
-## [Title from Researcher 2's Output or Placeholder]
-(The full, verbatim, character-for-character text from Researcher 2, with its headings demoted)
-
-... (Repeat for all other researchers) ...
-
-# Conclusion
-(Your newly generated 250-350 word conclusion)
-
-# References
-(The single, consolidated, de-duplicated, and alphabetized reference list)
+    You receive the research question and the sections of a compiled research article, in order, each under a
+    `##` heading. The sections are final and will be published exactly as they are. Your only task is to write
+    the framing of the article.
+
+    ## What to Write
+    1. **Title:** One comprehensive title for the full article.
+    2. **Introduction (250-350 words):**
+        - State the central theme or research question.
+        - Briefly introduce the perspective or sub-topic each section covers, in order, as a roadmap for the reader.
+    3. **Conclusion (250-350 words):**
+        - Summarize the most important findings of each section.
+        - Discuss the combined implications and highlight convergences or divergences between the sections.
+        - Propose clear directions for future research.
+
+    ## Rules
+    - Base every statement on the sections you were given. Do not introduce new facts, figures or sources.
+    - Cite a source only as it is cited in the sections (same author-year or number).
+    - Do not refer to "researchers", "agents" or "sections provided to you"; write as the article's author.
+    - If the sections state that there was not enough information to research the question, say so plainly in
+      the Introduction and Conclusion instead of inventing content.
+    - Do not repeat, rewrite or summarize the sections outside the Introduction and Conclusion, and do not write
+      a References list.
+
+    ## Output Format
+    Reply with exactly this Markdown and nothing else:
+
+    # [Title]
+
+    ## Introduction
+    (250-350 words)
+
+    ## Conclusion
+    (250-350 words)
     """)
 
 
@@ -252,29 +220,36 @@ Your final output must be a single Markdown file adhering strictly to this struc
 # Supervisor 2 Agent Prompt
 def get_supervisor2_instructions() -> str:
     """
-    Returns instructions for the secondary supervisor agent responsible for proof-reading and editing
-    the output from the main supervisor. The agent must not summarize, shorten, or reformat content,
-    but only merge and deduplicate introductions, conclusions, and references as specified.
+    Returns instructions for the secondary supervisor agent, which proof-reads the model-written parts of the
+    compiled article. Section assembly, de-duplication of introductions/conclusions and the reference list are
+    handled in code (chains/synthesis.py, chains/references.py), so the agent only sees the title, Introduction
+    and Conclusion.
     """
     return dedent("""
     # Secondary Supervisor Agent Instructions
 
-    You are a secondary supervisor tasked with proof-reading and editing the output from the main supervisor. Your role is to edit only as specified below, without summarizing, shortening, reformatting, or restructuring the document.
+    You are a secondary supervisor proof-reading the title, Introduction and Conclusion of a research article.
+    The body sections and the reference list are final and are not shown to you; you receive only their headings.
 
     ## Instructions
 
-    1. **Do NOT summarize, shorten, or reformat any content. Only edit as specified below.**
-    2. **If there are multiple introductions, conclusions, or references, remove duplicates so that:**
-        - Only one Introduction remains at the start.
-        - Only one Conclusion remains at the end.
-        - Only one References section remains at the end, containing all merged references.
-    3. **Merge all references from throughout the document into a single References section at the end. Remove any references lists found elsewhere in the text.**
-    4. **Do NOT omit, alter, or move any part of the main body of the researchers’ outputs.**
-    5. **If any section (Introduction, Conclusion, References) is missing, do not add or generate new content for it.**
-    6. **The final output must be the complete, edited document with your revisions applied. Do not return partial results.**
-    7. **The resulting document should be very long—thousands of words.**
-
-    **Follow all instructions exactly. Do not skip or add any steps.**
+    1. Correct grammar, spelling, punctuation and awkward phrasing.
+    2. Improve clarity and flow; make sure the Introduction's roadmap follows the order of the section headings.
+    3. Remove repetition between the Introduction and the Conclusion.
+    4. **Do NOT add new facts, figures or sources, and do NOT change, add or remove citations.**
+    5. Keep each section between 250 and 350 words.
+    6. Keep the title unless it is inaccurate or ungrammatical.
+
+    ## Output Format
+    Reply with exactly this Markdown and nothing else:
+
+    # [Title]
+
+    ## Introduction
+    (edited introduction)
+
+    ## Conclusion
+    (edited conclusion)
     """)
 
 
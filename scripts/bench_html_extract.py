@@ -0,0 +1,142 @@
+# scripts/bench_html_extract.py
+
+"""
+Micro-benchmark for the HTML extraction backends in tools/html_extract.py.
+
+Pages are read from the given files/directories (default: scripts/tmp/pages). Files containing
+DuckDuckGo `result__a` links are benchmarked with extract_result_links, everything else with
+extract_paragraphs. Use --fetch-query / --fetch-url to save fresh pages into the pages folder first.
+If no pages are found, synthetic DDG result and article pages are generated so the benchmark still runs.
+
+Usage:
+    uv run scripts/bench_html_extract.py [PATH ...] [--repeat 50] [--json results.json]
+    uv run scripts/bench_html_extract.py --fetch-query "graphene sensors site:nature.com" --fetch-url https://example.org/article
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from urllib.parse import quote_plus
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.html_extract import (
+    BACKENDS,
+    RESULT_LINK_CLASS,
+    available_backends,
+)
+
+DEFAULT_PAGES_DIR = CURRENT_DIR / "tmp" / "pages"
+LINKS_LIMIT = 15
+PREVIEW_CHARS = 500
+
+
+def synthetic_pages() -> dict[str, str]:
+    """Build a DDG-like result page and a long article page."""
+    results = "".join(
+        f'<div class="result"><h2 class="result__title">'
+        f'<a rel="nofollow" class="result__a" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.org%2F{i}">'
+        f"Result <b>{i}</b> title</a></h2>"
+        f'<a class="result__snippet">{"snippet text " * 20}</a></div>'
+        for i in range(30)
+    )
+    ddg = f"<html><head>{'<script>var x=1;</script>' * 50}</head><body>{results}</body></html>"
+    paragraphs = "".join(
+        f"<p>Paragraph {i} {'lorem ipsum dolor sit amet ' * 15}</p><div>{'<span>nav</span>' * 10}</div>"
+        for i in range(300)
+    )
+    article = f"<html><head>{'<style>.a{{}}</style>' * 50}</head><body>{paragraphs}</body></html>"
+    return {"synthetic_ddg.html": ddg, "synthetic_article.html": article}
+
+
+def load_pages(paths: list[str]) -> dict[str, str]:
+    files: list[Path] = []
+    for raw in paths or [str(DEFAULT_PAGES_DIR)]:
+        path = Path(raw)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix in (".html", ".htm")))
+        elif path.is_file():
+            files.append(path)
+    pages = {p.name: p.read_text(encoding="utf-8", errors="replace") for p in files}
+    if not pages:
+        print("[INFO] No saved pages found, using synthetic pages.")
+        pages = synthetic_pages()
+    return pages
+
+
+def fetch_pages(queries: list[str], urls: list[str], out_dir: Path) -> None:
+    from tools.http_client import http_client
+    from tools.site_search import DDG_HTML_URL
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    targets = [(f"ddg_{i}.html", f"{DDG_HTML_URL}?q={quote_plus(q)}") for i, q in enumerate(queries)]
+    targets += [(f"article_{i}.html", url) for i, url in enumerate(urls)]
+    for name, url in targets:
+        response = http_client.get(url)
+        response.raise_for_status()
+        (out_dir / name).write_text(response.text, encoding="utf-8")
+        print(f"[INFO] Saved {url} -> {out_dir / name}")
+
+
+def bench(fn, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction backends")
+    parser.add_argument("paths", nargs="*", help="HTML files or directories of saved pages")
+    parser.add_argument("--repeat", type=int, default=50, help="Iterations per backend and page")
+    parser.add_argument("--backends", nargs="*", default=None, help="Backends to compare (default: all available)")
+    parser.add_argument("--json", type=str, default=None, help="Write machine-readable results to this file")
+    parser.add_argument("--fetch-query", action="append", default=[], help="Save a live DDG result page for this query")
+    parser.add_argument("--fetch-url", action="append", default=[], help="Save a live article page from this URL")
+    args = parser.parse_args()
+
+    if args.fetch_query or args.fetch_url:
+        fetch_pages(args.fetch_query, args.fetch_url, Path(args.paths[0]) if args.paths else DEFAULT_PAGES_DIR)
+
+    backends = args.backends or available_backends()
+    pages = load_pages(args.paths)
+    results = []
+
+    for name, html in pages.items():
+        kind = "results" if RESULT_LINK_CLASS in html else "article"
+        print(f"\n{name} ({kind}, {len(html) / 1024:.1f} KiB)")
+        print(f"  {'backend':<12}{'mode':<10}{'mean ms':>10}{'median ms':>12}{'items':>8}")
+        for backend in backends:
+            links_fn, paragraphs_fn = BACKENDS[backend]
+            if kind == "results":
+                modes = {"limit": lambda: links_fn(html, LINKS_LIMIT), "full": lambda: links_fn(html, 10**9)}
+            else:
+                modes = {
+                    "preview": lambda: paragraphs_fn(html, 40, PREVIEW_CHARS),
+                    "full": lambda: paragraphs_fn(html, 40, None),
+                }
+            for mode, fn in modes.items():
+                stats = bench(fn, args.repeat)
+                items = len(fn())
+                print(f"  {backend:<12}{mode:<10}{stats['mean_ms']:>10}{stats['median_ms']:>12}{items:>8}")
+                results.append({"page": name, "kind": kind, "backend": backend, "mode": mode, "items": items, **stats})
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n[INFO] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# scripts/bench_tools.py
+
+"""
+Benchmark for the network-bound tool methods against the local stub server (scripts/stub_server.py).
+
+Covers SciResTool.search_journal_sites, PhilippinesSearchTool.search_government_and_news_sites,
+WebScraperTool.scrape_urls and FileDownloaderTool.download_files. For every tool and concurrency level
+(simulated researchers, each with its own toolkit instance calling the tool --calls times in a row) it reports
+calls/sec, p50/p95/p99 call latency, bytes served by the stub, CPU seconds spent parsing HTML
+(result-link and paragraph extraction) and seconds spent waiting on the shared rate limiter.
+
+Every call uses fresh queries and URLs, and the SERP cache, page cache and run-level URL de-duplication are
+disabled, so each call does real work. The rate limits and adaptive backoff stay as configured
+(TOOLS_RATE_LIMIT etc.); use --rate-limit to override the per-host rate for the run.
+
+Usage:
+    uv run scripts/bench_tools.py [--concurrency 1 3 10] [--calls 3] [--tools sci ph scrape download]
+                                  [--latency 0.05] [--error-rate 0.0] [--json bench_tools.json]
+    uv run scripts/bench_tools.py --stub-url http://127.0.0.1:8900   # use an already running stub
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+TOOLS = ("sci", "ph", "scrape", "download")
+PAGE_HOSTS = ("nature.com", "inquirer.net", "sciencedirect.com", "rappler.com", "arxiv.org", "gov.ph")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class ParseTimer:
+    """Accumulates per-thread CPU time spent inside wrapped parsing functions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds = 0.0
+
+    def wrap(self, fn):
+        def timed(*args, **kwargs):
+            start = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.thread_time() - start
+                with self._lock:
+                    self.seconds += elapsed
+
+        return timed
+
+    def take(self) -> float:
+        with self._lock:
+            seconds, self.seconds = self.seconds, 0.0
+        return seconds
+
+
+def stub_stats(stub_url: str) -> dict:
+    with urllib.request.urlopen(f"{stub_url}/stats", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def start_stub(args) -> tuple[subprocess.Popen, str]:
+    """Launch scripts/stub_server.py on a free port and wait until it answers."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    command = [
+        sys.executable,
+        str(CURRENT_DIR / "stub_server.py"),
+        "--port", str(port),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--throttle-rate", str(args.throttle_rate),
+        "--cassettes", args.cassettes,
+        "--seed", "1",
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            stub_stats(url)
+            return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("stub server did not start")
+
+
+def make_calls(tool: str, download_dir: Path, nonce: str, urls_per_call: int):
+    """Return (factory for one researcher's toolkit, function running call i on it)."""
+    from tools.download_team import FileDownloaderTool, WebScraperTool
+    from tools.philippines_search_tool import PhilippinesSearchTool
+    from tools.sci_paper_search_tool import SciResTool
+
+    if tool == "sci":
+        return SciResTool, lambda t, r, i: t.search_journal_sites(f"graphene sensors {nonce} r{r} c{i}")
+    if tool == "ph":
+        return PhilippinesSearchTool, lambda t, r, i: t.search_government_and_news_sites(
+            f"flood control {nonce} r{r} c{i}"
+        )
+    if tool == "scrape":
+        return WebScraperTool, lambda t, r, i: t.scrape_urls(
+            [
+                f"https://{PAGE_HOSTS[k % len(PAGE_HOSTS)]}/bench/{nonce}/r{r}/c{i}/{k}"
+                for k in range(urls_per_call)
+            ]
+        )
+    return (
+        lambda: FileDownloaderTool(download_dir=str(download_dir / f"{time.monotonic_ns()}")),
+        lambda t, r, i: t.download_files(
+            [
+                f"https://{PAGE_HOSTS[k % len(PAGE_HOSTS)]}/files/{nonce}-r{r}-c{i}-{k}.pdf"
+                for k in range(urls_per_call)
+            ]
+        ),
+    )
+
+
+def run_level(tool: str, researchers: int, calls: int, args, stub_url: str, timer: ParseTimer, download_dir: Path):
+    from tools.rate_limiter import rate_limiter
+
+    factory, call = make_calls(tool, download_dir, f"{time.time_ns():x}", args.urls)
+    toolkits = [factory() for _ in range(researchers)]
+    latencies: list[float] = []
+    failures = 0
+    lock = threading.Lock()
+
+    def researcher(r: int) -> None:
+        nonlocal failures
+        for i in range(calls):
+            start = time.perf_counter()
+            try:
+                output = call(toolkits[r], r, i)
+                failed = not output or output.lstrip().startswith("❌")
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                failures += failed
+
+    before_stub, before_wait = stub_stats(stub_url), rate_limiter.total_wait()
+    timer.take()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    threads = [threading.Thread(target=researcher, args=(r,)) for r in range(researchers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    after_stub = stub_stats(stub_url)
+
+    total = len(latencies)
+    return {
+        "tool": tool,
+        "concurrency": researchers,
+        "calls": total,
+        "failed_calls": failures,
+        "wall_s": round(wall, 3),
+        "calls_per_s": round(total / wall, 3) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0,
+        "requests": after_stub.get("requests", 0) - before_stub.get("requests", 0),
+        "bytes": after_stub.get("bytes", 0) - before_stub.get("bytes", 0),
+        "parse_cpu_s": round(timer.take(), 4),
+        "process_cpu_s": round(cpu, 4),
+        "limiter_wait_s": round(rate_limiter.total_wait() - before_wait, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the search, scrape and download tools against a stub server")
+    parser.add_argument("--tools", nargs="*", choices=TOOLS, default=list(TOOLS))
+    parser.add_argument("--concurrency", nargs="*", type=int, default=[1, 3, 10], help="Simulated researchers")
+    parser.add_argument("--calls", type=int, default=3, help="Calls per researcher")
+    parser.add_argument("--urls", type=int, default=5, help="URLs per scrape_urls / download_files call")
+    parser.add_argument("--stub-url", default=None, help="Use a running stub server instead of starting one")
+    parser.add_argument("--cassettes", default="tmp/cassettes", help="Cassette directory for the started stub")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub latency per response (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Stub latency jitter (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub responses that are 503s")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of stub responses that are 429s")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Override TOOLS_RATE_LIMIT for the run")
+    parser.add_argument("--json", type=str, default=None, help="Write machine-readable results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Keep the tools' INFO logging")
+    args = parser.parse_args()
+
+    process = None
+    stub_url = args.stub_url
+    if stub_url is None:
+        process, stub_url = start_stub(args)
+
+    # The tools read their configuration at import time
+    os.environ["TOOLS_HTTP_STUB"] = stub_url
+    os.environ["TOOLS_HTTP_CASSETTE"] = "off"
+    os.environ["SERP_CACHE_ENABLED"] = "0"
+    os.environ["PAGE_CACHE_ENABLED"] = "0"
+    os.environ["TOOLS_RUN_DEDUP"] = "0"
+    if args.rate_limit is not None:
+        os.environ["TOOLS_RATE_LIMIT"] = str(args.rate_limit)
+
+    import tools.download_team as download_team
+    import tools.site_search as site_search
+    from agno.utils.log import logger
+
+    if not args.verbose:
+        logger.setLevel(logging.ERROR)
+
+    timer = ParseTimer()
+    site_search.parse_result_links = timer.wrap(site_search.parse_result_links)
+    download_team.ParagraphStream.feed = timer.wrap(download_team.ParagraphStream.feed)
+    download_team.ParagraphStream.close = timer.wrap(download_team.ParagraphStream.close)
+
+    download_dir = Path(tempfile.mkdtemp(prefix="bench_tools_"))
+    results = []
+    try:
+        print(
+            f"{'tool':<10}{'conc':>5}{'calls':>7}{'fail':>6}{'calls/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'KiB':>9}{'parse s':>9}{'wait s':>9}"
+        )
+        for tool in args.tools:
+            for researchers in args.concurrency:
+                row = run_level(tool, researchers, args.calls, args, stub_url, timer, download_dir)
+                results.append(row)
+                print(
+                    f"{tool:<10}{researchers:>5}{row['calls']:>7}{row['failed_calls']:>6}{row['calls_per_s']:>9}"
+                    f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['bytes'] / 1024:>9.0f}"
+                    f"{row['parse_cpu_s']:>9}{row['limiter_wait_s']:>9}"
+                )
+    finally:
+        shutil.rmtree(download_dir, ignore_errors=True)
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=5)
+
+    if args.json:
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {k: v for k, v in vars(args).items() if k != "json"},
+            "results": results,
+        }
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n[INFO] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# scripts/stub_server.py
+
+"""
+Local stub server for running the tools package offline (see tools/http_cassette.py).
+
+Point the tools at it with TOOLS_HTTP_STUB=http://127.0.0.1:8900; every request then arrives as
+GET /fetch?url=<original URL>. Answers, in order of preference:
+- the cassette recorded for the exact request (method + URL + Range / conditional headers),
+- any cassette recorded for the URL,
+- a deterministic synthetic page: a DuckDuckGo result page whose links are spread over the `site:`
+  domains in the query, an HTML article with an ETag (If-None-Match gets 304), or a file body for
+  .pdf/.txt/.csv/.md URLs (Range requests get 206).
+Latency (--latency, --jitter) and faults (--error-rate with --error-status, --throttle-rate answering
+429 with Retry-After) are injected before the answer. GET /stats returns request and byte counters as JSON.
+
+POST /v1/chat/completions is a stub model for offline workflow runs (set OPENAI_BASE_URL=http://127.0.0.1:8900/v1):
+it answers every request with a deterministic completion derived from the messages, never calls tools, and
+reports token usage estimated at 4 characters per token. Streaming requests get the same answer as one chunk.
+
+Record cassettes against the live sites first with TOOLS_HTTP_CASSETTE=record, or rely on synthetic pages.
+
+Usage:
+    uv run scripts/stub_server.py [--port 8900] [--cassettes tmp/cassettes] [--latency 0.05] [--jitter 0.02]
+                                  [--error-rate 0.05] [--throttle-rate 0.02] [--seed 1]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlsplit
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.http_cassette import CASSETTE_DIR, CassetteStore, cassette_key
+from tools.html_extract import RESULT_LINK_CLASS
+
+FILE_EXTENSIONS = {".pdf": "application/pdf", ".txt": "text/plain", ".csv": "text/csv", ".md": "text/markdown"}
+WORDS = (
+    "adaptive analysis bayesian catalysis climate coastal coordination data deep dynamics efficient evidence "
+    "flood graphene health impact kinetic learning ligand machine mangrove model network ocean policy "
+    "prediction protein quantum rainfall regional resilience robust sensor spectral survey synthesis "
+    "temporal typhoon urban variance watershed"
+).split()
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def _words(seed: str, count: int) -> str:
+    digest = _digest(seed)
+    return " ".join(WORDS[digest[i % len(digest)] % len(WORDS)] for i in range(count))
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, args):
+        super().__init__(address, StubHandler)
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.lock = threading.Lock()
+        self.counters = Counter()
+        self.by_key, self.by_url = {}, {}
+        for path in Path(args.cassettes).glob("*/*.json"):
+            try:
+                record = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            self.by_key[record["key"]] = record
+            self.by_url.setdefault(record["url"], record)
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.random.random()
+
+    def delay(self) -> float:
+        with self.lock:
+            jitter = self.random.uniform(-self.args.jitter, self.args.jitter)
+        return max(0.0, self.args.latency + jitter)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] += amount
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: StubServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.args.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes = b"", headers: dict = None) -> None:
+        self.send_response(status)
+        headers = dict(headers or {})
+        headers["Content-Length"] = str(len(body))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        if self.path.startswith("/fetch"):
+            self.server.count("bytes", len(body))
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/stats":
+            with self.server.lock:
+                body = json.dumps(dict(self.server.counters)).encode("utf-8")
+            return self._send(200, body, {"Content-Type": "application/json"})
+        url = parse_qs(parts.query).get("url", [None])[0]
+        if parts.path != "/fetch" or not url:
+            return self._send(404, b"use /fetch?url=<url>", {"Content-Type": "text/plain"})
+
+        args = self.server.args
+        self.server.count("requests")
+        time.sleep(self.server.delay())
+
+        roll = self.server.roll()
+        if roll < args.error_rate:
+            self.server.count("errors")
+            return self._send(args.error_status, b"injected error", {"Content-Type": "text/plain"})
+        if roll < args.error_rate + args.throttle_rate:
+            self.server.count("throttled")
+            return self._send(
+                429, b"injected throttle", {"Content-Type": "text/plain", "Retry-After": str(args.retry_after)}
+            )
+
+        record = self.server.by_key.get(cassette_key("GET", url, dict(self.headers))) or self.server.by_url.get(url)
+        if record is not None:
+            self.server.count("cassette")
+            headers = {k: v for k, v in record["headers"].items() if k.lower() != "content-length"}
+            return self._send(record["status"], CassetteStore.body_of(record), headers)
+
+        self.server.count("synthetic")
+        host = urlsplit(url).hostname or ""
+        suffix = Path(urlsplit(url).path).suffix.lower()
+        if "duckduckgo" in host:
+            return self._results_page(url)
+        if suffix in FILE_EXTENSIONS:
+            return self._file(url, FILE_EXTENSIONS[suffix])
+        return self._article(url)
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip("/") != "/v1/chat/completions":
+            return self._send(404, b"use /v1/chat/completions", {"Content-Type": "text/plain"})
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            return self._send(400, b"invalid JSON body", {"Content-Type": "text/plain"})
+        self.server.count("completions")
+        time.sleep(self.server.delay())
+        self._completion(request)
+
+    def _completion(self, request: dict) -> None:
+        messages = request.get("messages") or []
+        prompt = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+        digest = _digest(f"{request.get('model')}|{prompt}").hex()
+        last_user = next(
+            (m.get("content") for m in reversed(messages) if m.get("role") == "user"),
+            "",
+        )
+        if not isinstance(last_user, str):
+            last_user = " ".join(part.get("text", "") for part in last_user if isinstance(part, dict))
+        content = (
+            f"Stub completion {digest[:12]} for: {' '.join(last_user.split())[:200]}\n\n"
+            f"{_words(digest, 60).capitalize()}."
+        )
+        created = int(time.time())
+        completion_id = f"chatcmpl-stub-{digest[:24]}"
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": len(prompt) // 4 + len(content) // 4,
+        }
+        base = {"id": completion_id, "created": created, "model": request.get("model") or "stub"}
+        if not request.get("stream"):
+            body = {
+                **base,
+                "object": "chat.completion",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+            return self._send(200, json.dumps(body).encode("utf-8"), {"Content-Type": "application/json"})
+        chunks = [
+            {"index": 0, "delta": {"role": "assistant", "content": content}, "finish_reason": None},
+            {"index": 0, "delta": {}, "finish_reason": "stop"},
+        ]
+        events = [
+            {**base, "object": "chat.completion.chunk", "choices": [choice]} for choice in chunks
+        ]
+        if (request.get("stream_options") or {}).get("include_usage"):
+            events.append({**base, "object": "chat.completion.chunk", "choices": [], "usage": usage})
+        body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+        self._send(200, body.encode("utf-8"), {"Content-Type": "text/event-stream"})
+
+    def _results_page(self, url: str) -> None:
+        query = parse_qs(urlsplit(url).query).get("q", [""])[0]
+        domains = re.findall(r"site:([\w.-]+)", query) or ["example.org"]
+        terms = re.sub(r"\(|\)|\bOR\b|site:[\w.-]+", " ", query).split()
+        results = []
+        for i in range(self.server.args.results):
+            domain = domains[i % len(domains)]
+            topic = _words(f"{query}|{i}", 4)
+            href = f"https://{domain}/articles/{i}-{_digest(url + str(i)).hex()[:8]}"
+            if i % 5 == 4:
+                href = f"https://{domain}/files/{i}-{_digest(url + str(i)).hex()[:8]}.pdf"
+            title = f"{' '.join(terms[:3])} {topic} ({2015 + i % 10})"
+            results.append(
+                f'<div class="result"><h2 class="result__title"><a rel="nofollow" class="{RESULT_LINK_CLASS}" '
+                f'href="//duckduckgo.com/l/?uddg={quote(href, safe="")}">{title}</a></h2>'
+                f'<a class="result__snippet">{_words(href, 25)}</a></div>'
+            )
+        body = f"<html><head><title>{query}</title></head><body>{''.join(results)}</body></html>"
+        self._send(200, body.encode("utf-8"), {"Content-Type": "text/html; charset=utf-8"})
+
+    def _article(self, url: str) -> None:
+        etag = f'"{_digest(url).hex()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", {"ETag": etag})
+        paragraphs = "".join(
+            f"<p>{_words(f'{url}|{i}', 40).capitalize()}.</p><div class='nav'>menu</div>"
+            for i in range(self.server.args.paragraphs)
+        )
+        body = f"<html><head><title>{_words(url, 6)}</title></head><body><article>{paragraphs}</article></body></html>"
+        self._send(200, body.encode("utf-8"), {"Content-Type": "text/html; charset=utf-8", "ETag": etag})
+
+    def _file(self, url: str, content_type: str) -> None:
+        line = f"{_words(url, 12)}\n".encode("utf-8")
+        body = (line * (self.server.args.file_size // len(line) + 1))[: self.server.args.file_size]
+        etag = f'"{_digest(url).hex()[:16]}"'
+        headers = {"Content-Type": content_type, "ETag": etag, "Accept-Ranges": "bytes"}
+        match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if_range = self.headers.get("If-Range")
+        if match and (not if_range or if_range == etag):
+            start = int(match.group(1))
+            if start >= len(body):
+                return self._send(416, b"", {"Content-Range": f"bytes */{len(body)}"})
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            return self._send(206, body[start:], headers)
+        self._send(200, body, headers)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve recorded and synthetic pages for offline tool runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--cassettes", default=CASSETTE_DIR, help="Cassette directory (TOOLS_HTTP_CASSETTE_DIR)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds around --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--results", type=int, default=30, help="Links per synthetic result page")
+    parser.add_argument("--paragraphs", type=int, default=40, help="Paragraphs per synthetic article")
+    parser.add_argument("--file-size", type=int, default=256 * 1024, help="Bytes per synthetic file download")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency jitter and fault injection")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    server = StubServer((args.host, args.port), args)
+    print(
+        f"[INFO] Stub server on http://{args.host}:{args.port} "
+        f"({len(server.by_key)} cassettes from {args.cassettes}); set TOOLS_HTTP_STUB to this address"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
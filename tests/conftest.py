@@ -0,0 +1,59 @@
+# conftest.py
+
+"""
+Shared fixtures for the offline test suite.
+- Every test runs without the internet: HTTP goes to an in-process stub server (scripts/stub_server.py)
+  or to cassettes, and the stub's chat endpoint stands in for the OpenAI API.
+- Process-wide caches are pointed at a throwaway directory (or disabled) before any module reads its settings,
+  so tests neither read nor leave files under tmp/.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+_CACHE_DIR = tempfile.mkdtemp(prefix="deep_search_tests_")
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ["SERP_CACHE_ENABLED"] = "0"
+os.environ["PAGE_CACHE_ENABLED"] = "0"
+os.environ["LLM_CACHE_DB"] = os.path.join(_CACHE_DIR, "llm_cache.db")
+os.environ["DEEP_SEARCH_RUN_DB"] = os.path.join(_CACHE_DIR, "deep_search_runs.db")
+os.environ["TEXT_CACHE_DIR"] = os.path.join(_CACHE_DIR, "text_cache")
+os.environ["TOOLS_HTTP_CASSETTE_DIR"] = os.path.join(_CACHE_DIR, "cassettes")
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    """Base URL of a stub server running in this process, without latency or injected faults."""
+    from scripts.stub_server import StubServer, build_parser
+
+    args = build_parser().parse_args(
+        ["--port", "0", "--latency", "0", "--seed", "1", "--cassettes", os.path.join(_CACHE_DIR, "stub_cassettes")]
+    )
+    server = StubServer((args.host, args.port), args)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{args.host}:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def stub_stats(stub_server):
+    """Returns the stub server's request counters."""
+    import requests
+
+    def stats() -> dict:
+        return requests.get(f"{stub_server}/stats", timeout=5).json()
+
+    return stats
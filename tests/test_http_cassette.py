@@ -0,0 +1,48 @@
+import pytest
+
+from tools import http_client as http_client_module
+from tools.http_cassette import CassetteMiss, CassetteStore, cassette_key, full_url
+from tools.http_client import HttpClient
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = CassetteStore(str(tmp_path / "cassettes"))
+    monkeypatch.setattr(http_client_module, "cassettes", store)
+    return store
+
+
+def test_full_url_encodes_params():
+    url = full_url("https://html.duckduckgo.com/html/", {"q": "R&D #1 c++ (site:a.org OR site:b.org)"})
+    assert url == "https://html.duckduckgo.com/html/?q=R%26D+%231+c%2B%2B+%28site%3Aa.org+OR+site%3Ab.org%29"
+    assert full_url("https://example.org/a", None) == "https://example.org/a"
+
+
+def test_cassette_key_uses_relevant_headers_only():
+    base = cassette_key("GET", "https://example.org/a", {"User-Agent": "x"})
+    assert base == cassette_key("get", "https://example.org/a", {"User-Agent": "y"})
+    assert base != cassette_key("GET", "https://example.org/a", {"Range": "bytes=10-"})
+
+
+def test_record_then_replay_without_network(store, stub_server, stub_stats):
+    url = "https://example.org/articles/graphene-sensors"
+    recorder = HttpClient(cassette_mode="record", stub=stub_server, retries=0)
+    recorded = recorder.get(url)
+    assert recorded.status_code == 200
+    assert store.stats()["recorded"] == 1
+
+    requests_before = stub_stats().get("requests", 0)
+    player = HttpClient(cassette_mode="replay", retries=0)
+    replayed = player.get(url)
+    assert replayed.status_code == 200
+    assert replayed.text == recorded.text
+    assert store.stats()["replayed"] == 1
+    # Replay never reaches the stub (or any) server
+    assert stub_stats().get("requests", 0) == requests_before
+
+
+def test_replay_miss_raises(store):
+    player = HttpClient(cassette_mode="replay", retries=0)
+    with pytest.raises(CassetteMiss):
+        player.get("https://example.org/never-recorded")
+    assert store.stats()["misses"] == 1
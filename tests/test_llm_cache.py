@@ -0,0 +1,85 @@
+import pytest
+from agno.models.message import Message
+
+from agents.llm_cache import CachedOpenAIChat, LLMResponseCache, make_key
+
+
+def _completion(text: str, prompt_tokens: int = 10, completion_tokens: int = 5) -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "stub",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(str(tmp_path / "llm_cache.db"))
+
+
+def test_make_key_is_exact():
+    messages = [{"role": "user", "content": "hi"}]
+    key = make_key("gpt-4.1", messages, None, {"temperature": 0})
+    assert key == make_key("gpt-4.1", [{"content": "hi", "role": "user"}], [], {"temperature": 0})
+    assert key != make_key("gpt-4.1", messages, None, {"temperature": 0.1})
+    assert key != make_key("gpt-4.1-mini", messages, None, {"temperature": 0})
+
+
+def test_miss_then_hit_records_tokens_saved(cache):
+    assert cache.get("k") is None
+    cache.put("k", "stub", _completion("answer", prompt_tokens=12, completion_tokens=3))
+    assert cache.get("k")["choices"][0]["message"]["content"] == "answer"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["prompt_tokens_saved"] == 12
+    assert stats["completion_tokens_saved"] == 3
+    assert stats["lifetime_tokens_saved"] == 15
+
+
+def test_evicts_least_recently_used_by_count(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"), max_entries=2)
+    cache.put("a", "stub", _completion("a"))
+    cache.put("b", "stub", _completion("b"))
+    assert cache.get("a") is not None  # "b" is now the least recently used
+    cache.put("c", "stub", _completion("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_evicts_by_total_size(tmp_path):
+    one = _completion("x" * 1000)
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"), max_bytes=int(len(str(one)) * 2.5))
+    for key in ("a", "b", "c", "d"):
+        cache.put(key, "stub", _completion("x" * 1000))
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= cache.max_bytes
+    assert cache.get("d") is not None
+
+
+def test_cached_model_answers_repeats_without_calling_the_api(cache, stub_server, stub_stats):
+    model = CachedOpenAIChat(id="gpt-4.1-mini", api_key="stub", base_url=f"{stub_server}/v1", response_cache=cache)
+    messages = [Message(role="user", content="coordination compounds")]
+    before = stub_stats().get("completions", 0)
+
+    first = model.invoke(messages)
+    second = model.invoke(messages)
+
+    assert stub_stats()["completions"] == before + 1
+    assert second.choices[0].message.content == first.choices[0].message.content
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["prompt_tokens_saved"] == first.usage.prompt_tokens > 0
+
+    model.invoke([Message(role="user", content="something else")])
+    assert stub_stats()["completions"] == before + 2
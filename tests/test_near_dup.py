@@ -0,0 +1,53 @@
+from tools.near_dup import filter_near_duplicates, shingles, title_numbers
+from tools.site_search import collapse_near_duplicates
+
+
+def test_syndicated_titles_collapse():
+    titles = [
+        "Graphene sensors detect heavy metals in Laguna de Bay",
+        "Graphene sensors detect heavy metals in Laguna de Bay - Inquirer.net",
+        "Graphene Sensors Detect Heavy Metals in Laguna de Bay | Philstar.com",
+        "Mangrove restoration slows coastal erosion in Bohol",
+    ]
+    kept, duplicates = filter_near_duplicates(titles, lambda title: title)
+    assert kept == [titles[0], titles[3]]
+    assert duplicates == {1: 0, 2: 0}
+
+
+def test_titles_with_different_numbers_are_kept():
+    pairs = [
+        ("COVID-19 cases in Manila rise in 2021", "COVID-19 cases in Manila rise in 2022"),
+        ("Typhoon Odette death toll climbs to 208", "Typhoon Odette death toll climbs to 375"),
+        ("Part 1: Graphene sensors for water quality", "Part 2: Graphene sensors for water quality"),
+    ]
+    for first, second in pairs:
+        kept, duplicates = filter_near_duplicates([first, second], lambda title: title)
+        assert kept == [first, second] and duplicates == {}
+
+
+def test_title_numbers_only_for_short_text():
+    assert title_numbers("COVID-19 cases rise in 2021") == {"19", "2021"}
+    long_text = " ".join(["report"] * 20) + " 2021"
+    assert title_numbers(long_text) == frozenset()
+
+
+def test_long_text_uses_word_shingles():
+    text = "the quick brown fox jumps over the lazy dog near the river bank today"
+    assert "quick brown fox" in shingles(text)
+    assert all(len(shingle) == 4 for shingle in shingles("Graphene sensors"))
+
+
+def test_collapse_near_duplicates_keeps_first_site():
+    site_links = {
+        "site:inquirer.net": [("Flood control budget cut in 2024 - Inquirer.net", "https://inquirer.net/a")],
+        "site:philstar.com": [
+            ("Flood control budget cut in 2024 | Philstar.com", "https://philstar.com/b"),
+            ("Flood control budget cut in 2023", "https://philstar.com/c"),
+        ],
+    }
+    collapsed, count = collapse_near_duplicates(site_links)
+    assert count == 1
+    assert collapsed == {
+        "site:inquirer.net": [("Flood control budget cut in 2024 - Inquirer.net", "https://inquirer.net/a")],
+        "site:philstar.com": [("Flood control budget cut in 2023", "https://philstar.com/c")],
+    }
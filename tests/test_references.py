@@ -0,0 +1,74 @@
+from chains.references import ReferenceList, parse_reference, split_entries
+
+
+def test_split_entries():
+    lines = [
+        "1. Smith, J. (2020). Graphene sensors.",
+        "   Nature, 12, 1-5.",
+        "2. Cruz, M. (2019). Mangroves of Bohol.",
+        "",
+        "Plain paragraph entry (2018).",
+    ]
+    assert split_entries(lines) == [
+        "1. Smith, J. (2020). Graphene sensors. Nature, 12, 1-5.",
+        "2. Cruz, M. (2019). Mangroves of Bohol.",
+        "Plain paragraph entry (2018).",
+    ]
+
+
+def test_parse_reference_keys():
+    by_doi = parse_reference("[3] Smith, J. (2020). Graphene sensors. https://doi.org/10.1000/XYZ.1")
+    assert by_doi.label == 3
+    assert by_doi.doi == "10.1000/xyz.1"
+    resolver = parse_reference("- Smith J, Graphene sensors, doi:10.1000/xyz.1")
+    assert set(by_doi.keys) & set(resolver.keys)
+
+    first = parse_reference("Cruz, M. Mangroves. https://www.example.org/mangroves/?utm_source=x")
+    second = parse_reference("M. Cruz - mangrove report, http://example.org/mangroves")
+    assert set(first.keys) & set(second.keys)
+
+
+def test_sections_are_merged_and_citations_renumbered():
+    references = ReferenceList()
+    first = references.add_section(
+        [
+            "1. Zamora, L. (2021). Typhoon recovery. https://example.org/typhoon",
+            "2. Abad, R. (2020). Flood control. https://example.org/floods",
+        ]
+    )
+    second = references.add_section(
+        [
+            "1. Abad, R. (2020). Flood control. https://example.org/floods/",
+            "2. Mendoza, P. (2022). Rice yields.",
+        ]
+    )
+    merged = references.finalize()
+    assert [reference.text.split(",")[0] for reference in merged] == ["Abad", "Mendoza", "Zamora"]
+
+    assert references.renumber(first, "Recovery [1] and floods [2]; see [1, 2].") == (
+        "Recovery [3] and floods [1]; see [1, 3]."
+    )
+    assert references.renumber(second, "Floods [1] and rice [2]; range [1-2].") == (
+        "Floods [1] and rice [2]; range [1, 2]."
+    )
+    rendered = references.render().split("\n\n")
+    assert rendered[0].startswith("[1] Abad, R. (2020)")
+    assert rendered[2].startswith("[3] Zamora, L. (2021)")
+
+
+def test_renumber_leaves_code_and_unknown_labels_alone():
+    references = ReferenceList()
+    section = references.add_section(["[1] Cruz, M. (2019). Mangroves.", "[2] Abad, R. (2020). Flood control."])
+    references.finalize()
+    text = "Mangroves [1], unknown [7], link [2](http://x).\n```\nx = [1]\n```\nafter [2]"
+    assert references.renumber(section, text) == (
+        "Mangroves [2], unknown [7], link [2](http://x).\n```\nx = [1]\n```\nafter [1]"
+    )
+
+
+def test_render_is_unnumbered_without_numbered_citations():
+    references = ReferenceList()
+    section = references.add_section(["- Cruz, M. (2019). Mangroves.", "- Abad, R. (2020). Flood control."])
+    references.finalize()
+    assert references.renumber(section, "Cruz (2019) found [1] nothing.") == "Cruz (2019) found [1] nothing."
+    assert references.render() == "Abad, R. (2020). Flood control.\n\nCruz, M. (2019). Mangroves."
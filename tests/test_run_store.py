@@ -0,0 +1,99 @@
+import contextvars
+
+import pytest
+from agno.workflow.v2.types import StepOutput
+
+from chains.run_store import RunCheckpoint, RunStore
+
+STEPS = ["plan", "research", "write", "review"]
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return RunCheckpoint(RunStore(str(tmp_path / "runs.db")))
+
+
+def _run(checkpoint: RunCheckpoint, run_id: str, message, resume: bool, fail_at=None) -> tuple:
+    """Run the fake workflow; returns (message, steps that ran, outputs)."""
+    message = checkpoint.begin(run_id, message, resume=resume)
+    ran, outputs = [], []
+    try:
+        for step in STEPS:
+            content = checkpoint.restore(step)
+            if content is None:
+                ran.append(step)
+                success = step != fail_at
+                content = f"{step} of {message}" if success else None
+                checkpoint.save(step, StepOutput(step_name=step, content=content, success=success))
+                if not success:
+                    checkpoint.finish("error")
+                    return message, ran, outputs
+            outputs.append(content)
+    except Exception:
+        checkpoint.finish("error")
+        raise
+    checkpoint.finish("completed")
+    return message, ran, outputs
+
+
+def test_resume_skips_stored_steps(checkpoint):
+    message, ran, _ = _run(checkpoint, "run-1", "rice yields", resume=False, fail_at="write")
+    assert ran == ["plan", "research", "write"]
+    assert checkpoint.run_id is None
+    assert checkpoint.store.steps("run-1") == ["plan", "research"]
+
+    message, ran, outputs = _run(checkpoint, "run-1", None, resume=True)
+    assert message == "rice yields"
+    assert ran == ["write", "review"]
+    assert outputs == [f"{step} of rice yields" for step in STEPS]
+
+
+def test_resume_drops_outputs_after_the_first_missing_step(checkpoint):
+    store = checkpoint.store
+    store.start_run("run-2", "floods")
+    store.save("run-2", "plan", "plan of floods")
+    store.save("run-2", "write", "stale draft")
+    store.save("run-2", "research/local", "stale part")
+
+    checkpoint.begin("run-2", None, resume=True)
+    assert checkpoint.restore("plan") == "plan of floods"
+    assert checkpoint.restore("research") is None
+    assert checkpoint.resume_step == "research"
+    assert checkpoint.restored == ["plan"]
+    # Researchers stored for the resume step survive; later steps are stale
+    assert store.steps("run-2") == ["plan", "research/local"]
+    assert checkpoint.restore_part("local") == "stale part"
+    assert checkpoint.restore_part("web") is None
+    checkpoint.save_part("web", "web findings")
+    assert store.load("run-2", "research/web") == "web findings"
+    # Once past the resume step nothing is restored any more
+    assert checkpoint.restore("write") is None
+    assert checkpoint.restore_part("local") is None
+    checkpoint.finish("completed")
+
+
+def test_failed_steps_are_not_stored(checkpoint):
+    checkpoint.begin("run-3", "typhoons")
+    assert checkpoint.restore("plan") is None
+    checkpoint.save("plan", StepOutput(step_name="plan", content="partial", success=False))
+    checkpoint.save("research", StepOutput(step_name="research", content=None))
+    checkpoint.finish("error")
+    assert checkpoint.store.steps("run-3") == []
+
+
+def test_concurrent_runs_keep_their_own_state(checkpoint):
+    checkpoint.begin("outer", "mangroves")
+    checkpoint.restore("plan")
+
+    def inner() -> str:
+        _run(checkpoint, "inner", "graphene", resume=False)
+        return checkpoint.run_id
+
+    # The inner run starts from a copy of the outer context and hands it back unchanged when it finishes
+    assert contextvars.copy_context().run(inner) == "outer"
+    assert checkpoint.run_id == "outer"
+    checkpoint.save("plan", StepOutput(step_name="plan", content="plan of mangroves"))
+    checkpoint.finish("completed")
+
+    assert checkpoint.store.steps("outer") == ["plan"]
+    assert checkpoint.store.steps("inner") == STEPS
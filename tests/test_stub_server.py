@@ -0,0 +1,42 @@
+import requests
+
+from tools.http_client import HttpClient
+from tools.site_search import result_host, search_all_sites, site_domain
+
+
+def test_synthetic_results_are_demultiplexed_per_site(stub_server):
+    client = HttpClient(stub=stub_server, retries=0)
+    sites = ["site:nature.com", "site:arxiv.org", "site:nature.com"]
+    links, errors = search_all_sites("graphene sensors", sites, 3, client.get, {}, batch_size=2)
+
+    assert errors == {}
+    assert list(links) == ["site:nature.com", "site:arxiv.org"]
+    for site, site_links in links.items():
+        assert 0 < len(site_links) <= 3
+        for _, href in site_links:
+            assert result_host(href).endswith(site_domain(site))
+
+
+def test_synthetic_pages_are_deterministic(stub_server):
+    client = HttpClient(stub=stub_server, retries=0)
+    first = client.get("https://example.org/articles/typhoon-odette")
+    second = client.get("https://example.org/articles/typhoon-odette")
+    assert first.status_code == 200
+    assert first.text == second.text
+    etag = first.headers.get("ETag")
+    assert etag
+    assert client.get("https://example.org/articles/typhoon-odette", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_chat_completion_stub(stub_server, stub_stats):
+    body = {"model": "gpt-4.1-mini", "messages": [{"role": "user", "content": "machine learning for ligands"}]}
+    before = stub_stats().get("completions", 0)
+    first = requests.post(f"{stub_server}/v1/chat/completions", json=body, timeout=5).json()
+    second = requests.post(f"{stub_server}/v1/chat/completions", json=body, timeout=5).json()
+
+    assert stub_stats()["completions"] == before + 2
+    message = first["choices"][0]["message"]["content"]
+    assert message == second["choices"][0]["message"]["content"]
+    assert "machine learning for ligands" in message
+    assert first["choices"][0]["finish_reason"] == "stop"
+    assert first["usage"]["prompt_tokens"] > 0 and first["usage"]["completion_tokens"] > 0
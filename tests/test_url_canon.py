@@ -0,0 +1,73 @@
+import contextvars
+
+from tools.url_canon import RunUrlRegistry, UrlDeduper, canonicalize_url, dedup_key, extract_doi, unique_urls
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("HTTPS://WWW.Example.com:443/a//b/?utm_source=x&b=2&a=1#top") == (
+        "https://www.example.com/a/b?a=1&b=2"
+    )
+    assert canonicalize_url("//example.com/page/") == "https://example.com/page"
+    wrapped = "//duckduckgo.com/l/?uddg=https%3A%2F%2Fnature.com%2Farticles%2Fx&rut=abc"
+    assert canonicalize_url(wrapped) == "https://nature.com/articles/x"
+
+
+def test_malformed_port_falls_back_to_raw_url():
+    assert canonicalize_url("http://example.com:99999/x") == "http://example.com:99999/x"
+    assert dedup_key("http://example.com:99999/x") == "http://example.com:99999/x"
+    assert unique_urls(["http://example.com:99999/x", "http://example.com:99999/x"]) == ["http://example.com:99999/x"]
+
+
+def test_doi_collapses_publisher_and_resolver_links():
+    assert extract_doi("https://doi.org/10.1038/S41586-020-2649-2") == "10.1038/s41586-020-2649-2"
+    assert dedup_key("https://doi.org/10.1038/s41586-020-2649-2") == dedup_key(
+        "https://www.nature.com/articles/10.1038/s41586-020-2649-2/full"
+    )
+
+
+def test_unique_urls_keeps_original_hrefs():
+    urls = ["https://example.com/page/", "http://www.example.com/page", "https://example.com/a?b=2&a=1"]
+    assert unique_urls(urls) == ["https://example.com/page/", "https://example.com/a?b=2&a=1"]
+
+
+def test_deduper():
+    seen = UrlDeduper()
+    assert seen.add("https://example.com/a?utm_medium=x")
+    assert not seen.add("https://www.example.com/a/")
+    assert "http://example.com/a" in seen
+    assert len(seen) == 1
+
+
+def test_run_registry_membership_does_not_record():
+    registry = RunUrlRegistry(enabled=True)
+    token = registry.begin_run("run-1")
+    try:
+        assert "https://example.com/a" not in registry
+        assert "https://example.com/a" not in registry
+        assert registry.add("https://example.com/a")
+        assert "https://example.com/a" in registry
+        assert not registry.add("https://example.com/a/")
+    finally:
+        registry.end_run(token)
+    assert registry.run_id is None
+    # Outside a run nothing is remembered
+    assert registry.add("https://example.com/a") and registry.add("https://example.com/a")
+
+
+def test_run_registry_scopes_do_not_leak_between_runs():
+    registry = RunUrlRegistry(enabled=True)
+
+    def run(run_id: str) -> bool:
+        token = registry.begin_run(run_id)
+        try:
+            return registry.add("https://example.com/shared")
+        finally:
+            registry.end_run(token)
+
+    outer = registry.begin_run("outer")
+    registry.add("https://example.com/shared")
+    # A concurrent run in its own context neither sees nor resets the outer run's links
+    assert contextvars.copy_context().run(run, "inner")
+    assert registry.run_id == "outer"
+    assert "https://example.com/shared" in registry
+    registry.end_run(outer)
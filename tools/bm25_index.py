@@ -0,0 +1,309 @@
+# bm25_index.py
+
+"""
+Incremental BM25 inverted index over the local corpus (scraped_markdown/ and downloaded_files/).
+- Markdown documents are indexed whole; downloaded PDF/TXT/CSV files are indexed per page chunk
+  using the cached output of `tools.text_extract`.
+- refresh() only re-reads files whose size or mtime changed since the last scan, so new documents
+  become searchable without rebuilding the index. Text extraction runs outside the index lock, so
+  concurrent searches are not serialized behind it.
+- Files stored under several names in downloaded_files/ (same content hash) are indexed once.
+- Tokenization handles English and Filipino: diacritics are folded (e.g. "ñ" → "n"), hyphenated
+  Filipino forms ("mag-aral", "araw-araw") index both the joined word and its parts, and common
+  stopwords of both languages are dropped.
+"""
+
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Optional
+
+from agno.utils.log import logger
+
+from tools.file_store import ContentStore
+from tools.text_extract import SUPPORTED_EXTENSIONS, text_extractor
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+ENGLISH_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "which", "with",
+}
+FILIPINO_STOPWORDS = {
+    "ang", "mga", "ng", "sa", "na", "at", "ay", "si", "ni", "kay", "ito", "iyan", "iyon", "ko",
+    "mo", "niya", "nila", "namin", "natin", "kami", "kayo", "sila", "siya", "ako", "ikaw", "para",
+    "pero", "kung", "dahil", "din", "rin", "lang", "lamang", "pa", "po", "ba", "nga", "may", "mayroon",
+    "hindi", "nang", "yung", "yun", "ating", "kanilang", "kanyang",
+}
+STOPWORDS = ENGLISH_STOPWORDS | FILIPINO_STOPWORDS
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+SNIPPET_CHARS = 300
+
+
+def _fold(text: str) -> str:
+    """Lower-case and strip diacritics so "Mañila" and "manila" match."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def _stem(token: str) -> str:
+    """Very light English plural stripping; Filipino words are left intact."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Split English / Filipino text into normalized index terms."""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(_fold(text)):
+        word = match.group(0)
+        parts = word.split("-")
+        if len(parts) > 1:
+            # "mag-aral" → "magaral", "aral"; "araw-araw" → "arawaraw", "araw"
+            tokens.append("".join(parts))
+            tokens.extend(p for p in dict.fromkeys(parts) if p not in STOPWORDS and len(p) > 1)
+        elif word not in STOPWORDS and len(word) > 1:
+            tokens.append(_stem(word))
+    return tokens
+
+
+class BM25Index:
+    """In-memory inverted index with BM25 scoring and incremental file refresh."""
+
+    def __init__(self, markdown_dir: str = "scraped_markdown", download_dir: str = "downloaded_files"):
+        self.markdown_dir = Path(markdown_dir)
+        self.download_dir = Path(download_dir)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._docs: dict[int, dict] = {}
+        self._doc_terms: dict[int, Counter] = {}
+        self._total_length = 0
+        self._next_id = 0
+        # path -> (size, mtime, [doc ids])
+        self._files: dict[str, tuple[int, float, list[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # === indexing ===
+    def _add_doc(self, meta: dict, text: str) -> int:
+        doc_id = self._next_id
+        self._next_id += 1
+        terms = Counter(tokenize(f"{meta.get('title', '')} {text}"))
+        for term, tf in terms.items():
+            self._postings[term][doc_id] = tf
+        length = sum(terms.values())
+        self._docs[doc_id] = {**meta, "text": text, "length": length}
+        self._doc_terms[doc_id] = terms
+        self._total_length += length
+        return doc_id
+
+    def _remove_doc(self, doc_id: int) -> None:
+        for term in self._doc_terms.pop(doc_id, {}):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        doc = self._docs.pop(doc_id, None)
+        if doc:
+            self._total_length -= doc["length"]
+
+    def _forget(self, key: str) -> None:
+        entry = self._files.pop(key, None)
+        if entry:
+            for doc_id in entry[2]:
+                self._remove_doc(doc_id)
+
+    @staticmethod
+    def _read_markdown(path: Path) -> tuple[str, str, str]:
+        """Return (title, source, body) of a Markdown file written by MarkdownFormatterTool."""
+        text = path.read_text(encoding="utf-8", errors="replace")
+        title, source = path.stem, ""
+        lines = text.splitlines()
+        if lines and lines[0].startswith("# "):
+            title = lines[0][2:].strip()
+        for line in lines[1:4]:
+            if line.startswith("**Source:**"):
+                source = line[len("**Source:**"):].strip()
+        return title, source, text
+
+    def _scan(self) -> tuple[list[Path], list[Path]]:
+        markdown = list(self.markdown_dir.glob("*.md")) if self.markdown_dir.is_dir() else []
+        downloads = (
+            [p for p in self.download_dir.iterdir() if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS]
+            if self.download_dir.is_dir()
+            else []
+        )
+        return sorted(markdown), sorted(downloads)
+
+    def _changed(self, path: Path) -> Optional[tuple[int, float]]:
+        stat = path.stat()
+        signature = (stat.st_size, stat.st_mtime)
+        known = self._files.get(str(path))
+        return None if known and known[:2] == signature else signature
+
+    def has_files(self) -> bool:
+        """True if the corpus folders hold any indexable file (nothing is read or indexed)."""
+        markdown, downloads = self._scan()
+        return bool(markdown or downloads)
+
+    def refresh(self) -> int:
+        """
+        Index new or modified files and drop deleted ones.
+
+        Files are read and extracted outside the index lock, so searches are not blocked meanwhile; the new
+        postings are swapped in under it. A call made while another refresh is running returns at once and
+        searches the current index.
+
+        Returns:
+            int: Number of files (re)indexed.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return 0
+        try:
+            # Only refresh() changes self._files, and refreshes do not overlap, so scanning needs no index lock
+            markdown, downloads = self._scan()
+            present = {str(p) for p in markdown + downloads}
+            deleted = [k for k in self._files if k not in present]
+
+            documents = []
+            for path in markdown:
+                signature = self._changed(path)
+                if signature is None:
+                    continue
+                try:
+                    documents.append((path, signature, self._read_markdown(path)))
+                except OSError as e:
+                    logger.warning(f"[BM25Index] Cannot read {path}: {e}")
+
+            changed = {}
+            for path in downloads:
+                signature = self._changed(path)
+                if signature is not None:
+                    changed[path] = signature
+            extracted = self._extract_downloads(changed) if changed else None
+
+            with self._lock:
+                for key in deleted:
+                    self._forget(key)
+                for path, signature, (title, source, text) in documents:
+                    self._forget(str(path))
+                    doc_id = self._add_doc({"title": title, "source": source, "path": str(path)}, text)
+                    self._files[str(path)] = (*signature, [doc_id])
+                updated = len(documents)
+                if extracted is not None:
+                    updated += self._add_downloads(changed, *extracted)
+            return updated
+        finally:
+            self._refresh_lock.release()
+
+    def _extract_downloads(self, changed: dict[Path, tuple[int, float]]) -> tuple[dict, dict]:
+        """Extract the text of changed downloads; returns (extraction results, source URLs) keyed by path."""
+        store = ContentStore(self.download_dir)
+        hashes, sources = {}, {}
+        for path in changed:
+            entry = store.lookup_name(path.name)
+            if entry:
+                hashes[str(path)] = entry["sha256"]
+                sources[str(path)] = entry.get("url", "")
+        return text_extractor.extract(list(changed), hashes), sources
+
+    def _add_downloads(self, changed: dict[Path, tuple[int, float]], results: dict, sources: dict) -> int:
+        """Index extracted downloads. Caller holds the lock."""
+        for path in changed:
+            self._forget(str(path))
+        indexed_hashes = {
+            doc.get("sha256") for doc in self._docs.values() if doc.get("sha256")
+        }
+        updated = 0
+        for path, signature in changed.items():
+            key = str(path)
+            result = results.get(key, {})
+            doc_ids = []
+            if "chunks" in result and result["sha256"] not in indexed_hashes:
+                indexed_hashes.add(result["sha256"])
+                for chunk in result["chunks"]:
+                    meta = {
+                        "title": path.name,
+                        "source": sources.get(key, ""),
+                        "path": key,
+                        "page": chunk["page"],
+                        "sha256": result["sha256"],
+                    }
+                    doc_ids.append(self._add_doc(meta, chunk["text"]))
+            elif "error" in result:
+                logger.warning(f"[BM25Index] Skipping {path.name}: {result['error']}")
+            self._files[key] = (*signature, doc_ids)
+            updated += 1
+        return updated
+
+    # === search ===
+    def search(self, query: str, limit: int = 5) -> list[dict]:
+        """
+        Rank indexed documents for a query with BM25.
+
+        Args:
+            query (str): Free-text query in English or Filipino.
+            limit (int): Maximum number of hits.
+
+        Returns:
+            list[dict]: Hits with title, source, path, page (for file chunks), score and snippet.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not terms or not n_docs:
+                return []
+            avgdl = self._total_length / n_docs or 1.0
+            scores: dict[int, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    length = self._docs[doc_id]["length"]
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl)
+                    scores[doc_id] += idf * tf * (BM25_K1 + 1) / norm
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            hits = []
+            for doc_id, score in top:
+                doc = self._docs[doc_id]
+                title = doc["title"]
+                if doc.get("page"):
+                    title = f"{title} (page {doc['page']})"
+                hits.append(
+                    {
+                        "title": title,
+                        "source": doc.get("source", ""),
+                        "path": doc["path"],
+                        "page": doc.get("page"),
+                        "score": round(score, 3),
+                        "snippet": _snippet(doc["text"], terms),
+                    }
+                )
+            return hits
+
+
+def _snippet(text: str, terms: list[str]) -> str:
+    """Window of text around the first line that mentions a query term."""
+    term_set = set(terms)
+    for line in text.splitlines():
+        if line.startswith(("# ", "**Source:**")):
+            continue
+        if term_set & set(tokenize(line)):
+            line = line.strip()
+            return line[:SNIPPET_CHARS] + ("..." if len(line) > SNIPPET_CHARS else "")
+    return " ".join(text.split())[:SNIPPET_CHARS]
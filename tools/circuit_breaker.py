@@ -0,0 +1,199 @@
+# circuit_breaker.py
+
+"""
+Process-wide, per-host circuit breakers shared by every toolkit.
+- closed: requests flow normally; TOOLS_BREAKER_FAILURES consecutive failures (default: 3) open the circuit.
+- open: requests to the host fail instantly with CircuitOpenError for TOOLS_BREAKER_COOLDOWN seconds (default: 60).
+- half-open: after the cool-down a single probe request is let through; success closes the circuit,
+  failure re-opens it with the cool-down doubled (up to TOOLS_BREAKER_MAX_COOLDOWN, default: 600).
+- `tools.http_client` guards every request by host; the search toolkits also keep a breaker per `site:` domain,
+  so a site that keeps failing is skipped by all researchers until it recovers.
+- Set TOOLS_BREAKER_ENABLED=0 to disable.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from agno.utils.log import logger
+
+from tools.rate_limiter import RateLimiterRegistry
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+BREAKER_ENABLED = os.getenv("TOOLS_BREAKER_ENABLED", "1").lower() not in ("0", "false", "no")
+BREAKER_FAILURES = int(_env_float("TOOLS_BREAKER_FAILURES", 3))
+BREAKER_COOLDOWN = _env_float("TOOLS_BREAKER_COOLDOWN", 60.0)
+BREAKER_MAX_COOLDOWN = _env_float("TOOLS_BREAKER_MAX_COOLDOWN", 600.0)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of contacting a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one host."""
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURES,
+        cooldown: float = BREAKER_COOLDOWN,
+        max_cooldown: float = BREAKER_MAX_COOLDOWN,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+        self.trips = 0
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a request may go out now. In half-open state only one probe is allowed at a time."""
+        with self._lock:
+            if self.state == OPEN and self.retry_in() <= 0:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self._probing = False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot whose outcome says nothing about the host (e.g. a deadline)."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure. Returns True if this failure opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            elif self.state != CLOSED or self.failures < self.failure_threshold:
+                return False
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+            self.trips += 1
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "retry_in": round(self.retry_in(), 1) if self.state == OPEN else 0.0,
+                "rejected": self.rejected,
+                "trips": self.trips,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Registry of circuit breakers keyed by host name."""
+
+    def __init__(self, enabled: bool = BREAKER_ENABLED):
+        self.enabled = enabled
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url_or_host: str) -> CircuitBreaker:
+        host = RateLimiterRegistry.host_of(url_or_host)
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker()
+                self._breakers[host] = breaker
+            return breaker
+
+    def check(self, url_or_host: str) -> None:
+        """Raise CircuitOpenError if requests to this host should be skipped right now."""
+        if not self.enabled:
+            return
+        breaker = self.get(url_or_host)
+        if not breaker.allow():
+            raise CircuitOpenError(RateLimiterRegistry.host_of(url_or_host), breaker.retry_in())
+
+    def record_success(self, url_or_host: str) -> None:
+        if self.enabled:
+            self.get(url_or_host).record_success()
+
+    def release(self, url_or_host: str) -> None:
+        if self.enabled:
+            self.get(url_or_host).release()
+
+    def record_failure(self, url_or_host: str) -> None:
+        if self.enabled and self.get(url_or_host).record_failure():
+            breaker = self.get(url_or_host)
+            logger.warning(
+                f"[CircuitBreaker] Opened circuit for {RateLimiterRegistry.host_of(url_or_host)} "
+                f"for {breaker.cooldown:.0f}s after {breaker.failures} failures"
+            )
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.stats() for host, breaker in sorted(breakers.items())}
+
+
+def format_skipped(errors: dict[str, Exception]) -> Optional[str]:
+    """
+    One line summarising the targets skipped because their circuit is open, grouped by host.
+
+    Args:
+        errors (dict): Errors per target (site or URL); only CircuitOpenError entries are reported.
+
+    Returns:
+        Optional[str]: The summary line, or None if nothing was skipped.
+    """
+    skipped = {t: e for t, e in errors.items() if isinstance(e, CircuitOpenError)}
+    if not skipped:
+        return None
+    retry_in = min(e.retry_in for e in skipped.values())
+    line = (
+        f"⏭️ Skipped {len(skipped)} unavailable targets (circuit open, next probe in {retry_in:.0f}s): "
+        + ", ".join(skipped)
+    )
+    # Name hosts that are not the targets themselves, e.g. the search engine all queries go through
+    hosts = {e.host for t, e in skipped.items() if e.host not in t}
+    if hosts:
+        line += f" [via {', '.join(sorted(hosts))}]"
+    return line
+
+
+# Shared process-wide registry used by all toolkits
+circuit_breakers = CircuitBreakerRegistry()
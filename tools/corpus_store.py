@@ -0,0 +1,149 @@
+# corpus_store.py
+
+"""
+Local corpus of Markdown documents written by MarkdownFormatterTool.
+- Each document gets a collision-safe id: the sanitized title plus the first 12 hex digits of its content hash,
+  so two different documents with the same title no longer overwrite each other.
+- Files are written atomically (temporary file + os.replace); readers never see a half-written document.
+- `<root>/manifest.jsonl` is an append-only log with one record per stored document
+  (id, title, source, sha256, size, created_at).
+- The manifest is loaded into an in-memory index on first use, giving O(1) lookups by source URL or content hash,
+  so tools can check whether a document is already stored before fetching it again.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from agno.utils.log import logger
+
+from tools.url_canon import canonicalize_url
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def content_hash(content: str) -> str:
+    """sha256 of a document body, ignoring surrounding whitespace."""
+    return hashlib.sha256(content.strip().encode("utf-8")).hexdigest()
+
+
+def safe_title(title: str) -> str:
+    """Filesystem-safe form of a document title."""
+    return re.sub(r"[^a-zA-Z0-9\-_]", "_", title.lower())[:80] or "untitled"
+
+
+class CorpusStore:
+    """Markdown document store with an append-only manifest and lazily built lookup index."""
+
+    def __init__(self, root: str = "scraped_markdown"):
+        self.root = Path(root)
+        self.manifest_path = self.root / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self._by_hash: Optional[dict[str, dict]] = None
+        self._by_source: dict[str, dict] = {}
+        self._by_id: dict[str, dict] = {}
+
+    @staticmethod
+    def _source_key(source: str) -> str:
+        return canonicalize_url(source) if source else ""
+
+    def _index(self, record: dict) -> None:
+        self._by_hash[record["sha256"]] = record
+        self._by_id[record["id"]] = record
+        if record.get("source"):
+            self._by_source[self._source_key(record["source"])] = record
+
+    def _load(self) -> None:
+        """Build the in-memory index from the manifest the first time it is needed."""
+        if self._by_hash is not None:
+            return
+        self._by_hash = {}
+        if not self.manifest_path.exists():
+            return
+        with open(self.manifest_path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._index(json.loads(line))
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"[CorpusStore] Skipping bad manifest line {line_no}: {e}")
+
+    def get_by_hash(self, sha256: str) -> Optional[dict]:
+        with self._lock:
+            self._load()
+            return self._by_hash.get(sha256)
+
+    def get_by_source(self, source: str) -> Optional[dict]:
+        """Latest stored document for a source URL (compared in canonical form)."""
+        with self._lock:
+            self._load()
+            return self._by_source.get(self._source_key(source))
+
+    def get(self, doc_id: str) -> Optional[dict]:
+        with self._lock:
+            self._load()
+            return self._by_id.get(doc_id)
+
+    def has_source(self, source: str) -> bool:
+        return self.get_by_source(source) is not None
+
+    def records(self) -> list[dict]:
+        """All stored documents, oldest first."""
+        with self._lock:
+            self._load()
+            return list(self._by_id.values())
+
+    def path_for(self, record: dict) -> Path:
+        return self.root / f"{record['id']}.md"
+
+    def add(self, title: str, content: str, source: str = "") -> tuple[dict, bool]:
+        """
+        Store a document unless identical content is already in the corpus.
+
+        Args:
+            title (str): Document title, used for the heading and the id prefix.
+            content (str): Markdown body.
+            source (str): Source URL, if any.
+
+        Returns:
+            tuple[dict, bool]: (manifest record, whether a new file was written).
+        """
+        sha256 = content_hash(content)
+        with self._lock:
+            self._load()
+            existing = self._by_hash.get(sha256)
+            if existing is not None:
+                return existing, False
+
+            doc_id = f"{safe_title(title)}-{sha256[:12]}"
+            body = f"# {title}\n\n"
+            if source:
+                body += f"**Source:** {source}\n\n"
+            body += content.strip()
+            data = body.encode("utf-8")
+
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self.root / f"{doc_id}.md"
+            tmp_path = path.with_suffix(f".md.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+            record = {
+                "id": doc_id,
+                "title": title,
+                "source": source,
+                "sha256": sha256,
+                "size": len(data),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._index(record)
+        return record, True
@@ -0,0 +1,163 @@
+# deadline.py
+
+"""
+Wall-clock budgets for tool calls.
+- Every network-bound toolkit method (search_journal_sites, search_government_and_news_sites, scrape_urls,
+  download_files) runs under a Deadline: an explicit `deadline` argument, the toolkit's own setting, or the
+  process-wide default in `tool_deadlines` (TOOLS_CALL_DEADLINE seconds, default: 60; 0 = no deadline).
+- The workflow can change the default for its own runs (`DeepSearchWorkflow(tool_deadline=...)`); the override is
+  scoped to the run's context and restored when the run ends.
+- The deadline is passed down to `tools.http_client`, which caps each request's timeout to the time left,
+  stops retrying and raises DeadlineExceeded instead of starting a request after it expires.
+- map_with_deadline() runs per-item work on a thread pool and returns whatever finished in time; work in flight
+  gets DEADLINE_GRACE seconds (default: 0.5) to hand back partial results, and items still queued are cancelled.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Optional, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_deadline_str = os.getenv("TOOLS_CALL_DEADLINE", "60")
+try:
+    TOOL_CALL_DEADLINE = float(_deadline_str)
+except (TypeError, ValueError):
+    TOOL_CALL_DEADLINE = 60.0
+
+# Time in-flight work gets after the deadline to return what it has (requests time out at the deadline)
+_grace_str = os.getenv("TOOLS_DEADLINE_GRACE", "0.5")
+try:
+    DEADLINE_GRACE = float(_grace_str)
+except (TypeError, ValueError):
+    DEADLINE_GRACE = 0.5
+
+Timeout = Union[float, tuple[float, float]]
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised instead of starting work after a tool call's deadline has passed."""
+
+    def __init__(self, what: str = "request"):
+        super().__init__(f"deadline exceeded before {what}")
+
+
+class Deadline:
+    """A point in time by which a tool call must return; `seconds=None` (or <= 0) never expires."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.ends_at = None if self.seconds is None else time.monotonic() + self.seconds
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None for no deadline."""
+        return None if self.ends_at is None else max(0.0, self.ends_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.ends_at is not None and time.monotonic() >= self.ends_at
+
+    def check(self, what: str = "request") -> None:
+        """Raise DeadlineExceeded if the deadline has passed."""
+        if self.expired:
+            raise DeadlineExceeded(what)
+
+    def cap(self, timeout: Optional[Timeout]) -> Optional[Timeout]:
+        """Shrink a requests-style timeout (seconds or (connect, read)) to the time left."""
+        left = self.remaining()
+        if left is None:
+            return timeout
+        left = max(left, 0.001)
+        if timeout is None:
+            return left
+        if isinstance(timeout, tuple):
+            return tuple(min(t, left) if t is not None else left for t in timeout)
+        return min(timeout, left)
+
+
+class ToolDeadlines:
+    """
+    Default budget for one tool call: TOOLS_CALL_DEADLINE process-wide, optionally overridden for one workflow
+    run. The override lives in a context variable, so it never leaks into other runs or direct tool use.
+    """
+
+    def __init__(self, default: Optional[float] = TOOL_CALL_DEADLINE):
+        self._lock = threading.Lock()
+        self.default = default
+        self._run_default: contextvars.ContextVar[Optional[tuple[Optional[float]]]] = contextvars.ContextVar(
+            "tool_deadline", default=None
+        )
+
+    def set_default(self, seconds: Optional[float]) -> None:
+        """Change the process-wide default."""
+        with self._lock:
+            self.default = seconds
+
+    def begin_run(self, seconds: Optional[float]) -> contextvars.Token:
+        """Override the default in the current context; returns the token to pass to end_run."""
+        return self._run_default.set((seconds,))
+
+    def end_run(self, token: contextvars.Token) -> None:
+        try:
+            self._run_default.reset(token)
+        except ValueError:
+            self._run_default.set(None)
+
+    def start(self, seconds: Optional[float] = None) -> Deadline:
+        """Start a deadline for a tool call: `seconds` if given, else the run's or the process-wide default."""
+        if seconds is None:
+            override = self._run_default.get()
+            if override is not None:
+                return Deadline(override[0])
+        with self._lock:
+            budget = self.default if seconds is None else seconds
+        return Deadline(budget)
+
+
+# Shared process-wide defaults used by all toolkits
+tool_deadlines = ToolDeadlines()
+
+
+def map_with_deadline(
+    fn: Callable[[T], R],
+    items: list[T],
+    max_workers: int,
+    deadline: Deadline,
+    thread_name_prefix: str = "tool",
+) -> list[Optional[R]]:
+    """
+    Apply `fn` to every item concurrently and collect the results that finish before the deadline.
+
+    Args:
+        fn (Callable): Work for one item; it should honour `deadline` itself for in-flight requests.
+        items (list): Items in output order.
+        max_workers (int): Number of items processed at once.
+        deadline (Deadline): Budget for the whole batch.
+        thread_name_prefix (str): Name prefix of the worker threads.
+
+    Returns:
+        list: Results in input order; None for items that were cancelled or still running at the deadline.
+    """
+    if not items:
+        return []
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(items))),
+        thread_name_prefix=thread_name_prefix,
+    )
+    try:
+        futures = [executor.submit(fn, item) for item in items]
+        done, pending = wait(futures, timeout=deadline.remaining())
+        if pending:
+            for future in pending:
+                future.cancel()
+            finished, _ = wait([f for f in pending if not f.cancelled()], timeout=DEADLINE_GRACE)
+            done |= finished
+        # Exceptions are left to `fn`; a failure here is a bug, so let it surface
+        return [future.result() if future in done else None for future in futures]
+    finally:
+        # Queued items are cancelled; in-flight ones stop at their own (capped) timeouts
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,75 +1,298 @@
 # download_team.py
 
 """
-This tool implements global per-tool rate limiting for all network requests using the `ratelimit` package.
-- The rate limit is configurable via the TOOLS_RATE_LIMIT environment variable (default: 5 requests/sec).
+This tool routes all network requests through the process-wide per-host rate limiter in `tools.rate_limiter`.
+- The rate limit is configurable via the TOOLS_RATE_LIMIT environment variable (default: 5 requests/sec per host).
+- Per-host overrides can be set with TOOLS_RATE_LIMIT_OVERRIDES (e.g. "duckduckgo.com=2").
 - If the rate limit is exceeded, the tool will wait until the next available slot.
-- All requests are routed through a rate-limited internal method.
+- All requests are routed through a rate-limited internal method backed by the pooled keep-alive client in `tools.http_client`.
+- download_files and scrape_urls run under a deadline (`tools.deadline`, default: TOOLS_CALL_DEADLINE) and return
+  what finished in time, with a line for every URL that was skipped or cut short.
 """
 
+import codecs
 import os
 import re
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-import requests
 from agno.tools.toolkit import Toolkit
 from agno.utils.log import logger
-from bs4 import BeautifulSoup, Tag
-from ratelimit import limits, sleep_and_retry
+from bs4 import Tag
+
+from tools.circuit_breaker import CircuitOpenError
+from tools.corpus_store import CorpusStore
+from tools.deadline import Deadline, DeadlineExceeded, map_with_deadline, tool_deadlines
+from tools.file_store import ContentStore, hash_file
+from tools.html_extract import ParagraphStream
+from tools.http_client import http_client
+from tools.near_dup import filter_near_duplicates
+from tools.page_cache import page_cache
+from tools.text_extract import SUPPORTED_EXTENSIONS, text_extractor
+from tools.url_canon import unique_urls
 
-# Get rate limit from environment or default to 5/sec
-RATE_LIMIT = int(os.getenv("TOOLS_RATE_LIMIT", 5))
-PER_SECONDS = 1
 MIN_LINKS = int(os.getenv("MIN_LINKS", "1"))
+PREVIEW_CHARS = 500
+EXTRACT_MAX_CHARS = int(os.getenv("EXTRACT_MAX_CHARS", "6000"))
+
+# === Downloader Config ===
+DOWNLOAD_MAX_WORKERS = int(os.getenv("DOWNLOAD_MAX_WORKERS", "4"))
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_EXTENSIONS = (".csv", ".pdf", ".txt", ".md")
+
+# === Scraper Config ===
+SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", "4"))
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "15"))
+SCRAPE_CHUNK_SIZE = 16 * 1024
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml", "application/xml", "text/xml"}
+BINARY_SIGNATURES = (b"%PDF", b"PK\x03\x04", b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"\x1f\x8b")
+
+
+def _looks_binary(chunk: bytes) -> bool:
+    """Sniff the first body chunk for common binary formats."""
+    return chunk.startswith(BINARY_SIGNATURES) or b"\x00" in chunk[:1024]
+
+
+def _sniff_encoding(response, chunk: bytes) -> str:
+    """Pick a text encoding from the Content-Type charset, a <meta charset>, or UTF-8."""
+    match = re.search(r"charset=([\w-]+)", response.headers.get("Content-Type", ""), re.I)
+    if not match:
+        match = re.search(rb"<meta[^>]+charset=[\"']?([\w-]+)", chunk[:4096], re.I)
+    encoding = match.group(1) if match else "utf-8"
+    if isinstance(encoding, bytes):
+        encoding = encoding.decode("ascii")
+    try:
+        codecs.lookup(encoding)
+        return encoding
+    except LookupError:
+        return "utf-8"
+
+
+def _content_length(response, default: int) -> int:
+    """Size of the full response body as announced by the server, or `default`."""
+    try:
+        return int(response.headers.get("Content-Length") or default)
+    except ValueError:
+        return default
 
 
 # === FILE DOWNLOADER ===
 class FileDownloaderTool(Toolkit):
+    """
+    Downloads run concurrently (DOWNLOAD_MAX_WORKERS) and are streamed to disk in chunks.
+    Interrupted transfers resume with an HTTP Range request on the next attempt.
+    Files are stored by content hash (see `tools.file_store`), so identical files fetched
+    from different URLs are kept once, and URLs already in the manifest are not fetched again.
+    extract_text turns downloaded files into page-level text via `tools.text_extract`.
+    """
+
     def __init__(
-        self, download_dir: str = "downloaded_files", default_prefix: str = "download"
+        self,
+        download_dir: str = "downloaded_files",
+        default_prefix: str = "download",
+        max_workers: int = DOWNLOAD_MAX_WORKERS,
+        deadline: Optional[float] = None,
     ):
         super().__init__(name="file_downloader_tool")
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(exist_ok=True)
         self.default_prefix = default_prefix
+        self.max_workers = max(1, max_workers)
+        self.deadline = deadline
+        self.store = ContentStore(self.download_dir)
         self.register(self.download_files)
         self.register(self.download_custom)
+        self.register(self.extract_text)
 
-    @sleep_and_retry
-    @limits(calls=RATE_LIMIT, period=PER_SECONDS)
-    def _rate_limited_request(self, *args, **kwargs):
-        """Internal method for rate-limited requests."""
-        return requests.get(*args, **kwargs)
+    def _rate_limited_request(self, url, **kwargs):
+        """Internal method for rate-limited requests over the shared connection pool."""
+        return http_client.get(url, **kwargs)
 
-    def download_files(self, urls: list[str]) -> str:
-        """Download supported files from a list of URLs. Rate limited to 5 requests/sec (configurable)."""
+    def download_files(self, urls: list[str], deadline: Optional[float] = None) -> str:
+        """
+        Download supported files from a list of URLs. Rate limited to 5 requests/sec (configurable).
+        Downloads still running when the deadline expires are stopped and resume on the next call.
+
+        Args:
+            urls (list[str]): URLs of the files to download.
+            deadline (Optional[float]): Time budget in seconds for this call
+                (defaults to TOOLS_CALL_DEADLINE; 0 means no deadline).
+        """
         logger.info(f"Starting download of {len(urls)} files")
-        log = []
-        for url in urls:
-            try:
-                filename = url.split("/")[-1].split("?")[0]
-                if not any(
-                    filename.endswith(ext) for ext in [".csv", ".pdf", ".txt", ".md"]
-                ):
-                    log.append(f"⚠️ Skipped (unsupported file type): {filename}")
-                    continue
+        urls = unique_urls(urls)
+        if not urls:
+            return ""
 
-                response = self._rate_limited_request(
-                    url, timeout=10, headers={"User-Agent": "Mozilla/5.0"}
-                )
+        budget = tool_deadlines.start(self.deadline if deadline is None else deadline)
+        log = map_with_deadline(
+            lambda url: self._download_file(url, budget),
+            urls,
+            self.max_workers,
+            budget,
+            thread_name_prefix="file_downloader",
+        )
+        return "\n".join(
+            line or f"⏱️ Skipped {url} (deadline of {budget.seconds:.0f}s exceeded)"
+            for url, line in zip(urls, log)
+        )
+
+    def _download_file(self, url: str, deadline: Optional[Deadline] = None) -> str:
+        """Download one URL from download_files and return its log line."""
+        try:
+            filename = url.split("/")[-1].split("?")[0]
+            if not any(filename.endswith(ext) for ext in DOWNLOAD_EXTENSIONS):
+                return f"⚠️ Skipped (unsupported file type): {filename}"
+
+            entry, status = self._fetch_to_store(url, filename, timeout=10, deadline=deadline)
+            logger.info(f"Successfully downloaded {entry['name']}")
+            return f"✅ Downloaded: {entry['name']}{status}"
+        except CircuitOpenError as e:
+            return f"⏭️ Skipped {url}: {e}"
+        except DeadlineExceeded as e:
+            logger.warning(f"Stopped downloading {url}: {e}")
+            return f"⏱️ Stopped {url}: {e} (partial download kept for resume)"
+        except Exception as e:
+            if deadline and deadline.expired:
+                # A request timeout capped by the deadline, not a problem with the URL
+                return f"⏱️ Stopped {url}: deadline exceeded ({e})"
+            logger.error(f"Failed to download {url}: {e}")
+            return f"❌ Failed to download {url}: {e}"
+
+    def _fetch_to_store(
+        self,
+        url: str,
+        filename: str,
+        timeout: float,
+        verify: bool = True,
+        deadline: Optional[Deadline] = None,
+    ) -> tuple[dict, str]:
+        """
+        Stream `url` into the content store under `filename`, resuming a partial download if one exists.
+        If `deadline` expires mid-transfer, the partial file is kept and DeadlineExceeded is raised.
+
+        Returns:
+            tuple[dict, str]: (manifest entry, status suffix for the log line).
+        """
+        existing = self.store.lookup_url(url)
+        if existing:
+            return existing, " (already downloaded)"
+
+        part_path = self.store.partial_path(url)
+        deadline = deadline or Deadline()
+        # A concurrent fetch of the same URL shares the partial file; wait for it instead of interleaving writes
+        lock = self.store.partial_lock(part_path)
+        left = deadline.remaining()
+        if not lock.acquire(timeout=-1 if left is None else left):
+            raise DeadlineExceeded("a concurrent download of the same URL finished")
+        try:
+            existing = self.store.lookup_url(url)
+            if existing:
+                return existing, " (already downloaded)"
+            return self._resume_to_store(url, filename, part_path, timeout, verify, deadline)
+        finally:
+            lock.release()
+
+    def _resume_to_store(
+        self,
+        url: str,
+        filename: str,
+        part_path: Path,
+        timeout: float,
+        verify: bool,
+        deadline: Deadline,
+    ) -> tuple[dict, str]:
+        """Resume or start the transfer into `part_path` and commit it. Caller holds the partial file's lock."""
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {"User-Agent": "Mozilla/5.0"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            validator = self.store.partial_validator(part_path)
+            if validator:
+                headers["If-Range"] = validator
+
+        response = self._rate_limited_request(
+            url, verify=verify, stream=True, timeout=timeout, headers=headers, deadline=deadline
+        )
+        try:
+            if response.status_code == 416 and offset:
+                # The partial file already holds the whole body
+                logger.info(f"Partial download of {url} is already complete")
+            else:
                 response.raise_for_status()
-                file_path = self.download_dir / filename
-                with open(file_path, "wb") as f:
-                    f.write(response.content)
+                if offset and response.status_code != 206:
+                    logger.info(f"Server ignored range for {url}, restarting download")
+                    offset = 0
+                if not offset:
+                    self.store.set_partial_validator(
+                        part_path,
+                        response.headers.get("ETag") or response.headers.get("Last-Modified"),
+                    )
+                with open(part_path, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                        deadline.check("download finished")
+        finally:
+            response.close()
 
-                log.append(f"✅ Downloaded: {filename}")
-                logger.info(f"Successfully downloaded {filename}")
-            except Exception as e:
-                log.append(f"❌ Failed to download {url}: {e}")
-                logger.error(f"Failed to download {url}: {e}")
-        return "\n".join(log)
+        digest = hash_file(part_path).hexdigest()
+        entry, duplicate = self.store.commit(part_path, digest, filename, url)
+        status = ""
+        if offset:
+            status = f" (resumed at {offset} bytes)"
+        if duplicate:
+            status += " (identical content already stored)"
+        return entry, status
+
+    def extract_text(self, filenames: list[str], max_chars: int = EXTRACT_MAX_CHARS) -> str:
+        """
+        Extract the text of previously downloaded files (PDF, TXT, MD, CSV), page by page.
+
+        Args:
+            filenames (list[str]): Names reported by download_files / download_custom.
+            max_chars (int): Maximum characters of text returned per file.
+
+        Returns:
+            str: Per file, a header line followed by "[page N]" chunks, truncated to max_chars.
+        """
+        logger.info(f"Extracting text from {len(filenames)} files")
+        names = list(dict.fromkeys(filenames))
+        targets, hashes, log = {}, {}, {}
+        for name in names:
+            path = self.download_dir / Path(name).name
+            if not path.is_file():
+                log[name] = f"❌ Not downloaded: {name}"
+            elif path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+                log[name] = f"⚠️ Skipped (unsupported file type): {name}"
+            else:
+                targets[name] = path
+                entry = self.store.lookup_name(path.name)
+                if entry:
+                    hashes[str(path)] = entry["sha256"]
+
+        results = text_extractor.extract(list(targets.values()), hashes)
+        for name, path in targets.items():
+            result = results[str(path)]
+            if "error" in result:
+                log[name] = f"❌ Failed to extract {path.name}: {result['error']}"
+                continue
+            chunks = result["chunks"]
+            if not chunks:
+                log[name] = f"❌ No extractable text in {path.name}"
+                continue
+            body, total = [], 0
+            for chunk in chunks:
+                if total >= max_chars:
+                    break
+                text = chunk["text"][: max_chars - total]
+                body.append(f"[page {chunk['page']}] {text}")
+                total += len(text)
+            cached = ", cached" if result["cached"] else ""
+            log[name] = f"✅ Extracted {path.name} ({len(chunks)} pages{cached})\n" + "\n".join(body)
+        return "\n\n".join(log[name] for name in names)
 
     def _generate_filename(self, url: str) -> str:
         """Generate filename from URL pattern or fallback to timestamp."""
@@ -89,24 +312,14 @@ class FileDownloaderTool(Toolkit):
             url = url_filename["url"]
             filename = url_filename.get("filename") or self._generate_filename(url)
 
-            save_path = self.download_dir / filename
-            logger.info(f"Downloading custom file from {url} to {save_path}")
-            response = self._rate_limited_request(
-                url,
-                verify=verify_ssl,
-                stream=True,
-                timeout=20,
-                headers={"User-Agent": "Mozilla/5.0"},
+            logger.info(f"Downloading custom file from {url} as {filename}")
+            entry, status = self._fetch_to_store(
+                url, filename, timeout=20, verify=verify_ssl
             )
-            response.raise_for_status()
-
-            with open(save_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+            save_path = self.download_dir / entry["name"]
 
             logger.info(f"Successfully downloaded custom file to {save_path}")
-            return f"✅ PDF saved successfully to {save_path}"
+            return f"✅ PDF saved successfully to {save_path}{status}"
         except Exception as e:
             logger.error(f"Failed to retrieve and download PDF: {e}")
             return f"❌ Failed to retrieve and download PDF: {e}"
@@ -115,44 +328,180 @@ class FileDownloaderTool(Toolkit):
 # === WEB SCRAPER ===
 class WebScraperTool(Toolkit):
     """
-    WebScraperTool uses the same global rate-limited request method as FileDownloaderTool.
+    WebScraperTool uses the same shared per-host rate limiter as FileDownloaderTool.
     All network requests are subject to the same rate limit.
+    URLs are scraped concurrently (SCRAPE_MAX_WORKERS); each body is streamed and reading
+    stops once enough paragraph text is found, after SCRAPE_MAX_BYTES, or after SCRAPE_TIMEOUT seconds.
+    Non-HTML responses are skipped before their body is downloaded.
+    Pages served with an ETag or Last-Modified header are kept in `tools.page_cache` and
+    revalidated with a conditional GET; a 304 response reuses the stored text without a download.
+    Pages whose text is a near-duplicate of an earlier page in the batch are collapsed to a reference.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = SCRAPE_MAX_WORKERS,
+        max_bytes: int = SCRAPE_MAX_BYTES,
+        timeout: float = SCRAPE_TIMEOUT,
+        deadline: Optional[float] = None,
+    ):
         super().__init__(name="web_scraper_tool")
+        self.max_workers = max(1, max_workers)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.deadline = deadline
         self.register(self.scrape_urls)
 
-    @sleep_and_retry
-    @limits(calls=RATE_LIMIT, period=PER_SECONDS)
-    def _rate_limited_request(self, *args, **kwargs):
-        """Internal method for rate-limited requests."""
-        return requests.get(*args, **kwargs)
+    def _rate_limited_request(self, url, **kwargs):
+        """Internal method for rate-limited requests over the shared connection pool."""
+        return http_client.get(url, **kwargs)
 
-    def scrape_urls(self, urls: list[str]) -> str:
-        """Extract paragraph text from each URL. Rate limited to 5 requests/sec (configurable)."""
+    def scrape_urls(self, urls: list[str], deadline: Optional[float] = None) -> str:
+        """
+        Extract paragraph text from each URL. Rate limited to 5 requests/sec (configurable).
+        Pages still loading when the deadline expires return their partial text; pages not started are skipped.
+
+        Args:
+            urls (list[str]): URLs of the pages to scrape.
+            deadline (Optional[float]): Time budget in seconds for this call
+                (defaults to TOOLS_CALL_DEADLINE; 0 means no deadline).
+        """
         logger.info(f"Starting scraping of {len(urls)} URLs")
-        log = []
-        for url in urls:
-            try:
-                response = self._rate_limited_request(url, timeout=10)
-                soup = BeautifulSoup(response.text, "html.parser")
-                paragraphs = soup.find_all("p")
-                text = "\n".join(
-                    p.get_text(strip=True)
-                    for p in paragraphs
-                    if len(p.get_text(strip=True)) > 40
-                )
-                if not text:
-                    log.append(f"❌ No usable content at {url}")
-                else:
-                    log.append(f"✅ Extracted from: {url}\n{text[:500]}...")
-                    logger.info(f"Successfully scraped content from {url}")
-            except Exception as e:
-                log.append(f"❌ Failed to scrape {url}: {e}")
-                logger.error(f"Failed to scrape {url}: {e}")
+        urls = unique_urls(urls)
+        if not urls:
+            return ""
+
+        # Scrape concurrently; results come back in input order
+        budget = tool_deadlines.start(self.deadline if deadline is None else deadline)
+        scraped = map_with_deadline(
+            lambda url: self._scrape_url(url, budget),
+            urls,
+            self.max_workers,
+            budget,
+            thread_name_prefix="web_scraper",
+        )
+        scraped = [
+            result or (f"⏱️ Skipped {url} (deadline of {budget.seconds:.0f}s exceeded)", "")
+            for url, result in zip(urls, scraped)
+        ]
+        log = [line for line, _ in scraped]
+
+        # Pages that repeat an earlier page (syndicated stories, mirrored papers) are collapsed
+        with_text = [(i, text) for i, (_, text) in enumerate(scraped) if text]
+        _, duplicates = filter_near_duplicates(with_text, lambda item: item[1])
+        for dup, original in duplicates.items():
+            i, original_i = with_text[dup][0], with_text[original][0]
+            log[i] = f"♻️ Near-duplicate of {urls[original_i]}: {urls[i]}"
+        if duplicates:
+            logger.info(f"Collapsed {len(duplicates)} near-duplicate pages out of {len(with_text)}")
+
+        stats = page_cache.stats()
+        if stats["revalidations"]:
+            logger.info(
+                f"[PageCache] {stats['not_modified']}/{stats['revalidations']} pages not modified, "
+                f"{stats['bytes_saved']} bytes saved"
+            )
         return "\n".join(log)
 
+    def _scrape_url(self, url: str, deadline: Optional[Deadline] = None) -> tuple[str, str]:
+        """Scrape one URL and return (log line including how long it took, extracted text)."""
+        start = time.monotonic()
+        try:
+            text, note, cached = self._stream_paragraphs(url, start, deadline or Deadline())
+            elapsed = time.monotonic() - start
+            if note:
+                logger.info(f"Skipped {url}: {note}")
+                return f"⚠️ Skipped {url} ({note}) [{elapsed:.2f}s]", ""
+            if not text:
+                return f"❌ No usable content at {url} [{elapsed:.2f}s]", ""
+            if cached:
+                logger.info(f"Served {url} from page cache (not modified) in {elapsed:.2f}s")
+                return f"✅ Extracted from: {url} (cached, not modified) [{elapsed:.2f}s]\n{text[:PREVIEW_CHARS]}...", text
+            logger.info(f"Successfully scraped content from {url} in {elapsed:.2f}s")
+            return f"✅ Extracted from: {url} [{elapsed:.2f}s]\n{text[:PREVIEW_CHARS]}...", text
+        except CircuitOpenError as e:
+            return f"⏭️ Skipped {url}: {e}", ""
+        except DeadlineExceeded as e:
+            return f"⏱️ Skipped {url}: {e}", ""
+        except Exception as e:
+            elapsed = time.monotonic() - start
+            if deadline and deadline.expired:
+                # A request timeout capped by the deadline, not a problem with the page
+                return f"⏱️ Stopped {url}: deadline exceeded [{elapsed:.2f}s]", ""
+            logger.error(f"Failed to scrape {url}: {e}")
+            return f"❌ Failed to scrape {url}: {e} [{elapsed:.2f}s]", ""
+
+    def _stream_paragraphs(
+        self, url: str, start: float, deadline: Deadline
+    ) -> tuple[str, Optional[str], bool]:
+        """
+        Stream a page and extract paragraph text until enough is collected.
+
+        Reading stops once PREVIEW_CHARS of paragraph text is found, after max_bytes
+        of body, or when the per-URL timeout or the call's deadline elapses,
+        whichever comes first.
+        If the page is in the page cache, the request is made conditional and a
+        304 Not Modified answer returns the cached text.
+
+        Returns:
+            tuple[str, Optional[str], bool]: (extracted text, reason the page was skipped or None,
+            whether the text came from the page cache).
+        """
+        cached = page_cache.get(url)
+        headers = page_cache.conditional_headers(cached)
+        if headers:
+            page_cache.mark_revalidating()
+
+        response = self._rate_limited_request(
+            url, timeout=self.timeout, stream=True, headers=headers, deadline=deadline
+        )
+        try:
+            if response.status_code == 304 and cached:
+                return page_cache.hit(url, cached), None, True
+
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in HTML_CONTENT_TYPES:
+                return "", f"content type {content_type}", False
+
+            extractor = ParagraphStream(min_length=40, max_chars=PREVIEW_CHARS)
+            decoder = None
+            received = 0
+            timed_out = False
+            for chunk in response.iter_content(chunk_size=SCRAPE_CHUNK_SIZE):
+                if not chunk:
+                    continue
+                if decoder is None:
+                    if _looks_binary(chunk):
+                        return "", "binary content", False
+                    decoder = codecs.getincrementaldecoder(
+                        _sniff_encoding(response, chunk)
+                    )(errors="replace")
+                received += len(chunk)
+                if extractor.feed(decoder.decode(chunk)):
+                    break
+                if received >= self.max_bytes:
+                    logger.info(f"Byte cap reached for {url} after {received} bytes")
+                    break
+                if time.monotonic() - start > self.timeout or deadline.expired:
+                    logger.warning(f"Timed out reading {url}, using partial content")
+                    timed_out = True
+                    break
+            text = "\n".join(extractor.close())
+
+            # Partial reads after a timeout are not cached so the next run fetches the full page
+            if response.status_code == 200 and text and not timed_out:
+                page_cache.put(
+                    url,
+                    text,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    body_bytes=_content_length(response, received),
+                    revalidated=cached is not None,
+                )
+            return text, None, False
+        finally:
+            response.close()
+
     @staticmethod
     def _safe_find(element: Tag, *args, **kwargs) -> Optional[Tag]:
         """
@@ -171,10 +520,17 @@ class WebScraperTool(Toolkit):
 
 # === MARKDOWN FORMATTER ===
 class MarkdownFormatterTool(Toolkit):
+    """
+    Saves documents into the local corpus in `tools.corpus_store`: each file gets a
+    collision-safe id and a record in the append-only manifest.jsonl, and documents
+    whose content is already stored are not written again.
+    """
+
     def __init__(self, output_dir: str = "scraped_markdown"):
         super().__init__(name="markdown_formatter_tool")
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.store = CorpusStore(output_dir)
         self.register(self.format_documents)
 
     def format_documents(self, documents: list[dict[str, str]]) -> str:
@@ -191,15 +547,11 @@ class MarkdownFormatterTool(Toolkit):
                 content = doc.get("content", "")
                 source = doc.get("source", "")
 
-                # Sanitize title for filename
-                safe_title = re.sub(r"[^a-zA-Z0-9\-_]", "_", title.lower())[:80]
-                filename = self.output_dir / f"{safe_title}.md"
-
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write(f"# {title}\n\n")
-                    if source:
-                        f.write(f"**Source:** {source}\n\n")
-                    f.write(content.strip())
+                record, created = self.store.add(title, content, source)
+                filename = self.store.path_for(record)
+                if not created:
+                    log.append(f"♻️ Already stored: {filename.name}")
+                    continue
 
                 log.append(f"✅ Saved markdown: {filename.name}")
                 logger.info(f"Successfully saved markdown: {filename.name}")
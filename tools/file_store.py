@@ -0,0 +1,184 @@
+# file_store.py
+
+"""
+Content-addressed storage for files fetched by FileDownloaderTool.
+- File bodies are stored once under `<root>/objects/<aa>/<sha256><ext>`, so the same PDF fetched from
+  different URLs (or under different names) takes up disk space only once.
+- `<root>/manifest.json` maps each saved file name to its hash, size, source URL and object path,
+  and records which URLs were already fetched so later runs can skip them.
+- The friendly name `<root>/<name>` is a hard link to the stored object (a copy where links are unsupported),
+  so existing consumers of the download folder keep working.
+- Partial downloads live in `<root>/.partial/` with a small sidecar holding the response validator,
+  so an interrupted transfer can resume with an HTTP Range request. partial_lock() serializes concurrent
+  fetches of the same URL in the process, which would otherwise write to the same partial file.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from agno.utils.log import logger
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# One lock per partial file, shared by every ContentStore of the process (tools build their own stores)
+_partial_locks: dict[str, threading.Lock] = {}
+_partial_locks_guard = threading.Lock()
+
+
+def hash_file(path: Path):
+    """Return a sha256 object primed with the contents of `path`, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest
+
+
+class ContentStore:
+    """Hash-addressed file store with a name → hash manifest."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.partial_dir = self.root / ".partial"
+        self.manifest_path = self.root / "manifest.json"
+        self._lock = threading.Lock()
+        self._manifest: Optional[dict] = None
+
+    # === manifest ===
+    def _load(self) -> dict:
+        if self._manifest is None:
+            manifest = {"files": {}, "urls": {}}
+            if self.manifest_path.exists():
+                try:
+                    manifest.update(json.loads(self.manifest_path.read_text(encoding="utf-8")))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"[ContentStore] Ignoring unreadable manifest: {e}")
+            self._manifest = manifest
+        return self._manifest
+
+    def _save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(self._manifest, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def lookup_url(self, url: str) -> Optional[dict]:
+        """Return the manifest entry of a file already downloaded from `url`, if its object still exists."""
+        with self._lock:
+            manifest = self._load()
+            name = manifest["urls"].get(url)
+            entry = manifest["files"].get(name) if name else None
+        if entry and (self.root / entry["object"]).exists():
+            return {"name": name, **entry}
+        return None
+
+    def lookup_name(self, name: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._load()["files"].get(name)
+        return {"name": name, **entry} if entry else None
+
+    # === partial downloads ===
+    def partial_path(self, url: str) -> Path:
+        """Stable location of the in-progress download for `url`."""
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.partial_dir / f"{key}.part"
+
+    def partial_lock(self, part_path: Path) -> threading.Lock:
+        """Lock to hold while resuming, writing or committing `part_path`, so concurrent fetches do not interleave."""
+        key = str(part_path.resolve())
+        with _partial_locks_guard:
+            return _partial_locks.setdefault(key, threading.Lock())
+
+    def partial_validator(self, part_path: Path) -> Optional[str]:
+        """ETag / Last-Modified recorded when the partial download started, for If-Range."""
+        meta = part_path.with_suffix(".json")
+        try:
+            return json.loads(meta.read_text(encoding="utf-8")).get("validator")
+        except (OSError, ValueError):
+            return None
+
+    def set_partial_validator(self, part_path: Path, validator: Optional[str]) -> None:
+        meta = part_path.with_suffix(".json")
+        if validator:
+            meta.write_text(json.dumps({"validator": validator}), encoding="utf-8")
+        else:
+            meta.unlink(missing_ok=True)
+
+    def discard_partial(self, part_path: Path) -> None:
+        part_path.unlink(missing_ok=True)
+        part_path.with_suffix(".json").unlink(missing_ok=True)
+
+    # === commit ===
+    def _unique_name(self, name: str, sha256: str) -> str:
+        """Keep `name` unless it is taken by different content (or an unmanaged file); then add a hash suffix."""
+        existing = self._manifest["files"].get(name)
+        if existing is None and not (self.root / name).exists():
+            return name
+        if existing is not None and existing["sha256"] == sha256:
+            return name
+        stem, ext = os.path.splitext(name)
+        return f"{stem}_{sha256[:8]}{ext}"
+
+    def commit(self, part_path: Path, sha256: str, name: str, url: str) -> tuple[dict, bool]:
+        """
+        Move a completed download into the object store and record it under `name`.
+
+        Args:
+            part_path (Path): Completed partial file.
+            sha256 (str): Hex digest of its contents.
+            name (str): Requested file name.
+            url (str): Source URL.
+
+        Returns:
+            tuple[dict, bool]: (manifest entry including the final name, whether the content was already stored).
+        """
+        ext = os.path.splitext(name)[1].lower()
+        object_rel = Path("objects") / sha256[:2] / f"{sha256}{ext}"
+        object_path = self.root / object_rel
+
+        with self._lock:
+            manifest = self._load()
+            duplicate = object_path.exists()
+            if duplicate:
+                part_path.unlink(missing_ok=True)
+            else:
+                object_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(part_path, object_path)
+            part_path.with_suffix(".json").unlink(missing_ok=True)
+
+            name = self._unique_name(name, sha256)
+            self._link(object_path, self.root / name)
+            entry = {
+                "sha256": sha256,
+                "size": object_path.stat().st_size,
+                "url": url,
+                "object": object_rel.as_posix(),
+                "downloaded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            manifest["files"][name] = entry
+            manifest["urls"][url] = name
+            self._save()
+        return {"name": name, **entry}, duplicate
+
+    @staticmethod
+    def _link(object_path: Path, named_path: Path) -> None:
+        """Expose the object under its friendly name without storing a second copy where possible."""
+        if named_path.exists():
+            try:
+                if os.path.samefile(named_path, object_path):
+                    return
+            except OSError:
+                pass
+            named_path.unlink()
+        try:
+            os.link(object_path, named_path)
+        except OSError:
+            shutil.copyfile(object_path, named_path)
@@ -0,0 +1,384 @@
+# html_extract.py
+
+"""
+Pluggable HTML extraction engine for search result links and article paragraphs.
+- Backends: "selectolax" and "lxml" (fast, optional), "stream" (stdlib html.parser, no tree) and "bs4" (BeautifulSoup, the original path).
+- TOOLS_HTML_BACKEND picks the backend (default: "auto" = lxml, then selectolax, then stream).
+- The lxml and stream backends parse incrementally and stop as soon as enough links / paragraph text is found.
+- Any backend error falls back to BeautifulSoup so extraction never gets worse than before.
+- ParagraphStream extracts paragraphs from a response body as it is being downloaded.
+"""
+
+import os
+from html.parser import HTMLParser
+from typing import Callable, Optional
+
+from agno.utils.log import logger
+from bs4 import BeautifulSoup, Tag
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+HTML_BACKEND = os.getenv("TOOLS_HTML_BACKEND", "auto").lower()
+
+# Size of the chunks fed to incremental parsers between early-exit checks
+FEED_CHUNK_SIZE = 16 * 1024
+
+RESULT_LINK_CLASS = "result__a"
+
+
+class _EnoughResults(Exception):
+    """Raised inside a streaming parser to stop once enough results are collected."""
+
+
+def _chunks(html: str, size: int = FEED_CHUNK_SIZE):
+    for i in range(0, len(html), size):
+        yield html[i : i + size]
+
+
+def _has_class(value: Optional[str], cls: str) -> bool:
+    return bool(value) and cls in value.split()
+
+
+# === BeautifulSoup ===
+def _bs4_links(html: str, limit: int) -> list[tuple[str, str]]:
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    for link in soup.find_all("a", class_=RESULT_LINK_CLASS, limit=limit):
+        if isinstance(link, Tag):
+            href = link.get("href")
+            snippet = link.get_text(strip=True)
+            if href and snippet:
+                results.append((snippet, str(href)))
+    return results
+
+
+def _bs4_paragraphs(html: str, min_length: int, max_chars: Optional[int]) -> list[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    paragraphs, total = [], 0
+    for p in soup.find_all("p"):
+        text = p.get_text(strip=True)
+        if len(text) > min_length:
+            paragraphs.append(text)
+            total += len(text) + 1
+            if max_chars is not None and total >= max_chars:
+                break
+    return paragraphs
+
+
+# === selectolax ===
+def _selectolax_text(node) -> str:
+    return "".join(
+        part.strip() for part in node.text(deep=True, separator="\x00").split("\x00")
+    )
+
+
+def _selectolax_links(html: str, limit: int) -> list[tuple[str, str]]:
+    tree = SelectolaxParser(html)
+    results = []
+    for node in tree.css(f"a.{RESULT_LINK_CLASS}"):
+        href = node.attributes.get("href")
+        snippet = _selectolax_text(node)
+        if href and snippet:
+            results.append((snippet, href))
+            if len(results) >= limit:
+                break
+    return results
+
+
+def _selectolax_paragraphs(
+    html: str, min_length: int, max_chars: Optional[int]
+) -> list[str]:
+    tree = SelectolaxParser(html)
+    paragraphs, total = [], 0
+    for node in tree.css("p"):
+        text = _selectolax_text(node)
+        if len(text) > min_length:
+            paragraphs.append(text)
+            total += len(text) + 1
+            if max_chars is not None and total >= max_chars:
+                break
+    return paragraphs
+
+
+# === lxml (incremental) ===
+def _lxml_text(element) -> str:
+    return "".join(part.strip() for part in element.itertext())
+
+
+def _lxml_scan(html: str, tag: str, on_element: Callable) -> None:
+    """Feed `html` to an lxml pull parser, calling on_element for each closed `tag` until it says stop."""
+    parser = etree.HTMLPullParser(events=("end",), tag=tag)
+    for chunk in _chunks(html):
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            if on_element(element):
+                return
+    parser.close()
+    for _, element in parser.read_events():
+        if on_element(element):
+            return
+
+
+def _lxml_links(html: str, limit: int) -> list[tuple[str, str]]:
+    results = []
+
+    def on_element(element) -> bool:
+        if _has_class(element.get("class"), RESULT_LINK_CLASS):
+            href = element.get("href")
+            snippet = _lxml_text(element)
+            if href and snippet:
+                results.append((snippet, href))
+        return len(results) >= limit
+
+    _lxml_scan(html, "a", on_element)
+    return results
+
+
+def _lxml_paragraphs(html: str, min_length: int, max_chars: Optional[int]) -> list[str]:
+    paragraphs = []
+    total = 0
+
+    def on_element(element) -> bool:
+        nonlocal total
+        text = _lxml_text(element)
+        if len(text) > min_length:
+            paragraphs.append(text)
+            total += len(text) + 1
+        return max_chars is not None and total >= max_chars
+
+    _lxml_scan(html, "p", on_element)
+    return paragraphs
+
+
+# === stdlib streaming parser ===
+class _StreamExtractor(HTMLParser):
+    """Collects text of `tag` elements (optionally with a required class) without building a tree."""
+
+    def __init__(self, tag: str, cls: Optional[str], accept: Callable):
+        super().__init__(convert_charrefs=True)
+        self.tag = tag
+        self.cls = cls
+        self.accept = accept
+        self._depth = 0
+        self._attrs: dict = {}
+        self._parts: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == self.tag:
+            attrs = dict(attrs)
+            if self.cls is None or _has_class(attrs.get("class"), self.cls):
+                # A new <p> implicitly closes an open one
+                if self._depth and self.tag == "p":
+                    self._finish()
+                self._depth = 1
+                self._attrs = attrs
+                self._parts = []
+
+    def handle_endtag(self, tag):
+        if tag == self.tag and self._depth:
+            self._finish()
+
+    def handle_data(self, data):
+        if self._depth:
+            self._parts.append(data.strip())
+
+    def _finish(self):
+        self._depth = 0
+        if self.accept("".join(self._parts), self._attrs):
+            raise _EnoughResults
+
+    def run(self, html: str) -> None:
+        try:
+            for chunk in _chunks(html):
+                self.feed(chunk)
+            self.close()
+        except _EnoughResults:
+            pass
+
+
+def _stream_links(html: str, limit: int) -> list[tuple[str, str]]:
+    results = []
+
+    def accept(text: str, attrs: dict) -> bool:
+        href = attrs.get("href")
+        if href and text:
+            results.append((text, href))
+        return len(results) >= limit
+
+    _StreamExtractor("a", RESULT_LINK_CLASS, accept).run(html)
+    return results
+
+
+def _stream_paragraphs(
+    html: str, min_length: int, max_chars: Optional[int]
+) -> list[str]:
+    paragraphs = []
+    total = 0
+
+    def accept(text: str, attrs: dict) -> bool:
+        nonlocal total
+        if len(text) > min_length:
+            paragraphs.append(text)
+            total += len(text) + 1
+        return max_chars is not None and total >= max_chars
+
+    _StreamExtractor("p", None, accept).run(html)
+    return paragraphs
+
+
+class ParagraphStream:
+    """
+    Incremental paragraph extractor for pages read in chunks.
+
+    Uses the lxml pull parser when available, otherwise the stdlib streaming parser.
+    feed() returns True once `max_chars` of paragraph text has been collected, so the
+    caller can stop reading the response body.
+    """
+
+    def __init__(self, min_length: int = 40, max_chars: Optional[int] = None):
+        self.min_length = min_length
+        self.max_chars = max_chars
+        self.paragraphs: list[str] = []
+        self.done = False
+        self._total = 0
+        if etree is not None:
+            self._lxml = etree.HTMLPullParser(events=("end",), tag="p")
+            self._stream = None
+        else:
+            self._lxml = None
+            self._stream = _StreamExtractor("p", None, self._accept)
+
+    def _accept(self, text: str, attrs: Optional[dict] = None) -> bool:
+        if len(text) > self.min_length:
+            self.paragraphs.append(text)
+            self._total += len(text) + 1
+        return self.max_chars is not None and self._total >= self.max_chars
+
+    def _drain(self) -> None:
+        for _, element in self._lxml.read_events():
+            if self._accept(_lxml_text(element)):
+                self.done = True
+                return
+
+    def feed(self, chunk: str) -> bool:
+        """Parse the next chunk of markup. Returns True when enough text has been collected."""
+        if self.done:
+            return True
+        if self._lxml is not None:
+            self._lxml.feed(chunk)
+            self._drain()
+        else:
+            try:
+                self._stream.feed(chunk)
+            except _EnoughResults:
+                self.done = True
+        return self.done
+
+    def close(self) -> list[str]:
+        """Flush the parser and return the collected paragraphs."""
+        if not self.done:
+            try:
+                if self._lxml is not None:
+                    self._lxml.close()
+                    self._drain()
+                else:
+                    self._stream.close()
+            except _EnoughResults:
+                pass
+            except Exception as e:
+                # lxml raises on documents it could not parse at all (e.g. empty bodies)
+                logger.debug(f"[HtmlExtract] Parser close failed: {e}")
+            self.done = True
+        return self.paragraphs
+
+
+BACKENDS = {
+    "selectolax": (_selectolax_links, _selectolax_paragraphs),
+    "lxml": (_lxml_links, _lxml_paragraphs),
+    "stream": (_stream_links, _stream_paragraphs),
+    "bs4": (_bs4_links, _bs4_paragraphs),
+}
+
+
+def available_backends() -> list[str]:
+    """Backends usable in this environment, in "auto" preference order."""
+    names = []
+    if etree is not None:
+        names.append("lxml")
+    if SelectolaxParser is not None:
+        names.append("selectolax")
+    return names + ["stream", "bs4"]
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """Map a requested backend (or TOOLS_HTML_BACKEND) to one that is installed."""
+    name = (name or HTML_BACKEND).lower()
+    available = available_backends()
+    if name in available:
+        return name
+    if name not in ("auto", ""):
+        logger.warning(f"[HtmlExtract] Backend {name!r} unavailable, using {available[0]!r}")
+    return available[0]
+
+
+def extract_result_links(
+    html: str, limit: int, backend: Optional[str] = None
+) -> list[tuple[str, str]]:
+    """
+    Extract up to `limit` (title, href) pairs from a DuckDuckGo HTML result page.
+
+    Args:
+        html (str): Result page markup.
+        limit (int): Maximum number of links; parsing stops once reached where the backend allows it.
+        backend (Optional[str]): Backend name; defaults to TOOLS_HTML_BACKEND.
+
+    Returns:
+        list[tuple[str, str]]: (title, href) pairs in page order.
+    """
+    name = resolve_backend(backend)
+    try:
+        return BACKENDS[name][0](html, limit)
+    except Exception as e:
+        if name == "bs4":
+            raise
+        logger.warning(f"[HtmlExtract] {name} failed on result page, falling back to bs4: {e}")
+        return _bs4_links(html, limit)
+
+
+def extract_paragraphs(
+    html: str,
+    min_length: int = 40,
+    max_chars: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> list[str]:
+    """
+    Extract the stripped text of `<p>` elements longer than `min_length` characters.
+
+    Args:
+        html (str): Page markup.
+        min_length (int): Paragraphs of this length or shorter are skipped.
+        max_chars (Optional[int]): Stop once the joined paragraphs reach this many characters.
+        backend (Optional[str]): Backend name; defaults to TOOLS_HTML_BACKEND.
+
+    Returns:
+        list[str]: Paragraph texts in document order.
+    """
+    name = resolve_backend(backend)
+    try:
+        return BACKENDS[name][1](html, min_length, max_chars)
+    except Exception as e:
+        if name == "bs4":
+            raise
+        logger.warning(f"[HtmlExtract] {name} failed on page, falling back to bs4: {e}")
+        return _bs4_paragraphs(html, min_length, max_chars)
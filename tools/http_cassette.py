@@ -0,0 +1,193 @@
+# http_cassette.py
+
+"""
+Record/replay layer for the shared HTTP client, so `tools/` can be exercised and benchmarked offline.
+- TOOLS_HTTP_CASSETTE=record stores every response `tools.http_client` receives as one JSON cassette file per
+  request under TOOLS_HTTP_CASSETTE_DIR (default: tmp/cassettes), keyed by method + full URL + the request
+  headers that change the answer (Range, If-Range, If-None-Match, If-Modified-Since, Accept).
+- TOOLS_HTTP_CASSETTE=replay answers every request from the cassettes without network I/O; a request with no
+  cassette raises CassetteMiss (a requests.ConnectionError, so callers treat it like an unreachable host).
+- TOOLS_HTTP_STUB=http://127.0.0.1:8900 sends all traffic to the local stub server in `scripts/stub_server.py`
+  instead of the real hosts; the stub serves recorded cassettes and synthetic pages with configurable latency
+  and error injection. Rate limiting, circuit breakers and caches still key on the original URL.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CASSETTE_MODE = os.getenv("TOOLS_HTTP_CASSETTE", "off").strip().lower()
+CASSETTE_DIR = os.getenv("TOOLS_HTTP_CASSETTE_DIR", "tmp/cassettes")
+STUB_URL = os.getenv("TOOLS_HTTP_STUB", "").strip().rstrip("/")
+
+# Request headers that select a different response for the same URL
+KEY_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since", "accept")
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def full_url(url: str, params: Optional[dict] = None) -> str:
+    """The URL a GET with `params` is sent to."""
+    if not params:
+        return url
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+def cassette_key(method: str, url: str, headers: Optional[dict] = None) -> str:
+    """Stable key of a request: method, URL and the headers in KEY_HEADERS."""
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    parts = [method.upper(), url] + [f"{h}:{headers[h]}" for h in KEY_HEADERS if headers.get(h)]
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def stub_url(url: str, stub: str = STUB_URL) -> str:
+    """Address of `url` on the stub server."""
+    return f"{stub}/fetch?url={quote(url, safe='')}"
+
+
+class CassetteResponse:
+    """Minimal requests-compatible response backed by a recorded body."""
+
+    def __init__(self, status_code: int, headers: dict, url: str, content: bytes, reason: str = ""):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.url = url
+        self.reason = reason
+        self.content = content
+        self.encoding = get_encoding_from_headers(self.headers) or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def iter_content(self, chunk_size: int = 8192):
+        size = chunk_size or len(self.content) or 1
+        for i in range(0, len(self.content), size):
+            yield self.content[i : i + size]
+
+    def raise_for_status(self) -> None:
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(
+                f"{self.status_code} Error: {self.reason} for url: {self.url}",
+                response=self,
+            )
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CassetteStore:
+    """Directory of cassette files, one JSON file per recorded request, grouped by host."""
+
+    def __init__(self, root: str = CASSETTE_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    def path_for(self, url: str, key: str) -> Path:
+        host = urlsplit(url).hostname or "unknown"
+        return self.root / host / f"{key}.json"
+
+    def load(self, method: str, url: str, headers: Optional[dict] = None) -> Optional[dict]:
+        """The recorded cassette for a request, or None."""
+        path = self.path_for(url, cassette_key(method, url, headers))
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def save(self, method: str, url: str, headers: Optional[dict], response, content: bytes) -> dict:
+        """Write a cassette for a response whose body has been read into `content`."""
+        key = cassette_key(method, url, headers)
+        record = {
+            "key": key,
+            "method": method.upper(),
+            "url": url,
+            "request_headers": {
+                h: v for h, v in (headers or {}).items() if h.lower() in KEY_HEADERS
+            },
+            "status": response.status_code,
+            "reason": getattr(response, "reason", "") or "",
+            "headers": {
+                k: v
+                for k, v in response.headers.items()
+                # The body is stored decoded and unchunked
+                if k.lower() not in ("content-encoding", "transfer-encoding", "content-length", "connection")
+            },
+            "recorded_at": time.time(),
+        }
+        try:
+            record["body"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            record["body_b64"] = base64.b64encode(content).decode("ascii")
+        path = self.path_for(url, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(record, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(path)
+        with self._lock:
+            self.recorded += 1
+        return record
+
+    @staticmethod
+    def body_of(record: dict) -> bytes:
+        if "body_b64" in record:
+            return base64.b64decode(record["body_b64"])
+        return record.get("body", "").encode("utf-8")
+
+    def to_response(self, record: dict) -> CassetteResponse:
+        return CassetteResponse(
+            record["status"],
+            record["headers"],
+            record["url"],
+            self.body_of(record),
+            record.get("reason", ""),
+        )
+
+    def replay(self, url: str, headers: Optional[dict] = None) -> CassetteResponse:
+        """Answer a GET from its cassette, raising CassetteMiss if it was not recorded."""
+        record = self.load("GET", url, headers)
+        with self._lock:
+            if record is None:
+                self.misses += 1
+            else:
+                self.replayed += 1
+        if record is None:
+            raise CassetteMiss(f"No cassette recorded for GET {url}")
+        return self.to_response(record)
+
+    def record(self, url: str, headers: Optional[dict], response) -> CassetteResponse:
+        """Read a live response completely, store it and return a replayable copy."""
+        try:
+            content = response.content
+        finally:
+            response.close()
+        return self.to_response(self.save("GET", url, headers, response, content))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"recorded": self.recorded, "replayed": self.replayed, "misses": self.misses}
+
+
+# Shared process-wide cassette store used by `tools.http_client`
+cassettes = CassetteStore()
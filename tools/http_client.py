@@ -0,0 +1,352 @@
+# http_client.py
+
+"""
+Shared, pooled HTTP client used by every toolkit.
+- One keep-alive `requests.Session` per process, so repeated requests to the same host reuse TCP/TLS connections.
+- Pool sizes are configurable: TOOLS_HTTP_POOL_CONNECTIONS (hosts kept pooled, default: 20),
+  TOOLS_HTTP_POOL_MAXSIZE (connections per host, default: 10) and per-host overrides via
+  TOOLS_HTTP_POOL_OVERRIDES, e.g. "html.duckduckgo.com=20".
+- Every request gets a default (connect, read) timeout from TOOLS_HTTP_CONNECT_TIMEOUT / TOOLS_HTTP_READ_TIMEOUT
+  (default: 5s / 20s) unless the caller passes its own.
+- Set TOOLS_HTTP2=1 to send requests over HTTP/2 via `httpx` when it is installed with the `h2` extra;
+  otherwise the requests session is used.
+- All requests pass through the shared per-host rate limiter (`tools.rate_limiter`). Responses feed its
+  adaptive rate control: 429, 503 and search-engine block pages (e.g. DuckDuckGo's HTTP 202 "anomaly" page)
+  slow the host down and are retried up to TOOLS_HTTP_RETRIES times (default: 2) with jittered exponential
+  backoff, honouring Retry-After (capped at TOOLS_HTTP_RETRY_AFTER_MAX seconds). A response that is still
+  blocked after the retries is returned with `response.blocked = True`.
+- TOOLS_HTTP_CASSETTE=record|replay records responses to / replays them from cassette files, and TOOLS_HTTP_STUB
+  routes requests to a local stub server (`tools.http_cassette`), so the tools can run without the internet.
+- A `deadline` keyword (`tools.deadline.Deadline`) caps each attempt's timeout and rate-limiter wait to the time
+  left, skips retries that would not finish in time and raises DeadlineExceeded instead of sending a request
+  after it expires. Running out of deadline is not held against the host's circuit breaker.
+- Every request is guarded by the host's circuit breaker (`tools.circuit_breaker`): transport errors, 5xx and
+  blocked responses count as failures, and requests to an open circuit raise CircuitOpenError without network I/O.
+  Other 5xx responses (500, 502, ...) are not retried: they are returned at once and count against the breaker.
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from agno.utils.log import logger
+from requests.adapters import HTTPAdapter
+
+from tools.circuit_breaker import circuit_breakers
+from tools.deadline import Deadline, DeadlineExceeded
+from tools.http_cassette import CASSETTE_MODE, STUB_URL, cassettes, full_url, stub_url
+from tools.rate_limiter import rate_limiter
+
+try:
+    import httpx
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+except ImportError:
+    httpx = None
+
+# Errors a request raises when its (possibly deadline-capped) timeout runs out
+TIMEOUT_ERRORS = (requests.Timeout, TimeoutError) + ((httpx.TimeoutException,) if httpx is not None else ())
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _parse_pool_overrides(raw: Optional[str]) -> dict[str, int]:
+    """Parse "host=size,host=size" into a dict, skipping malformed entries."""
+    overrides = {}
+    for item in (raw or "").split(","):
+        host, sep, size = item.partition("=")
+        if not sep:
+            continue
+        try:
+            overrides[host.strip().lower()] = int(size)
+        except ValueError:
+            logger.warning(f"[HttpClient] Ignoring invalid pool override: {item!r}")
+    return overrides
+
+
+CONNECT_TIMEOUT = _env_float("TOOLS_HTTP_CONNECT_TIMEOUT", 5.0)
+READ_TIMEOUT = _env_float("TOOLS_HTTP_READ_TIMEOUT", 20.0)
+POOL_CONNECTIONS = _env_int("TOOLS_HTTP_POOL_CONNECTIONS", 20)
+POOL_MAXSIZE = _env_int("TOOLS_HTTP_POOL_MAXSIZE", 10)
+POOL_OVERRIDES = _parse_pool_overrides(os.getenv("TOOLS_HTTP_POOL_OVERRIDES"))
+HTTP2_ENABLED = os.getenv("TOOLS_HTTP2", "0").lower() in ("1", "true", "yes")
+RETRIES = _env_int("TOOLS_HTTP_RETRIES", 2)
+RETRY_BACKOFF = _env_float("TOOLS_HTTP_RETRY_BACKOFF", 0.5)
+RETRY_AFTER_MAX = _env_float("TOOLS_HTTP_RETRY_AFTER_MAX", 30.0)
+
+# Markers of the HTML pages search engines serve instead of results when they throttle a client
+BLOCK_PAGE_MARKERS = ("anomaly-modal", "anomaly.js", "g-recaptcha", "unusual traffic")
+BLOCK_PAGE_MAX_BYTES = 64 * 1024
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), RETRY_AFTER_MAX)
+
+
+def is_throttled(response, stream: bool = False) -> bool:
+    """True for 429 / 503 responses and search-engine block pages; other 5xx are plain failures."""
+    status = response.status_code
+    if status in (429, 503):
+        return True
+    if status == 202 and "duckduckgo" in response.url:
+        return True
+    # Only inspect bodies that are already in memory and small enough to be an interstitial
+    if stream or status != 200 or "html" not in response.headers.get("Content-Type", ""):
+        return False
+    content = response.content
+    if len(content) > BLOCK_PAGE_MAX_BYTES:
+        return False
+    text = content.decode("utf-8", errors="ignore").lower()
+    return any(marker in text for marker in BLOCK_PAGE_MARKERS)
+
+
+class _Http2Response:
+    """Minimal requests-compatible view over an httpx response."""
+
+    def __init__(self, response, stream: bool = False):
+        self._response = response
+        self._stream = stream
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.reason = response.reason_phrase
+
+    @property
+    def content(self) -> bytes:
+        if self._stream:
+            return self._response.read()
+        return self._response.content
+
+    @property
+    def text(self) -> str:
+        if self._stream:
+            self._response.read()
+        return self._response.text
+
+    def iter_content(self, chunk_size: int = 8192):
+        if not self._stream:
+            content = self._response.content
+            for i in range(0, len(content), chunk_size):
+                yield content[i : i + chunk_size]
+            return
+        yield from self._response.iter_bytes(chunk_size)
+
+    def raise_for_status(self) -> None:
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(
+                f"{self.status_code} Error: {self.reason} for url: {self.url}",
+                response=self,
+            )
+
+    def close(self) -> None:
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HttpClient:
+    """Process-wide pooled HTTP client with default timeouts and shared rate limiting."""
+
+    def __init__(
+        self,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        pool_overrides: Optional[dict[str, int]] = None,
+        http2: bool = HTTP2_ENABLED,
+        retries: int = RETRIES,
+        retry_backoff: float = RETRY_BACKOFF,
+        cassette_mode: str = CASSETTE_MODE,
+        stub: str = STUB_URL,
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.cassette_mode = cassette_mode
+        self.stub = stub
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_overrides = dict(
+            POOL_OVERRIDES if pool_overrides is None else pool_overrides
+        )
+        self.http2 = http2 and httpx is not None
+        if http2 and httpx is None:
+            logger.warning(
+                "[HttpClient] TOOLS_HTTP2 is set but httpx[http2] is not installed; using HTTP/1.1"
+            )
+
+        self._session: Optional[requests.Session] = None
+        self._http2_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Lazily build the shared session with per-host connection pools mounted."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    for host, size in self.pool_overrides.items():
+                        host_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+                        session.mount(f"https://{host}", host_adapter)
+                        session.mount(f"http://{host}", host_adapter)
+                    self._session = session
+        return self._session
+
+    @property
+    def http2_client(self):
+        if self._http2_client is None:
+            with self._lock:
+                if self._http2_client is None:
+                    self._http2_client = httpx.Client(
+                        http2=True,
+                        follow_redirects=True,
+                        timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                        limits=httpx.Limits(
+                            max_connections=self.pool_connections * self.pool_maxsize,
+                            max_keepalive_connections=self.pool_maxsize,
+                        ),
+                    )
+        return self._http2_client
+
+    def get(self, url: str, **kwargs):
+        """
+        Rate-limited GET through the shared connection pool.
+
+        Accepts the same keyword arguments as `requests.get`; `timeout` and the
+        User-Agent header default to the client settings when not given. An optional
+        `deadline` (Deadline) bounds the whole call including retries.
+        """
+        deadline: Deadline = kwargs.pop("deadline", None) or Deadline()
+        timeout = kwargs.pop("timeout", self.timeout)
+        kwargs["headers"] = {**DEFAULT_HEADERS, **(kwargs.get("headers") or {})}
+        stream = kwargs.get("stream", False)
+
+        deadline.check(url)
+        circuit_breakers.check(url)
+        for attempt in range(self.retries + 1):
+            if rate_limiter.acquire(url, max_wait=deadline.remaining()) is None or deadline.expired:
+                # No slot before the deadline; this says nothing about the host
+                circuit_breakers.release(url)
+                raise DeadlineExceeded(url)
+            kwargs["timeout"] = deadline.cap(timeout)
+            try:
+                response = self._send(url, **kwargs)
+            except Exception as e:
+                if deadline.expired or (kwargs["timeout"] != timeout and isinstance(e, TIMEOUT_ERRORS)):
+                    # Timed out because the tool's deadline cut the timeout short, not because the host failed
+                    circuit_breakers.release(url)
+                else:
+                    circuit_breakers.record_failure(url)
+                raise
+            if not is_throttled(response, stream):
+                if response.status_code >= 500:
+                    # Server errors other than 503 are not worth retrying here; fail fast
+                    circuit_breakers.record_failure(url)
+                else:
+                    rate_limiter.on_success(url)
+                    circuit_breakers.record_success(url)
+                response.blocked = False
+                return response
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            rate_limiter.on_throttle(url, retry_after)
+            # The limiter already holds the host for Retry-After; add jittered backoff on top
+            backoff = self.retry_backoff * (2**attempt) * random.uniform(0.5, 1.5)
+            left = deadline.remaining()
+            out_of_time = left is not None and left <= max(backoff, retry_after or 0.0)
+            if attempt == self.retries or out_of_time:
+                circuit_breakers.record_failure(url)
+                response.blocked = True
+                return response
+
+            logger.info(
+                f"[HttpClient] HTTP {response.status_code} from {url}, retry {attempt + 1}/{self.retries} "
+                f"in {backoff:.2f}s"
+            )
+            response.close()
+            time.sleep(backoff)
+
+    def _send(self, url: str, **kwargs):
+        target = full_url(url, kwargs.get("params"))
+        if self.cassette_mode == "replay":
+            return cassettes.replay(target, kwargs.get("headers"))
+        if self.stub:
+            url, kwargs["params"] = stub_url(target, self.stub), None
+
+        # httpx only supports TLS verification settings per client, so requests
+        # that disable verification stay on the requests session.
+        if self.http2 and kwargs.get("verify", True) is True:
+            response = self._get_http2(url, **kwargs)
+        else:
+            response = self.session.get(url, **kwargs)
+        if self.cassette_mode == "record":
+            return cassettes.record(target, kwargs.get("headers"), response)
+        return response
+
+    def _get_http2(self, url: str, **kwargs):
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        stream = kwargs.get("stream", False)
+        request = self.http2_client.build_request(
+            "GET",
+            url,
+            headers=kwargs.get("headers"),
+            params=kwargs.get("params"),
+            timeout=timeout,
+        )
+        return _Http2Response(
+            self.http2_client.send(request, stream=stream), stream=stream
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._http2_client is not None:
+                self._http2_client.close()
+                self._http2_client = None
+
+
+# Shared process-wide client used by all toolkits
+http_client = HttpClient()
@@ -0,0 +1,73 @@
+# local_search_tool.py
+
+"""
+Offline full-text search over content already fetched by the toolkits.
+- Searches scraped_markdown/ (MarkdownFormatterTool) and downloaded_files/ (FileDownloaderTool)
+  with the incremental BM25 index in `tools.bm25_index`; no network requests are made.
+- The index is shared process-wide and refreshed before each query, so newly saved files are found
+  without a rebuild. Only changed files are re-read.
+- Researchers always have the tool (agents are built once and reused), so the corpus is checked on every
+  call: while the folders hold no files it answers at once without building or querying the index.
+"""
+
+import os
+import time
+
+from agno.tools.toolkit import Toolkit
+from agno.utils.log import logger
+
+from tools.bm25_index import BM25Index
+
+_limit_str = os.getenv("LOCAL_SEARCH_LIMIT", "5")
+try:
+    LOCAL_SEARCH_LIMIT = int(_limit_str)
+except (TypeError, ValueError):
+    LOCAL_SEARCH_LIMIT = 5
+
+# Shared index over the default corpus folders
+local_index = BM25Index()
+
+
+def local_corpus_available(index: BM25Index = local_index) -> bool:
+    """True if the corpus folders hold any file the tool could find."""
+    return index.has_files()
+
+
+class LocalCorpusSearchTool(Toolkit):
+    def __init__(self, index: BM25Index = local_index):
+        super().__init__(name="local_corpus_search_tool")
+        self.index = index
+        self.register(self.search_local_corpus)
+
+    def search_local_corpus(self, query: str, limit: int = LOCAL_SEARCH_LIMIT) -> str:
+        """
+        Searches documents already saved locally (scraped Markdown and downloaded papers)
+        for the given query. It makes no network requests and answers at once when nothing is saved.
+
+        Args:
+            query (str): The search query, in English or Filipino.
+            limit (int): Maximum number of results to return.
+
+        Returns:
+            str: A formatted string containing the matching documents, or a miss notice.
+        """
+        if not local_corpus_available(self.index):
+            return "No documents are saved locally yet. Search the web instead."
+
+        start = time.perf_counter()
+        updated = self.index.refresh()
+        hits = self.index.search(query, limit=limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"Local corpus search for '{query}': {len(hits)} hits in {elapsed_ms:.1f} ms "
+            f"({len(self.index)} docs, {updated} files reindexed)"
+        )
+
+        if not hits:
+            return f"No local results for '{query}'. Search the web instead."
+
+        results = []
+        for hit in hits:
+            location = hit["source"] or hit["path"]
+            results.append(f"📚 [{hit['title']}]({location}) (score {hit['score']})\n{hit['snippet']}")
+        return "\n\n".join(results)
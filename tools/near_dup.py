@@ -0,0 +1,217 @@
+# near_dup.py
+
+"""
+Near-duplicate detection for search results and scraped pages.
+- Syndicated wire stories (inquirer.net, philstar.com, mb.com.ph, manilatimes.net) and the same paper on
+  arXiv, ResearchGate and Semantic Scholar differ only in small details, so exact URL de-duplication misses them.
+- Each text is reduced to shingles (word 3-grams for longer text, character 4-grams for titles) and a
+  NEAR_DUP_PERMUTATIONS-value MinHash signature (one-permutation hashing, one hash per shingle).
+- Signatures are bucketed with banded LSH, so only texts that share a band are compared: a batch is processed
+  in linear time. Candidates are kept as duplicates when their estimated Jaccard similarity reaches
+  NEAR_DUP_THRESHOLD (default: 0.8) and, for titles, they contain the same numbers (title_numbers()), so
+  "... in 2021" / "... in 2022" or "Part 1" / "Part 2" are not collapsed.
+- near_dup_metrics aggregates how many items were checked and dropped across the process (dedup ratio).
+"""
+
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_threshold_str = os.getenv("NEAR_DUP_THRESHOLD", "0.8")
+try:
+    NEAR_DUP_THRESHOLD = float(_threshold_str)
+except (TypeError, ValueError):
+    NEAR_DUP_THRESHOLD = 0.8
+
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "1").lower() not in ("0", "false", "no")
+
+NEAR_DUP_PERMUTATIONS = 64
+NEAR_DUP_BANDS = 16
+
+# Texts with at least this many words are shingled by words, shorter ones (titles) by characters
+_WORD_SHINGLE_MIN = 12
+
+_EMPTY_BIN = (1 << 58) - 1
+
+# Site names appended to titles of mirrored articles ("... - Inquirer.net", "... | ResearchGate")
+_TITLE_SUFFIX = re.compile(r"\s+[-|–—:]\s+([^-|–—:]{2,40})$")
+_SITE_SUFFIX = re.compile(
+    r"\.(com|net|org|ph|edu|gov|io)\b|researchgate|semantic scholar|arxiv|pubmed|sciencedirect|"
+    r"springer|wiley|inquirer|philstar|rappler|manila (times|bulletin)|abs-cbn|gma",
+    re.IGNORECASE,
+)
+
+
+def _strip_site_suffix(text: str) -> str:
+    match = _TITLE_SUFFIX.search(text)
+    if match and _SITE_SUFFIX.search(match.group(1)):
+        return text[: match.start()]
+    return text
+
+
+def _normalize(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.findall(r"[a-z0-9]+", text)
+
+
+def shingles(text: str) -> set[str]:
+    """Word 3-grams for longer text, character 4-grams for short strings such as titles."""
+    words = _normalize(_strip_site_suffix(text.strip()))
+    if len(words) >= _WORD_SHINGLE_MIN:
+        return {" ".join(words[i : i + 3]) for i in range(len(words) - 2)}
+    joined = " ".join(words)
+    if len(joined) <= 4:
+        return {joined} if joined else set()
+    return {joined[i : i + 4] for i in range(len(joined) - 3)}
+
+
+def title_numbers(text: str) -> frozenset[str]:
+    """
+    Numbers in a short text such as a title (years, counts, part or volume numbers); empty for longer text.
+
+    Titles that differ only in a number ("... in 2021" / "... in 2022", "Part 1" / "Part 2") score high on
+    character shingles but are different results, so they must carry the same numbers to be duplicates.
+    """
+    words = _normalize(_strip_site_suffix(text.strip()))
+    if len(words) >= _WORD_SHINGLE_MIN:
+        return frozenset()
+    return frozenset(word for word in words if any(ch.isdigit() for ch in word))
+
+
+def minhash(features: Iterable[str]) -> tuple[int, ...]:
+    """
+    MinHash signature of a shingle set using one-permutation hashing: each shingle is hashed once,
+    the low bits pick one of NEAR_DUP_PERMUTATIONS bins and each bin keeps its minimum. Empty bins
+    borrow the value of the next non-empty bin so short texts still compare reliably.
+    """
+    bins = [_EMPTY_BIN] * NEAR_DUP_PERMUTATIONS
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        slot, value = h % NEAR_DUP_PERMUTATIONS, h // NEAR_DUP_PERMUTATIONS
+        if value < bins[slot]:
+            bins[slot] = value
+    if all(v == _EMPTY_BIN for v in bins):
+        return tuple(bins)
+    signature = list(bins)
+    for i, value in enumerate(bins):
+        offset = 1
+        while value == _EMPTY_BIN:
+            value = bins[(i + offset) % NEAR_DUP_PERMUTATIONS]
+            offset += 1
+        signature[i] = value if offset == 1 else value + offset * _EMPTY_BIN
+    return tuple(signature)
+
+
+def similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """Banded LSH index of MinHash signatures for one batch of documents."""
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, bands: int = NEAR_DUP_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NEAR_DUP_PERMUTATIONS // bands
+        self._buckets: list[dict[tuple, list]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: dict = {}
+        self._numbers: dict = {}
+
+    def add(self, key, text: str):
+        """
+        Index `text` under `key` unless it is a near-duplicate of an indexed document.
+
+        Returns:
+            The key of the earlier near-duplicate, or None if `text` was added.
+        """
+        if not text.strip():
+            return None
+        signature = minhash(shingles(text))
+        numbers = title_numbers(text)
+        bands = [
+            tuple(signature[i * self.rows : (i + 1) * self.rows]) for i in range(self.bands)
+        ]
+        checked = set()
+        for band, bucket_key in zip(self._buckets, bands):
+            for candidate in band.get(bucket_key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if (
+                    numbers == self._numbers[candidate]
+                    and similarity(signature, self._signatures[candidate]) >= self.threshold
+                ):
+                    return candidate
+        for band, bucket_key in zip(self._buckets, bands):
+            band[bucket_key].append(key)
+        self._signatures[key] = signature
+        self._numbers[key] = numbers
+        return None
+
+
+class NearDupMetrics:
+    """Process-wide counters for the near-duplicate filter."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.dropped = 0
+
+    def record(self, checked: int, dropped: int) -> None:
+        with self._lock:
+            self.checked += checked
+            self.dropped += dropped
+
+    @property
+    def dedup_ratio(self) -> float:
+        return self.dropped / self.checked if self.checked else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "dropped": self.dropped,
+                "dedup_ratio": round(self.dedup_ratio, 4),
+            }
+
+
+# Shared process-wide metrics
+near_dup_metrics = NearDupMetrics()
+
+
+def filter_near_duplicates(
+    items: list[T],
+    text_of: Callable[[T], str],
+    threshold: Optional[float] = None,
+) -> tuple[list[T], dict[int, int]]:
+    """
+    Drop items whose text is a near-duplicate of an earlier item in the batch.
+
+    Args:
+        items (list): Items in priority order; the first of each near-duplicate group is kept.
+        text_of (Callable): Returns the text compared for an item (e.g. a title or page text).
+        threshold (Optional[float]): Similarity threshold; defaults to NEAR_DUP_THRESHOLD.
+
+    Returns:
+        tuple: (kept items, {index of dropped item: index of the kept item it duplicates}).
+    """
+    if not NEAR_DUP_ENABLED:
+        return list(items), {}
+    index = NearDuplicateIndex(threshold if threshold is not None else NEAR_DUP_THRESHOLD)
+    kept, duplicates = [], {}
+    for i, item in enumerate(items):
+        original = index.add(i, text_of(item))
+        if original is None:
+            kept.append(item)
+        else:
+            duplicates[i] = original
+    near_dup_metrics.record(len(items), len(duplicates))
+    return kept, duplicates
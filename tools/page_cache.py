@@ -0,0 +1,218 @@
+# page_cache.py
+
+"""
+Conditional-GET cache for pages scraped by WebScraperTool.
+- Stores the extracted text of a page together with its `ETag` / `Last-Modified` validators.
+- The scraper revalidates with `If-None-Match` / `If-Modified-Since`; a 304 response is served from the cache.
+- Stored in SQLite at PAGE_CACHE_DB (default: tmp/page_cache.db).
+- Size-bounded: PAGE_CACHE_MAX_BYTES of stored text (default: 50 MiB), least recently used pages are evicted first.
+- stats() reports revalidations, 304 hits and the response bytes those hits avoided downloading.
+- Set PAGE_CACHE_ENABLED=0 to bypass the cache entirely.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from agno.utils.log import logger
+
+PAGE_CACHE_DB = os.getenv("PAGE_CACHE_DB", "tmp/page_cache.db")
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+_max_bytes_str = os.getenv("PAGE_CACHE_MAX_BYTES", str(50 * 1024 * 1024))
+try:
+    PAGE_CACHE_MAX_BYTES = int(_max_bytes_str)
+except (TypeError, ValueError):
+    PAGE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+class PageCache:
+    """SQLite-backed store of extracted page text keyed by URL, revalidated with conditional GETs."""
+
+    def __init__(
+        self,
+        db_file: str = PAGE_CACHE_DB,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+        enabled: bool = PAGE_CACHE_ENABLED,
+    ):
+        self.db_file = db_file
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        self.revalidations = 0
+        self.not_modified = 0
+        self.refreshed = 0
+        self.stored = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS page_cache (
+                    url TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body_bytes INTEGER NOT NULL,
+                    text_bytes INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS page_cache_accessed ON page_cache (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, url: str) -> Optional[dict]:
+        """Return the cached entry for a URL (text, etag, last_modified, body_bytes), or None."""
+        if not self.enabled:
+            return None
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT text, etag, last_modified, body_bytes FROM page_cache WHERE url = ?",
+                    (url,),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"[PageCache] Lookup failed, treating as miss: {e}")
+            return None
+        if row is None:
+            return None
+        text, etag, last_modified, body_bytes = row
+        return {
+            "text": text,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_bytes": body_bytes,
+        }
+
+    @staticmethod
+    def conditional_headers(entry: Optional[dict]) -> dict:
+        """Build If-None-Match / If-Modified-Since headers for a cached entry."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def mark_revalidating(self) -> None:
+        with self._lock:
+            self.revalidations += 1
+
+    def hit(self, url: str, entry: dict) -> str:
+        """Record a 304 Not Modified for a cached URL and return its stored text."""
+        with self._lock:
+            self.not_modified += 1
+            self.bytes_saved += entry.get("body_bytes", 0)
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "UPDATE page_cache SET accessed_at = ? WHERE url = ?", (time.time(), url)
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[PageCache] Failed to update access time: {e}")
+        return entry["text"]
+
+    def put(
+        self,
+        url: str,
+        text: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        body_bytes: int,
+        revalidated: bool = False,
+    ) -> None:
+        """
+        Store extracted text for a URL. Pages without validators cannot be revalidated,
+        so they are only counted towards bytes downloaded.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.bytes_downloaded += body_bytes
+            if revalidated:
+                self.refreshed += 1
+        if not (etag or last_modified):
+            return
+        now = time.time()
+        text_bytes = len(text.encode("utf-8"))
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO page_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (url, text, etag, last_modified, body_bytes, text_bytes, now, now),
+                )
+                self.stored += 1
+                self._evict(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[PageCache] Failed to store {url}: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used pages until stored text fits in max_bytes."""
+        if self.max_bytes <= 0:
+            return
+        total = conn.execute("SELECT COALESCE(SUM(text_bytes), 0) FROM page_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT url, text_bytes FROM page_cache ORDER BY accessed_at ASC"
+        ).fetchall()
+        for url, text_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM page_cache WHERE url = ?", (url,))
+            total -= text_bytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM page_cache")
+            conn.commit()
+
+    def stats(self) -> dict:
+        """Counters for this process plus the current size of the store."""
+        with self._lock:
+            entries, stored_bytes = 0, 0
+            if self.enabled:
+                try:
+                    entries, stored_bytes = self._connect().execute(
+                        "SELECT COUNT(*), COALESCE(SUM(text_bytes), 0) FROM page_cache"
+                    ).fetchone()
+                except sqlite3.Error:
+                    pass
+            return {
+                "enabled": self.enabled,
+                "revalidations": self.revalidations,
+                "not_modified": self.not_modified,
+                "refreshed": self.refreshed,
+                "stored": self.stored,
+                "evictions": self.evictions,
+                "bytes_saved": self.bytes_saved,
+                "bytes_downloaded": self.bytes_downloaded,
+                "entries": entries,
+                "stored_bytes": stored_bytes,
+            }
+
+
+# Shared process-wide cache used by WebScraperTool
+page_cache = PageCache()
@@ -1,25 +1,25 @@
 # philippines_search_tool.py
 
 """
-This tool implements global per-tool rate limiting for all network requests using the `ratelimit` package.
-- The rate limit is configurable via the TOOLS_RATE_LIMIT environment variable (default: 5 requests/sec).
+This tool routes all network requests through the process-wide per-host rate limiter in `tools.rate_limiter`.
+- The rate limit is configurable via the TOOLS_RATE_LIMIT environment variable (default: 5 requests/sec per host).
+- Per-host overrides can be set with TOOLS_RATE_LIMIT_OVERRIDES (e.g. "duckduckgo.com=2").
 - If the rate limit is exceeded, the tool will wait until the next available slot.
-- All requests are routed through a rate-limited internal method.
+- All requests are routed through a rate-limited internal method backed by the pooled keep-alive client in `tools.http_client`.
 """
 
 import os
 from typing import Optional
 
-import requests
 from agno.tools.toolkit import Toolkit
 from agno.utils.log import logger
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 from dotenv import load_dotenv
-from ratelimit import limits, sleep_and_retry
 
-# Get rate limit from environment or default to 5/sec
-RATE_LIMIT = int(os.getenv("TOOLS_RATE_LIMIT", 5))
-PER_SECONDS = 1
+from tools.deadline import tool_deadlines
+from tools.http_client import http_client
+from tools.site_search import SEARCH_BATCH_SIZE, format_site_results, search_all_sites
+from tools.result_rank import SEARCH_TOKEN_BUDGET
 
 # Load environment variables from a .env file if present
 load_dotenv()
@@ -33,23 +33,40 @@ except (TypeError, ValueError):
 
 
 class PhilippinesSearchTool(Toolkit):
-    def __init__(self):
+    def __init__(
+        self,
+        batch_size: int = SEARCH_BATCH_SIZE,
+        token_budget: int = SEARCH_TOKEN_BUDGET,
+        deadline: Optional[float] = None,
+    ):
         super().__init__(name="philippines_search_tool")
+        self.batch_size = max(1, batch_size)
+        self.token_budget = token_budget
+        self.deadline = deadline
         self.register(self.search_government_and_news_sites)
 
-    @sleep_and_retry
-    @limits(calls=RATE_LIMIT, period=PER_SECONDS)
-    def _rate_limited_request(self, *args, **kwargs):
-        """Internal method for rate-limited requests."""
-        return requests.get(*args, **kwargs)
+    def _rate_limited_request(self, url, **kwargs):
+        """Internal method for rate-limited requests over the shared connection pool."""
+        return http_client.get(url, **kwargs)
 
-    def search_government_and_news_sites(self, query: str) -> str:
+    def search_government_and_news_sites(
+        self,
+        query: str,
+        token_budget: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> str:
         """
         Searches Philippine government and news websites for the given query
         and returns a summary of findings. Rate limited to 5 requests/sec (configurable).
+        Results are ranked by relevance and trimmed to the best ones that fit the token budget.
+        Sites not searched before the deadline are listed as timed out.
 
         Args:
             query (str): The search query to look for.
+            token_budget (Optional[int]): Approximate token budget for the returned links
+                (defaults to SEARCH_TOKEN_BUDGET; 0 returns every link).
+            deadline (Optional[float]): Time budget in seconds for this call
+                (defaults to TOOLS_CALL_DEADLINE; 0 means no deadline).
 
         Returns:
             str: A formatted string containing the search results.
@@ -69,28 +86,23 @@ class PhilippinesSearchTool(Toolkit):
 
         # Format DuckDuckGo or Bing query (replace with better API later)
         headers = {"User-Agent": "Mozilla/5.0"}
-        search_results = []
-
-        for site in search_sites:
-            try:
-                q = f"{query} {site}"
-                logger.info(f"Searching: {q}")
-                res = self._rate_limited_request(
-                    f"https://html.duckduckgo.com/html/?q={q}", headers=headers
-                )
-                soup = BeautifulSoup(res.text, "html.parser")
-                links = soup.find_all("a", class_="result__a", limit=LINKS_LIMIT)
-
-                for link in links:
-                    if isinstance(link, Tag):
-                        href = link.get("href")
-                        snippet = link.get_text(strip=True)
-                        if href and snippet:
-                            search_results.append(f"🔗 [{snippet}]({href})")
-            except Exception as e:
-                error_msg = f"❌ Error searching {site}: {e}"
-                search_results.append(error_msg)
-                logger.error(error_msg)
+
+        # Duplicate sites are dropped and sites are packed into batched OR queries
+        site_links, site_errors = search_all_sites(
+            query,
+            search_sites,
+            LINKS_LIMIT,
+            self._rate_limited_request,
+            headers,
+            batch_size=self.batch_size,
+            deadline=tool_deadlines.start(self.deadline if deadline is None else deadline),
+        )
+        search_results = format_site_results(
+            query,
+            site_links,
+            site_errors,
+            self.token_budget if token_budget is None else token_budget,
+        )
 
         if not search_results:
             return "No results found from Philippine government or news sites."
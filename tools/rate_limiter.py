@@ -0,0 +1,295 @@
+# rate_limiter.py
+
+"""
+Process-wide, per-host rate limiting shared by every toolkit.
+- One token bucket per host, so all researchers and the adviser share the same budget for e.g. html.duckduckgo.com.
+- The default rate is TOOLS_RATE_LIMIT requests/sec per host (default: 5).
+- Per-host overrides come from TOOLS_RATE_LIMIT_OVERRIDES, e.g. "duckduckgo.com=2,arxiv.org=10".
+  An override for a domain also applies to its subdomains; the most specific match wins.
+- Callers block (threads) or await (asyncio) until a slot is free; time spent waiting is counted per host.
+  A `max_wait` makes acquire() give up at once, without taking a slot, when the wait would be longer.
+- Rates adapt per host (AIMD): each successful response adds TOOLS_RATE_AIMD_INCREASE requests/sec spread
+  over a second of traffic, up to TOOLS_RATE_LIMIT_CEILING_FACTOR × the configured rate; a 429, 503 or block
+  page multiplies the rate by TOOLS_RATE_AIMD_DECREASE (default: 0.5), down to TOOLS_RATE_LIMIT_FLOOR.
+  A Retry-After pause holds every caller for that host. Set TOOLS_ADAPTIVE_RATE=0 to keep rates fixed.
+- rate_limiter.stats() / current_rates() expose the live per-host rate for tuning the ceiling.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from agno.utils.log import logger
+
+# Get rate limit from environment or default to 5/sec
+RATE_LIMIT = float(os.getenv("TOOLS_RATE_LIMIT", 5))
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+ADAPTIVE_RATE = os.getenv("TOOLS_ADAPTIVE_RATE", "1").lower() not in ("0", "false", "no")
+AIMD_INCREASE = _env_float("TOOLS_RATE_AIMD_INCREASE", 0.5)
+AIMD_DECREASE = _env_float("TOOLS_RATE_AIMD_DECREASE", 0.5)
+CEILING_FACTOR = _env_float("TOOLS_RATE_LIMIT_CEILING_FACTOR", 2.0)
+RATE_FLOOR = _env_float("TOOLS_RATE_LIMIT_FLOOR", 0.2)
+
+
+def _parse_overrides(raw: Optional[str]) -> dict[str, float]:
+    """Parse "host=rate,host=rate" into a dict, skipping malformed entries."""
+    overrides = {}
+    for item in (raw or "").split(","):
+        host, sep, rate = item.partition("=")
+        if not sep:
+            continue
+        try:
+            overrides[host.strip().lower()] = float(rate)
+        except ValueError:
+            logger.warning(f"[RateLimiter] Ignoring invalid override: {item!r}")
+    return overrides
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts of up to `capacity`.
+
+    Each acquire reserves the next free slot under a lock and then sleeps outside it,
+    so waiting callers are served in arrival order and never hold the lock while blocked.
+    When `adaptive` is set, on_success() / on_throttle() move the rate between `floor`
+    and `ceiling` with additive increase and multiplicative decrease.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        adaptive: bool = ADAPTIVE_RATE,
+        ceiling: Optional[float] = None,
+        floor: float = RATE_FLOOR,
+    ):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.adaptive = adaptive and rate > 0
+        self.ceiling = ceiling if ceiling is not None else rate * CEILING_FACTOR
+        self.floor = min(floor, rate) if rate > 0 else 0.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+    def _reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take one token and return how long the caller must wait before using it.
+
+        Returns None without taking a token if the wait would exceed `max_wait`.
+        """
+        with self._lock:
+            self.calls += 1
+            if self.rate <= 0:
+                return 0.0
+
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            if max_wait is not None and wait > max_wait:
+                self._tokens += 1
+                return None
+            if wait > 0:
+                self.waits += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def acquire(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Block the calling thread until a token is available. Returns seconds waited, or None
+        (immediately, without a token) if no token is free within `max_wait` seconds.
+        """
+        wait = self._reserve(max_wait)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """Await until a token is available without blocking the event loop."""
+        wait = self._reserve(max_wait)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def _apply_rate(self, rate: float) -> None:
+        """Switch to a new refill rate, keeping the tokens accrued so far. Caller holds the lock."""
+        now = time.monotonic()
+        if self.rate > 0:
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+        self._updated = now
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self._tokens = min(self._tokens, self.capacity)
+
+    def set_rate(self, rate: float) -> None:
+        """Change the configured rate; the adaptive ceiling follows it."""
+        with self._lock:
+            self._apply_rate(rate)
+            self.ceiling = rate * CEILING_FACTOR
+            self.floor = min(RATE_FLOOR, rate) if rate > 0 else 0.0
+            self.adaptive = self.adaptive and rate > 0
+
+    def on_success(self) -> None:
+        """Additive increase: about AIMD_INCREASE req/s more per second of successful traffic."""
+        if not self.adaptive:
+            return
+        with self._lock:
+            if self.rate < self.ceiling:
+                self._apply_rate(min(self.ceiling, self.rate + AIMD_INCREASE / max(self.rate, 1.0)))
+                self.increases += 1
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Multiplicative decrease after a 429, 503 or block page.
+
+        Args:
+            retry_after (Optional[float]): Seconds the server asked us to wait; every caller
+                for this host is held back at least this long.
+        """
+        with self._lock:
+            if self.adaptive:
+                self._apply_rate(max(self.floor, self.rate * AIMD_DECREASE))
+                self.decreases += 1
+            if retry_after and self.rate > 0:
+                # Push the bucket into debt so the next reservation waits out the pause
+                self._tokens = min(self._tokens, -retry_after * self.rate)
+                self._updated = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate": round(self.rate, 4),
+                "ceiling": round(self.ceiling, 4),
+                "calls": self.calls,
+                "waits": self.waits,
+                "total_wait": round(self.total_wait, 4),
+                "max_wait": round(self.max_wait, 4),
+                "increases": self.increases,
+                "decreases": self.decreases,
+            }
+
+
+class RateLimiterRegistry:
+    """Registry of token buckets keyed by host name."""
+
+    def __init__(
+        self,
+        default_rate: float = RATE_LIMIT,
+        overrides: Optional[dict[str, float]] = None,
+    ):
+        self.default_rate = default_rate
+        self.overrides = {k.lower(): v for k, v in (overrides or {}).items()}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        """Return the lower-cased host of a URL, or the argument itself if it is a bare host."""
+        if "//" not in url_or_host:
+            return url_or_host.split("/")[0].split(":")[0].lower()
+        return (urlparse(url_or_host).hostname or "").lower()
+
+    def rate_for(self, host: str) -> float:
+        """Resolve the configured rate for a host, preferring the most specific override."""
+        parts = host.split(".")
+        for i in range(len(parts)):
+            candidate = ".".join(parts[i:])
+            if candidate in self.overrides:
+                return self.overrides[candidate]
+        return self.default_rate
+
+    def get(self, url_or_host: str) -> TokenBucket:
+        """Return the bucket for a host, creating it on first use."""
+        host = self.host_of(url_or_host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_for(host))
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url_or_host: str, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Wait for a slot on the host of `url_or_host`. Returns seconds waited, or None if no slot
+        is free within `max_wait` seconds (e.g. the time left before a tool call's deadline).
+        """
+        wait = self.get(url_or_host).acquire(max_wait)
+        if wait:
+            logger.debug(
+                f"[RateLimiter] Waited {wait:.3f}s for {self.host_of(url_or_host)}"
+            )
+        return wait
+
+    async def acquire_async(self, url_or_host: str, max_wait: Optional[float] = None) -> Optional[float]:
+        """Asyncio counterpart of acquire()."""
+        return await self.get(url_or_host).acquire_async(max_wait)
+
+    def set_rate(self, host: str, rate: float) -> None:
+        """Override the rate for a host (and its subdomains) at runtime."""
+        host = host.lower()
+        with self._lock:
+            self.overrides[host] = rate
+            buckets = list(self._buckets.items())
+        for bucket_host, bucket in buckets:
+            if bucket_host == host or bucket_host.endswith("." + host):
+                bucket.set_rate(self.rate_for(bucket_host))
+
+    def on_success(self, url_or_host: str) -> None:
+        """Report a healthy response so the host's rate can grow towards its ceiling."""
+        self.get(url_or_host).on_success()
+
+    def on_throttle(self, url_or_host: str, retry_after: Optional[float] = None) -> None:
+        """Report a 429 / 503 / block page so the host's rate backs off."""
+        bucket = self.get(url_or_host)
+        bucket.on_throttle(retry_after)
+        logger.warning(
+            f"[RateLimiter] Backing off {self.host_of(url_or_host)} to {bucket.rate:.2f} req/s"
+            + (f", pausing {retry_after:.1f}s" if retry_after else "")
+        )
+
+    def current_rates(self) -> dict[str, float]:
+        """Live requests/sec per host."""
+        return {host: s["rate"] for host, s in self.stats().items()}
+
+    def stats(self) -> dict[str, dict]:
+        """Per-host counters: live and ceiling rate, calls, waits, seconds spent waiting and AIMD adjustments."""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {host: bucket.stats() for host, bucket in sorted(buckets.items())}
+
+    def total_wait(self) -> float:
+        """Total seconds all callers have spent waiting, across hosts."""
+        return sum(s["total_wait"] for s in self.stats().values())
+
+
+# Shared process-wide registry used by all toolkits
+rate_limiter = RateLimiterRegistry(
+    default_rate=RATE_LIMIT,
+    overrides=_parse_overrides(os.getenv("TOOLS_RATE_LIMIT_OVERRIDES")),
+)
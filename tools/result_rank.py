@@ -0,0 +1,192 @@
+# result_rank.py
+
+"""
+Relevance ranking and token-budgeted trimming of search results before they reach an agent.
+- Every (title, href) result is scored against the query: title term overlap (`tools.bm25_index.tokenize`),
+  a domain authority weight (DOMAIN_AUTHORITY, overridable via SEARCH_AUTHORITY_OVERRIDES, e.g. "arxiv.org=0.9"),
+  a recency hint (the newest plausible year in the title or URL) and DOI presence (`tools.url_canon.extract_doi`).
+  The search engine's own rank within a site is a small tie-breaker.
+- trim_to_budget() keeps the best results whose rendered lines fit SEARCH_TOKEN_BUDGET estimated tokens
+  (default: 1500; about 4 characters per token), so a 14-site search no longer puts 200+ links into the
+  researcher's context on every turn. Set SEARCH_TOKEN_BUDGET=0 to disable trimming.
+"""
+
+import math
+import os
+import re
+from datetime import date
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+from agno.utils.log import logger
+
+from tools.bm25_index import tokenize
+from tools.url_canon import extract_doi
+
+_budget_str = os.getenv("SEARCH_TOKEN_BUDGET", "1500")
+try:
+    SEARCH_TOKEN_BUDGET = int(_budget_str)
+except (TypeError, ValueError):
+    SEARCH_TOKEN_BUDGET = 1500
+
+CHARS_PER_TOKEN = 4
+
+# Relative trust in a source, 0..1; hosts not listed get DEFAULT_AUTHORITY
+DOMAIN_AUTHORITY = {
+    "nature.com": 1.0,
+    "science.org": 1.0,
+    "cell.com": 1.0,
+    "thelancet.com": 1.0,
+    "nejm.org": 1.0,
+    "pubmed.ncbi.nlm.nih.gov": 0.95,
+    "ncbi.nlm.nih.gov": 0.95,
+    "sciencedirect.com": 0.9,
+    "gov.ph": 0.9,
+    "springer.com": 0.85,
+    "wiley.com": 0.85,
+    "ieeexplore.ieee.org": 0.85,
+    "dl.acm.org": 0.85,
+    "plos.org": 0.85,
+    "arxiv.org": 0.7,
+    "biorxiv.org": 0.65,
+    "medrxiv.org": 0.65,
+    "inquirer.net": 0.6,
+    "rappler.com": 0.6,
+    "philstar.com": 0.6,
+    "semanticscholar.org": 0.6,
+    "mb.com.ph": 0.55,
+    "manilatimes.net": 0.55,
+    "researchgate.net": 0.5,
+    "openaccessbutton.org": 0.4,
+}
+DEFAULT_AUTHORITY = 0.5
+
+# Score weights; they sum to 1 so scores stay in 0..1
+WEIGHT_OVERLAP = 0.5
+WEIGHT_AUTHORITY = 0.2
+WEIGHT_RECENCY = 0.15
+WEIGHT_DOI = 0.1
+WEIGHT_POSITION = 0.05
+
+# Results older than this many years get no recency credit
+RECENCY_HORIZON = 10
+YEAR_PATTERN = re.compile(r"(?<!\d)(19[89]\d|20\d\d)(?!\d)")
+
+
+def _parse_authority_overrides(raw: Optional[str]) -> dict[str, float]:
+    """Parse "host=weight,host=weight" into a dict, skipping malformed entries."""
+    overrides = {}
+    for item in (raw or "").split(","):
+        host, sep, weight = item.partition("=")
+        if not sep:
+            continue
+        try:
+            overrides[host.strip().lower()] = float(weight)
+        except ValueError:
+            logger.warning(f"[ResultRank] Ignoring invalid authority override: {item!r}")
+    return overrides
+
+
+DOMAIN_AUTHORITY.update(_parse_authority_overrides(os.getenv("SEARCH_AUTHORITY_OVERRIDES")))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a string for budgeting (no tokenizer dependency)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def authority(href: str) -> float:
+    """Authority weight of the most specific DOMAIN_AUTHORITY entry covering the link's host."""
+    host = (urlsplit(href).hostname or "").lower().removeprefix("www.")
+    best, best_len = DEFAULT_AUTHORITY, 0
+    for domain, weight in DOMAIN_AUTHORITY.items():
+        if (host == domain or host.endswith("." + domain)) and len(domain) > best_len:
+            best, best_len = weight, len(domain)
+    return best
+
+
+def recency(title: str, href: str, today: Optional[date] = None) -> float:
+    """1.0 for the current year, fading linearly to 0 over RECENCY_HORIZON years; 0 when no year is found."""
+    current = (today or date.today()).year
+    years = [int(y) for y in YEAR_PATTERN.findall(f"{title} {href}") if int(y) <= current]
+    if not years:
+        return 0.0
+    return max(0.0, 1.0 - (current - max(years)) / RECENCY_HORIZON)
+
+
+def score_result(query_terms: set[str], title: str, href: str, position: int = 0) -> float:
+    """
+    Relevance score of one result in 0..1.
+
+    Args:
+        query_terms (set[str]): Tokenized query terms.
+        title (str): Result title.
+        href (str): Result URL.
+        position (int): Rank of the result within its site's result list (0 = first).
+
+    Returns:
+        float: Weighted sum of title overlap, authority, recency, DOI presence and search rank.
+    """
+    overlap = 0.0
+    if query_terms:
+        overlap = len(query_terms & set(tokenize(title))) / len(query_terms)
+    return (
+        WEIGHT_OVERLAP * overlap
+        + WEIGHT_AUTHORITY * authority(href)
+        + WEIGHT_RECENCY * recency(title, href)
+        + WEIGHT_DOI * (1.0 if extract_doi(href) else 0.0)
+        + WEIGHT_POSITION / (1 + position)
+    )
+
+
+def rank_site_links(
+    query: str,
+    site_links: dict[str, list[tuple[str, str]]],
+) -> list[tuple[float, str, str, str]]:
+    """
+    Flattens per-site results and orders them by relevance to the query.
+
+    Args:
+        query (str): The search query.
+        site_links (dict): (title, href) pairs per site, in search-engine order.
+
+    Returns:
+        list: (score, site, title, href) tuples, best first; ties keep site order.
+    """
+    terms = set(tokenize(query))
+    scored = [
+        (score_result(terms, title, href, position), site, title, href)
+        for site, links in site_links.items()
+        for position, (title, href) in enumerate(links)
+    ]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored
+
+
+def trim_to_budget(
+    lines: list[str],
+    token_budget: Optional[int] = None,
+    cost: Callable[[str], int] = estimate_tokens,
+) -> tuple[list[str], int]:
+    """
+    Keeps lines, in order, while their estimated token cost fits the budget.
+
+    Args:
+        lines (list[str]): Rendered result lines, best first.
+        token_budget (Optional[int]): Token budget; defaults to SEARCH_TOKEN_BUDGET, 0 or less keeps everything.
+        cost (Callable): Token estimate for one line.
+
+    Returns:
+        tuple: (kept lines, number of lines dropped). The first line is always kept.
+    """
+    budget = SEARCH_TOKEN_BUDGET if token_budget is None else token_budget
+    if budget <= 0:
+        return list(lines), 0
+    kept, used = [], 0
+    for line in lines:
+        line_cost = cost(line)
+        if kept and used + line_cost > budget:
+            break
+        kept.append(line)
+        used += line_cost
+    return kept, len(lines) - len(kept)
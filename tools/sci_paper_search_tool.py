@@ -1,15 +1,14 @@
 import os
 from typing import Optional
 
-import requests
 from agno.tools.toolkit import Toolkit
 from agno.utils.log import logger
-from bs4 import BeautifulSoup, Tag
-from ratelimit import limits, sleep_and_retry
+from bs4 import Tag
 
-# === Rate Limit Config ===
-RATE_LIMIT = int(os.getenv("TOOLS_RATE_LIMIT", 5))  # requests per period
-PER_SECONDS = 1  # period length in seconds
+from tools.deadline import tool_deadlines
+from tools.http_client import http_client
+from tools.site_search import SEARCH_BATCH_SIZE, format_site_results, search_all_sites
+from tools.result_rank import SEARCH_TOKEN_BUDGET
 
 # === Link Collection Config ===
 _limit_str = os.getenv("SCI_LINKS_LIMIT", "15")
@@ -18,26 +17,63 @@ try:
 except (TypeError, ValueError):
     LINKS_LIMIT = 15
 
+# === Fan-out Config ===
+# Number of search queries allowed in flight at once (1 = serial).
+_concurrency_str = os.getenv("SCI_MAX_CONCURRENCY", "4")
+try:
+    MAX_CONCURRENCY = max(1, int(_concurrency_str))
+except (TypeError, ValueError):
+    MAX_CONCURRENCY = 4
+
+# Wall-clock budget in seconds for one search_journal_sites call (0 = no deadline);
+# unset, calls inherit the workflow-wide TOOLS_CALL_DEADLINE (see tools.deadline).
+_deadline_str = os.getenv("SCI_SEARCH_DEADLINE")
+try:
+    SEARCH_DEADLINE = float(_deadline_str) if _deadline_str else None
+except (TypeError, ValueError):
+    SEARCH_DEADLINE = None
+
 
 class SciResTool(Toolkit):
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        deadline: Optional[float] = SEARCH_DEADLINE,
+        batch_size: int = SEARCH_BATCH_SIZE,
+        token_budget: int = SEARCH_TOKEN_BUDGET,
+    ):
         super().__init__(name="sci_research_tool")
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_size = max(1, batch_size)
+        self.token_budget = token_budget
+        self.deadline = deadline
         self.register(self.search_journal_sites)
 
-    @sleep_and_retry
-    @limits(calls=RATE_LIMIT, period=PER_SECONDS)
-    def _rate_limited_request(self, url, headers):
-        """Internal method for rate-limited requests."""
+    def _rate_limited_request(self, url, **kwargs):
+        """Internal method for rate-limited requests over the shared connection pool."""
         logger.info(f"[RateLimiter] Making request: {url}")
-        return requests.get(url, headers=headers)
-
-    def search_journal_sites(self, query: str) -> str:
+        return http_client.get(url, **kwargs)
+
+    def search_journal_sites(
+        self,
+        query: str,
+        token_budget: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> str:
         """
         Searches research journals and scientific articles.
-        Rate limited to TOOLS_RATE_LIMIT (default: 5 requests/sec).
+        Rate limited to TOOLS_RATE_LIMIT (default: 5 requests/sec). Sites are
+        searched in batched OR queries (SEARCH_BATCH_SIZE) that run concurrently
+        (SCI_MAX_CONCURRENCY) within the call's deadline; results are ranked by
+        relevance to the query and trimmed to the best ones that fit the token
+        budget. Sites not searched in time are listed as timed out.
 
         Args:
             query (str): The search query for scientific papers and research.
+            token_budget (Optional[int]): Approximate token budget for the returned links
+                (defaults to SEARCH_TOKEN_BUDGET; 0 returns every link).
+            deadline (Optional[float]): Time budget in seconds for this call
+                (defaults to SCI_SEARCH_DEADLINE or TOOLS_CALL_DEADLINE; 0 means no deadline).
 
         Returns:
             str: A formatted string containing the search results from scientific sources.
@@ -63,28 +99,25 @@ class SciResTool(Toolkit):
         ]
 
         headers = {"User-Agent": "Mozilla/5.0"}
-        search_results = []
-
-        for site in search_sites:
-            try:
-                q = f"{query} {site}"
-                logger.info(f"🔍 Searching: {q}")
-                res = self._rate_limited_request(
-                    f"https://html.duckduckgo.com/html/?q={q}", headers=headers
-                )
-                soup = BeautifulSoup(res.text, "html.parser")
-                links = soup.find_all("a", class_="result__a", limit=LINKS_LIMIT)
-
-                for link in links:
-                    if isinstance(link, Tag):
-                        href = link.get("href")
-                        snippet = link.get_text(strip=True)
-                        if href and snippet:
-                            search_results.append(f"🔗 [{snippet}]({href})")
-            except Exception as e:
-                error_msg = f"❌ Error searching {site}: {e}"
-                search_results.append(error_msg)
-                logger.error(error_msg)
+
+        # Batched site queries fan out over a bounded pool; the shared per-host
+        # rate limiter behind _rate_limited_request still caps the request rate.
+        site_links, site_errors = search_all_sites(
+            query,
+            search_sites,
+            LINKS_LIMIT,
+            self._rate_limited_request,
+            headers,
+            batch_size=self.batch_size,
+            max_workers=self.max_concurrency,
+            deadline=tool_deadlines.start(self.deadline if deadline is None else deadline),
+        )
+        search_results = format_site_results(
+            query,
+            site_links,
+            site_errors,
+            self.token_budget if token_budget is None else token_budget,
+        )
 
         if not search_results:
             return "No results found from scientific sources."
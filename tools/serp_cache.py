@@ -0,0 +1,198 @@
+# serp_cache.py
+
+"""
+Persistent on-disk cache for parsed DuckDuckGo site-search results.
+- Entries are keyed by the normalized (query, site, links limit) triple and store the parsed links,
+  so a hit skips both the network request and the HTML parse.
+- Stored in SQLite at SERP_CACHE_DB (default: tmp/serp_cache.db, next to tmp/memory.db).
+- Entries expire after SERP_CACHE_TTL seconds (default: 1 day).
+- The cache holds at most SERP_CACHE_MAX_ENTRIES rows (default: 5000); least recently used rows are evicted first.
+- Set SERP_CACHE_ENABLED=0 to bypass the cache entirely.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from agno.utils.log import logger
+
+SERP_CACHE_DB = os.getenv("SERP_CACHE_DB", "tmp/serp_cache.db")
+SERP_CACHE_ENABLED = os.getenv("SERP_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+_ttl_str = os.getenv("SERP_CACHE_TTL", "86400")
+try:
+    SERP_CACHE_TTL = float(_ttl_str)
+except (TypeError, ValueError):
+    SERP_CACHE_TTL = 86400.0
+
+_max_str = os.getenv("SERP_CACHE_MAX_ENTRIES", "5000")
+try:
+    SERP_CACHE_MAX_ENTRIES = int(_max_str)
+except (TypeError, ValueError):
+    SERP_CACHE_MAX_ENTRIES = 5000
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case and collapse whitespace so trivially different queries share an entry."""
+    return " ".join(query.lower().split())
+
+
+class SerpCache:
+    """SQLite-backed TTL + LRU cache of parsed search result links."""
+
+    def __init__(
+        self,
+        db_file: str = SERP_CACHE_DB,
+        ttl: float = SERP_CACHE_TTL,
+        max_entries: int = SERP_CACHE_MAX_ENTRIES,
+        enabled: bool = SERP_CACHE_ENABLED,
+    ):
+        self.db_file = db_file
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS serp_cache (
+                    key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    site TEXT NOT NULL,
+                    links_limit INTEGER NOT NULL,
+                    links TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS serp_cache_accessed ON serp_cache (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(query: str, site: str, links_limit: int) -> str:
+        raw = f"{normalize_query(query)}\x1f{site.strip().lower()}\x1f{links_limit}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(
+        self, query: str, site: str, links_limit: int
+    ) -> Optional[list[tuple[str, str]]]:
+        """Return cached (title, href) pairs, or None on a miss or expired entry."""
+        if not self.enabled:
+            return None
+        key = self.make_key(query, site, links_limit)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT links, created_at FROM serp_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                links, created_at = row
+                if self.ttl > 0 and now - created_at > self.ttl:
+                    conn.execute("DELETE FROM serp_cache WHERE key = ?", (key,))
+                    conn.commit()
+                    self.expired += 1
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE serp_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                conn.commit()
+                self.hits += 1
+            return [(title, href) for title, href in json.loads(links)]
+        except sqlite3.Error as e:
+            logger.warning(f"[SerpCache] Lookup failed, treating as miss: {e}")
+            return None
+
+    def put(
+        self, query: str, site: str, links_limit: int, links: list[tuple[str, str]]
+    ) -> None:
+        """Store parsed links and evict least recently used rows beyond max_entries."""
+        if not self.enabled:
+            return
+        key = self.make_key(query, site, links_limit)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO serp_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        normalize_query(query),
+                        site,
+                        links_limit,
+                        json.dumps([list(link) for link in links]),
+                        now,
+                        now,
+                    ),
+                )
+                if self.max_entries > 0:
+                    cur = conn.execute(
+                        """
+                        DELETE FROM serp_cache WHERE key IN (
+                            SELECT key FROM serp_cache ORDER BY accessed_at DESC
+                            LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (self.max_entries,),
+                    )
+                    self.evictions += max(cur.rowcount, 0)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[SerpCache] Failed to store results: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM serp_cache")
+            conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the current number of stored entries."""
+        with self._lock:
+            entries = 0
+            if self.enabled:
+                try:
+                    entries = self._connect().execute(
+                        "SELECT COUNT(*) FROM serp_cache"
+                    ).fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": entries,
+            }
+
+
+# Shared process-wide cache used by the search toolkits
+serp_cache = SerpCache()
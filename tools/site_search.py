@@ -0,0 +1,424 @@
+# site_search.py
+
+"""
+Shared DuckDuckGo HTML site-search helpers used by the search toolkits.
+- search_site() runs one `site:`-restricted query and returns parsed (title, href) pairs.
+- search_all_sites() covers a whole site list: duplicate sites are dropped, several `site:` operators are packed
+  into one OR-combined query (SEARCH_BATCH_SIZE per query, default: 4), results are demultiplexed back to
+  their originating site by host, and only sites left with fewer than SEARCH_TOPUP_MIN links (default: 1)
+  get a follow-up single-site query.
+- dedupe_site_links() canonicalizes result URLs (`tools.url_canon`) and drops links already returned
+  for another site in the same call or by any tool earlier in the current workflow run; mark_returned()
+  records the links a tool finally returns, after near-duplicate collapsing and budget trimming.
+- format_site_results() is the shared post-processing of the search toolkits: de-duplication, collapsing,
+  ranking, budget trimming and the error / omitted-count lines.
+- collapse_near_duplicates() drops results whose titles are near-duplicates (`tools.near_dup`) of a result
+  from an earlier site, e.g. a wire story syndicated to several news sites or a paper mirrored on preprint sites.
+- Parsed results are served from and stored in the persistent SERP cache (`tools.serp_cache`).
+- Each `site:` domain has a circuit breaker (`tools.circuit_breaker`); sites whose circuit is open are skipped
+  without a query and returned with a CircuitOpenError.
+- A Deadline (`tools.deadline`) bounds the whole call: it is passed to every request, queries still queued when
+  it expires are cancelled, and their sites are returned with a TimeoutError next to the results gathered so far.
+  Requests that time out or fail after the deadline also count as TimeoutError, and search engine failures
+  (SearchEngineError) release the site breakers instead of counting against sites that were never contacted.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlsplit
+
+from agno.utils.log import logger
+
+from tools.circuit_breaker import CircuitOpenError, circuit_breakers, format_skipped
+from tools.deadline import Deadline
+from tools.html_extract import extract_result_links
+from tools.http_client import TIMEOUT_ERRORS
+from tools.near_dup import filter_near_duplicates
+from tools.result_rank import rank_site_links, trim_to_budget
+from tools.serp_cache import serp_cache
+from tools.url_canon import UrlDeduper, canonicalize_url, run_urls
+
+DDG_HTML_URL = "https://html.duckduckgo.com/html/"
+
+# Number of site: operators packed into one query (1 = one query per site)
+_batch_str = os.getenv("SEARCH_BATCH_SIZE", "4")
+try:
+    SEARCH_BATCH_SIZE = max(1, int(_batch_str))
+except (TypeError, ValueError):
+    SEARCH_BATCH_SIZE = 4
+
+# Sites with fewer links than this after demultiplexing get a follow-up query
+_topup_str = os.getenv("SEARCH_TOPUP_MIN", "1")
+try:
+    SEARCH_TOPUP_MIN = int(_topup_str)
+except (TypeError, ValueError):
+    SEARCH_TOPUP_MIN = 1
+
+
+class SearchEngineError(RuntimeError):
+    """The search engine request itself failed (unreachable, 5xx or throttled); the sites were not contacted."""
+
+
+def is_timeout(error: BaseException, deadline: Optional[Deadline] = None) -> bool:
+    """True for timeouts (including requests' ReadTimeout) and for any failure once `deadline` has expired."""
+    return isinstance(error, TIMEOUT_ERRORS) or (deadline is not None and deadline.expired)
+
+
+def parse_result_links(html: str, limit: int) -> list[tuple[str, str]]:
+    """Extract up to `limit` (title, href) pairs from a DuckDuckGo HTML result page."""
+    return extract_result_links(html, limit)
+
+
+def search_site(
+    query: str,
+    site: str,
+    limit: int,
+    request: Callable,
+    headers: dict,
+    deadline: Optional[Deadline] = None,
+) -> list[tuple[str, str]]:
+    """
+    Runs a single site-restricted DuckDuckGo query, consulting the SERP cache first.
+
+    Args:
+        query (str): The search query.
+        site (str): The `site:` operator to append to the query.
+        limit (int): Maximum number of links to collect.
+        request (Callable): Rate-limited request method of the calling toolkit.
+        headers (dict): Request headers.
+        deadline (Optional[Deadline]): Deadline the request runs under; failures after it expired are timeouts.
+
+    Returns:
+        list[tuple[str, str]]: (title, href) pairs in page order.
+
+    Raises:
+        TimeoutError: The request timed out or failed after the deadline expired.
+        SearchEngineError: The search engine failed, throttled or was unreachable.
+    """
+    cached = serp_cache.get(query, site, limit)
+    if cached is not None:
+        logger.info(f"[SerpCache] Hit: {query} {site}")
+        return cached
+
+    q = f"{query} {site}"
+    logger.info(f"🔍 Searching: {q}")
+    # Let the client encode the query: OR-batched `(site:a OR site:b)` and any &, # or + must not be sent raw
+    try:
+        res = request(DDG_HTML_URL, params={"q": q}, headers=headers)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        if is_timeout(e, deadline):
+            raise TimeoutError(f"deadline exceeded searching {site}") from e
+        raise SearchEngineError(f"search engine request failed: {e}") from e
+    if getattr(res, "blocked", False):
+        # Surface throttling as an error instead of parsing the block page as "no results"
+        raise SearchEngineError(f"search engine is throttling requests (HTTP {res.status_code})")
+    if getattr(res, "status_code", 200) >= 500:
+        raise SearchEngineError(f"search engine error (HTTP {res.status_code})")
+    links = parse_result_links(res.text, limit)
+
+    # Only cache clean responses; DuckDuckGo answers throttled requests with
+    # non-200 "anomaly" pages that would otherwise be cached as empty results.
+    if getattr(res, "status_code", 200) == 200:
+        serp_cache.put(query, site, limit, links)
+    return links
+
+
+def dedupe_sites(sites: list[str]) -> list[str]:
+    """Drop repeated `site:` operators, keeping first-seen order."""
+    return list(dict.fromkeys(site.strip().lower() for site in sites))
+
+
+def site_domain(site: str) -> str:
+    """Return the domain of a `site:` operator, e.g. "site:gov.ph" -> "gov.ph"."""
+    return site.strip().lower().removeprefix("site:").strip("/")
+
+
+def result_host(href: str) -> str:
+    """Return the host a result link points at, unwrapping DuckDuckGo redirect links."""
+    return urlsplit(canonicalize_url(href)).hostname or ""
+
+
+def _match_site(host: str, sites: list[str]) -> Optional[str]:
+    """Return the most specific site whose domain covers `host`."""
+    best = None
+    for site in sites:
+        domain = site_domain(site)
+        if host == domain or host.endswith("." + domain):
+            if best is None or len(domain) > len(site_domain(best)):
+                best = site
+    return best
+
+
+def search_batch(
+    query: str,
+    sites: list[str],
+    limit: int,
+    request: Callable,
+    headers: dict,
+    deadline: Optional[Deadline] = None,
+) -> dict[str, list[tuple[str, str]]]:
+    """
+    Runs one OR-combined query for several sites and demultiplexes the links by host.
+
+    Args:
+        query (str): The search query.
+        sites (list[str]): `site:` operators to combine.
+        limit (int): Maximum number of links to keep per site.
+        request (Callable): Rate-limited request method of the calling toolkit.
+        headers (dict): Request headers.
+        deadline (Optional[Deadline]): Deadline the request runs under (see search_site()).
+
+    Returns:
+        dict[str, list[tuple[str, str]]]: (title, href) pairs per site, in page order.
+    """
+    if len(sites) == 1:
+        return {sites[0]: search_site(query, sites[0], limit, request, headers, deadline)}
+
+    combined = "(" + " OR ".join(sites) + ")"
+    links = search_site(query, combined, limit * len(sites), request, headers, deadline)
+
+    results: dict[str, list[tuple[str, str]]] = {site: [] for site in sites}
+    for title, href in links:
+        site = _match_site(result_host(href), sites)
+        if site is not None and len(results[site]) < limit:
+            results[site].append((title, href))
+    return results
+
+
+def search_all_sites(
+    query: str,
+    sites: list[str],
+    limit: int,
+    request: Callable,
+    headers: dict,
+    batch_size: int = SEARCH_BATCH_SIZE,
+    topup_min: int = SEARCH_TOPUP_MIN,
+    max_workers: int = 1,
+    deadline: Optional[Deadline] = None,
+) -> tuple[dict[str, list[tuple[str, str]]], dict[str, Exception]]:
+    """
+    Searches every site in `sites` using batched queries plus follow-up queries for under-served sites.
+
+    Args:
+        query (str): The search query.
+        sites (list[str]): `site:` operators to search; duplicates are ignored.
+        limit (int): Maximum number of links to collect per site.
+        request (Callable): Rate-limited request method of the calling toolkit.
+        headers (dict): Request headers.
+        batch_size (int): Number of sites packed into one query.
+        topup_min (int): Sites with fewer links than this get a single-site follow-up query.
+        max_workers (int): Number of queries allowed in flight at once.
+        deadline (Optional[Deadline]): Budget for the whole call, also passed to each request.
+
+    Returns:
+        tuple: (links per site, errors per site). Both are keyed by the de-duplicated sites in input
+        order; a site that ran out of time has a TimeoutError in the errors dict, and a site skipped
+        because its circuit is open has a CircuitOpenError.
+    """
+    sites = dedupe_sites(sites)
+    results: dict[str, list[tuple[str, str]]] = {site: [] for site in sites}
+    errors: dict[str, Exception] = {}
+
+    # Sites with an open circuit are skipped up front
+    active = []
+    for site in sites:
+        try:
+            circuit_breakers.check(site_domain(site))
+            active.append(site)
+        except CircuitOpenError as e:
+            errors[site] = e
+
+    batch_size = max(1, batch_size)
+    batches = [active[i : i + batch_size] for i in range(0, len(active), batch_size)]
+    deadline = deadline or Deadline()
+    remaining = deadline.remaining
+    request = partial(request, deadline=deadline)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, max_workers),
+        thread_name_prefix="site_search",
+    )
+    try:
+        # Phase 1: one OR-combined query per batch
+        futures = [
+            executor.submit(search_batch, query, batch, limit, request, headers, deadline)
+            for batch in batches
+        ]
+        _, pending = wait(futures, timeout=remaining())
+        batched: set[str] = set()
+        for batch, future in zip(batches, futures):
+            if future in pending:
+                for site in batch:
+                    errors[site] = TimeoutError("deadline exceeded")
+                continue
+            try:
+                results.update(future.result())
+            except Exception as e:
+                if len(batch) == 1:
+                    errors[batch[0]] = e
+                    continue
+                # A failed combined query leaves its sites empty, so phase 2 retries them one by one
+                logger.warning(f"Batched search failed for {batch}: {e}")
+            if len(batch) > 1:
+                batched.update(batch)
+
+        # Phase 2: single-site follow-ups, only for batched sites left under-served
+        topups = [
+            site
+            for site in active
+            if site in batched and len(results[site]) < min(topup_min, limit)
+        ]
+        if topups:
+            logger.info(f"Topping up {len(topups)} under-served sites: {topups}")
+            futures = [
+                executor.submit(search_site, query, site, limit, request, headers, deadline)
+                for site in topups
+            ]
+            _, pending = wait(futures, timeout=remaining())
+            for site, future in zip(topups, futures):
+                if future in pending:
+                    errors[site] = TimeoutError("deadline exceeded")
+                    continue
+                try:
+                    results[site] = future.result()
+                except Exception as e:
+                    errors[site] = e
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for site in active:
+        error = errors.get(site)
+        if error is None:
+            circuit_breakers.record_success(site_domain(site))
+        elif isinstance(error, (TimeoutError, CircuitOpenError, SearchEngineError)):
+            # Deadlines and search engine failures say nothing about the site, which was never contacted
+            circuit_breakers.release(site_domain(site))
+        else:
+            circuit_breakers.record_failure(site_domain(site))
+    return results, errors
+
+
+def dedupe_site_links(
+    site_links: dict[str, list[tuple[str, str]]],
+) -> tuple[dict[str, list[tuple[str, str]]], int]:
+    """
+    Canonicalizes result URLs and drops duplicates across sites and across the current workflow run.
+
+    Args:
+        site_links (dict): (title, href) pairs per site, as returned by search_all_sites().
+
+    Returns:
+        tuple: (links per site with canonical hrefs, number of duplicate links dropped).
+    """
+    seen = UrlDeduper()
+    deduped: dict[str, list[tuple[str, str]]] = {}
+    dropped = 0
+    for site, links in site_links.items():
+        kept = []
+        for title, href in links:
+            canonical = canonicalize_url(href)
+            # Only checks the run registry; links are recorded by mark_returned() once they are actually returned
+            if canonical not in run_urls and seen.add(canonical):
+                kept.append((title, canonical))
+            else:
+                dropped += 1
+        deduped[site] = kept
+    return deduped, dropped
+
+
+def mark_returned(hrefs: Iterable[str]) -> None:
+    """
+    Records links handed to the agent in the current workflow run, so later searches drop them.
+
+    Only call this with the links that made it into the tool's output: links dropped as near-duplicates or
+    trimmed to the token budget must stay available to later searches.
+    """
+    for href in hrefs:
+        run_urls.add(href)
+
+
+def collapse_near_duplicates(
+    site_links: dict[str, list[tuple[str, str]]],
+) -> tuple[dict[str, list[tuple[str, str]]], int]:
+    """
+    Drops results whose title is a near-duplicate of a result listed earlier (site order, then rank).
+    Titles must also carry the same numbers (years, counts, part numbers) to be collapsed.
+
+    Args:
+        site_links (dict): (title, href) pairs per site, typically after dedupe_site_links().
+
+    Returns:
+        tuple: (links per site without near-duplicates, number of results collapsed).
+    """
+    flat = [(site, title, href) for site, links in site_links.items() for title, href in links]
+    kept, duplicates = filter_near_duplicates(flat, lambda item: item[1])
+    collapsed: dict[str, list[tuple[str, str]]] = {site: [] for site in site_links}
+    for site, title, href in kept:
+        collapsed[site].append((title, href))
+    return collapsed, len(duplicates)
+
+
+def format_links(links: list[tuple[str, str]]) -> list[str]:
+    """Render (title, href) pairs as the markdown link lines returned to agents."""
+    return [f"🔗 [{title}]({href})" for title, href in links]
+
+
+def format_site_results(
+    query: str,
+    site_links: dict[str, list[tuple[str, str]]],
+    errors: dict[str, Exception],
+    token_budget: int,
+) -> list[str]:
+    """
+    Turns the output of search_all_sites() into the lines a search toolkit returns.
+
+    Links are de-duplicated (dedupe_site_links), collapsed (collapse_near_duplicates), ranked against the query
+    and trimmed to the token budget; only the links that are returned are recorded for the run (mark_returned).
+    Site errors, skipped sites and the omitted counts follow the links.
+
+    Args:
+        query (str): The search query, used for ranking.
+        site_links (dict): (title, href) pairs per site from search_all_sites().
+        errors (dict): Errors per site from search_all_sites().
+        token_budget (int): Approximate token budget for the links (0 returns every link).
+
+    Returns:
+        list[str]: Output lines; empty if there were neither results nor errors.
+    """
+    site_links, duplicates = dedupe_site_links(site_links)
+    site_links, near_duplicates = collapse_near_duplicates(site_links)
+
+    # Best results first, cut to the token budget; errors follow in site order.
+    ranked = rank_site_links(query, site_links)
+    lines, trimmed = trim_to_budget(format_links([(title, href) for _, _, title, href in ranked]), token_budget)
+    # trim_to_budget keeps a prefix, so the returned links are the first len(lines) ranked ones
+    mark_returned(href for _, _, _, href in ranked[: len(lines)])
+
+    for site, error in errors.items():
+        if isinstance(error, CircuitOpenError):
+            continue
+        if isinstance(error, TimeoutError):
+            error_msg = f"⏱️ Timed out searching {site}"
+            lines.append(error_msg)
+            logger.warning(error_msg)
+        else:
+            error_msg = f"❌ Error searching {site}: {error}"
+            lines.append(error_msg)
+            logger.error(error_msg)
+
+    # Sites behind an open circuit are summarised in one line instead of one error each
+    skipped = format_skipped(errors)
+    if skipped:
+        lines.append(skipped)
+        logger.warning(skipped)
+    if duplicates:
+        lines.append(f"♻️ Omitted {duplicates} duplicate links already returned in this search or run")
+    if near_duplicates:
+        lines.append(f"♻️ Collapsed {near_duplicates} near-duplicate results (same story or paper on another site)")
+    if trimmed:
+        lines.append(f"✂️ Omitted {trimmed} lower-ranked results to fit the token budget")
+    return lines
@@ -0,0 +1,245 @@
+# text_extract.py
+
+"""
+Text extraction pipeline for files saved by FileDownloaderTool (PDF, TXT, MD, CSV).
+- Extraction runs in a process pool (TEXT_EXTRACT_WORKERS, default: up to 4) because PDF parsing is CPU-bound.
+- Files larger than TEXT_MMAP_THRESHOLD bytes (default: 1 MiB) are memory-mapped instead of read whole.
+- Output is normalized (NFKC, de-hyphenated line breaks, collapsed whitespace) and split into
+  page-level chunks: one per PDF page, or TEXT_CHUNK_CHARS-sized line-aligned chunks for text files.
+- Results are cached as JSON by content hash under TEXT_CACHE_DIR (default: tmp/text_cache), so the
+  same document is parsed once however many names or URLs it was downloaded under.
+"""
+
+import atexit
+import codecs
+import json
+import mmap
+import os
+import re
+import threading
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from agno.utils.log import logger
+
+from tools.file_store import hash_file
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+TEXT_CACHE_DIR = os.getenv("TEXT_CACHE_DIR", "tmp/text_cache")
+
+_workers_str = os.getenv("TEXT_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1)))
+try:
+    TEXT_EXTRACT_WORKERS = max(1, int(_workers_str))
+except (TypeError, ValueError):
+    TEXT_EXTRACT_WORKERS = 1
+
+_threshold_str = os.getenv("TEXT_MMAP_THRESHOLD", str(1024 * 1024))
+try:
+    TEXT_MMAP_THRESHOLD = int(_threshold_str)
+except (TypeError, ValueError):
+    TEXT_MMAP_THRESHOLD = 1024 * 1024
+
+_chunk_str = os.getenv("TEXT_CHUNK_CHARS", "4000")
+try:
+    TEXT_CHUNK_CHARS = int(_chunk_str)
+except (TypeError, ValueError):
+    TEXT_CHUNK_CHARS = 4000
+
+TEXT_EXTENSIONS = {".txt", ".md", ".csv"}
+SUPPORTED_EXTENSIONS = TEXT_EXTENSIONS | {".pdf"}
+
+
+def normalize_text(text: str) -> str:
+    """Normalize extracted text so chunks compare and tokenize consistently."""
+    text = unicodedata.normalize("NFKC", text).replace("\u00ad", "")
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    # Re-join words hyphenated across line breaks by PDF layout
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    text = re.sub(r"[ \t\f\v]+", " ", text)
+    text = re.sub(r" *\n *", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def _open_source(f, size: int):
+    """Memory-map large files; small ones are cheaper to read directly."""
+    if size >= TEXT_MMAP_THRESHOLD:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return None
+
+
+def _pdf_chunks(path: str) -> list[dict]:
+    if PdfReader is None:
+        raise RuntimeError("pypdf is not installed")
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        mapped = _open_source(f, size)
+        try:
+            reader = PdfReader(mapped if mapped is not None else f)
+            chunks = []
+            for number, page in enumerate(reader.pages, start=1):
+                text = normalize_text(page.extract_text() or "")
+                if text:
+                    chunks.append({"page": number, "text": text})
+            return chunks
+        finally:
+            if mapped is not None:
+                mapped.close()
+
+
+def _text_chunks(path: str, chunk_chars: int) -> list[dict]:
+    """Decode a text file incrementally and cut it into line-aligned chunks of about `chunk_chars`."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    chunks, buffer = [], ""
+
+    def flush(final: bool = False) -> None:
+        nonlocal buffer
+        while len(buffer) > chunk_chars or (final and buffer):
+            if len(buffer) <= chunk_chars:
+                cut = len(buffer)
+            else:
+                cut = buffer.rfind("\n", 0, chunk_chars) + 1 or chunk_chars
+            text = normalize_text(buffer[:cut])
+            buffer = buffer[cut:]
+            if text:
+                chunks.append({"page": len(chunks) + 1, "text": text})
+
+    with open(path, "rb") as f:
+        mapped = _open_source(f, size)
+        try:
+            source = mapped if mapped is not None else f
+            while True:
+                block = source.read(TEXT_MMAP_THRESHOLD if mapped is not None else 64 * 1024)
+                if not block:
+                    break
+                buffer += decoder.decode(block)
+                flush()
+            buffer += decoder.decode(b"", final=True)
+            flush(final=True)
+        finally:
+            if mapped is not None:
+                mapped.close()
+    return chunks
+
+
+def extract_chunks(path: str, chunk_chars: int = TEXT_CHUNK_CHARS) -> list[dict]:
+    """
+    Extract normalized page-level chunks from one file. Runs inside the worker processes.
+
+    Args:
+        path (str): File to extract.
+        chunk_chars (int): Target chunk size for non-PDF files.
+
+    Returns:
+        list[dict]: {"page": int, "text": str} chunks in document order.
+    """
+    ext = Path(path).suffix.lower()
+    if ext == ".pdf":
+        return _pdf_chunks(path)
+    if ext in TEXT_EXTENSIONS:
+        return _text_chunks(path, chunk_chars)
+    raise ValueError(f"unsupported file type {ext or '(none)'}")
+
+
+class TextExtractor:
+    """Runs extract_chunks in a process pool and caches the results by content hash."""
+
+    def __init__(
+        self,
+        cache_dir: str = TEXT_CACHE_DIR,
+        max_workers: int = TEXT_EXTRACT_WORKERS,
+        chunk_chars: int = TEXT_CHUNK_CHARS,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers
+        self.chunk_chars = chunk_chars
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def _cache_path(self, sha256: str) -> Path:
+        return self.cache_dir / f"{sha256}.json"
+
+    def _load_cached(self, sha256: str) -> Optional[list[dict]]:
+        try:
+            return json.loads(self._cache_path(sha256).read_text(encoding="utf-8"))["chunks"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _store(self, sha256: str, source: str, chunks: list[dict]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._cache_path(sha256)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(
+            json.dumps({"source": source, "chunks": chunks}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+
+    def extract(self, paths: list[Path], hashes: Optional[dict] = None) -> dict[str, dict]:
+        """
+        Extract text from several files, parsing only those not already in the cache.
+
+        Args:
+            paths (list[Path]): Files to extract.
+            hashes (Optional[dict]): Known sha256 digests by path (e.g. from the download manifest).
+
+        Returns:
+            dict[str, dict]: Per path, {"sha256", "chunks", "cached"} or {"error"}.
+        """
+        hashes = hashes or {}
+        results: dict[str, dict] = {}
+        pending = {}
+        for path in paths:
+            key = str(path)
+            try:
+                sha256 = hashes.get(key) or hash_file(path).hexdigest()
+            except OSError as e:
+                results[key] = {"error": str(e)}
+                continue
+            chunks = self._load_cached(sha256)
+            if chunks is not None:
+                results[key] = {"sha256": sha256, "chunks": chunks, "cached": True}
+            else:
+                pending[key] = sha256
+
+        if pending:
+            futures = {
+                key: self._executor().submit(extract_chunks, key, self.chunk_chars)
+                for key in pending
+            }
+            for key, future in futures.items():
+                try:
+                    chunks = future.result()
+                except Exception as e:
+                    logger.error(f"[TextExtractor] Failed to extract {key}: {e}")
+                    results[key] = {"error": str(e)}
+                    continue
+                self._store(pending[key], Path(key).name, chunks)
+                results[key] = {"sha256": pending[key], "chunks": chunks, "cached": False}
+        return results
+
+
+# Shared process-wide extractor; its worker processes are started on first use
+text_extractor = TextExtractor()
+atexit.register(text_extractor.shutdown)
@@ -0,0 +1,213 @@
+# url_canon.py
+
+"""
+URL canonicalization and de-duplication for links returned by the toolkits.
+- canonicalize_url() unwraps search-engine redirect links (DuckDuckGo `/l/?uddg=`, Google `/url?q=`),
+  strips tracking parameters, lower-cases scheme and host, drops default ports, fragments and trailing slashes.
+- extract_doi() detects DOIs so the same paper reached through doi.org and a publisher page collapses to one key.
+- UrlDeduper is a set-based filter for one batch of results; unique_urls() applies it to a URL list and returns
+  the surviving URLs as given, so tools fetch the original href rather than its canonical rewrite.
+- run_urls remembers links already returned during the current workflow run (see begin_run), so the same
+  article is not handed to the agents again by another tool or researcher. The scope is per run (a context
+  variable), so concurrent runs do not reset each other. Set TOOLS_RUN_DEDUP=0 to disable.
+"""
+
+import contextvars
+import os
+import re
+import threading
+from typing import Optional
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+RUN_DEDUP_ENABLED = os.getenv("TOOLS_RUN_DEDUP", "1").lower() not in ("0", "false", "no")
+
+# Query parameters that only carry tracking/session information
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "ref_src",
+    "spm",
+    "rut",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_", "oly_")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+DOI_PATTERN = re.compile(r"\b(10\.\d{4,9}/[^\s?#&\"'<>]+)", re.IGNORECASE)
+
+
+def unwrap_redirect(url: str) -> str:
+    """Return the target of a search-engine redirect link, or the URL unchanged."""
+    if url.startswith("//"):
+        url = "https:" + url
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    params = dict(parse_qsl(parts.query))
+    if host.endswith("duckduckgo.com") and parts.path.startswith("/l/") and params.get("uddg"):
+        return params["uddg"]
+    if re.match(r"(www\.)?google\.[a-z.]+$", host) and parts.path == "/url":
+        target = params.get("q") or params.get("url")
+        if target and target.startswith("http"):
+            return target
+    return url
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a result URL so equivalent links compare equal.
+
+    Args:
+        url (str): Raw href, possibly a redirect wrapper or scheme-relative.
+
+    Returns:
+        str: Canonical absolute URL, or the URL unchanged if it cannot be parsed (e.g. an out-of-range port).
+    """
+    url = unwrap_redirect(url.strip())
+    if url.startswith("//"):
+        url = "https:" + url
+    elif "://" not in url:
+        url = "https://" + url
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        # One malformed href must not abort a whole batch; it only matches itself
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower().rstrip(".")
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = urlencode(
+        sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k))
+    )
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def extract_doi(url: str) -> Optional[str]:
+    """Return the lower-cased DOI contained in a URL, if any."""
+    match = DOI_PATTERN.search(unquote(url))
+    if not match:
+        return None
+    doi = match.group(1).rstrip(".,;)")
+    # Publisher pages often append a view suffix after the DOI
+    doi = re.sub(r"/(full|abstract|pdf|epdf|html)$", "", doi, flags=re.IGNORECASE)
+    return doi.lower()
+
+
+def dedup_key(url: str) -> str:
+    """Key under which two URLs are considered the same resource."""
+    canonical = canonicalize_url(url)
+    doi = extract_doi(canonical)
+    if doi:
+        return f"doi:{doi}"
+    parts = urlsplit(canonical)
+    try:
+        parts.port
+    except ValueError:
+        return canonical
+    host = (parts.hostname or "").removeprefix("www.")
+    return f"{host}{parts.path}?{parts.query}" if parts.query else f"{host}{parts.path}"
+
+
+def unique_urls(urls: list[str]) -> list[str]:
+    """
+    Drop URLs that are the same resource as an earlier one, keeping first-seen order.
+
+    Duplicates are detected on the canonical key, but the original hrefs are returned: the canonical form
+    (no trailing slash, sorted query, assumed https) is not always the same resource on the server.
+    """
+    seen = UrlDeduper()
+    return [url for url in urls if seen.add(url)]
+
+
+class UrlDeduper:
+    """Set-based filter that admits each canonical resource once."""
+
+    def __init__(self):
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+
+    def add(self, url: str) -> bool:
+        """Record a URL; returns False if an equivalent one was already seen."""
+        key = dedup_key(url)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            return True
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return dedup_key(url) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class RunUrlRegistry:
+    """
+    Remembers the URLs handed to agents during the current workflow run.
+
+    The run scope lives in a context variable, so concurrent runs (and tool calls outside any run) never see
+    each other's links; threads started by a run must be given a copy of its context (`contextvars`).
+    """
+
+    def __init__(self, enabled: bool = RUN_DEDUP_ENABLED):
+        self.enabled = enabled
+        self._scope: contextvars.ContextVar[Optional[tuple[str, Optional[UrlDeduper]]]] = contextvars.ContextVar(
+            "run_urls", default=None
+        )
+
+    @property
+    def run_id(self) -> Optional[str]:
+        scope = self._scope.get()
+        return scope[0] if scope else None
+
+    @property
+    def _deduper(self) -> Optional[UrlDeduper]:
+        scope = self._scope.get()
+        return scope[1] if scope else None
+
+    def begin_run(self, run_id: str) -> contextvars.Token:
+        """Start a fresh scope in the current context; returns the token to pass to end_run."""
+        return self._scope.set((run_id, UrlDeduper() if self.enabled else None))
+
+    def end_run(self, token: contextvars.Token) -> None:
+        """Restore the scope that was active before begin_run."""
+        try:
+            self._scope.reset(token)
+        except ValueError:
+            # Ended from another context (e.g. a stream consumed elsewhere); just leave the run's scope
+            self._scope.set(None)
+
+    def add(self, url: str) -> bool:
+        """Record a URL for the current run; returns False if it was already returned in this run."""
+        deduper = self._deduper
+        return True if deduper is None else deduper.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        """Whether a URL was already returned in this run, without recording it."""
+        deduper = self._deduper
+        return deduper is not None and url in deduper
+
+
+# Shared process-wide registry of links returned during the current workflow run
+run_urls = RunUrlRegistry()